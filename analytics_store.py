@@ -0,0 +1,319 @@
+"""
+Analytics store
+비용 내보내기의 행을 SQLite(기본) 또는 DuckDB 테이블에 저장하고, 사용자/프로젝트/모델/일별 집계를
+SQL로 조회합니다. 업로드한 전체 데이터를 메모리에 올려 Python으로 다시 계산하지 않아도 되며,
+집계는 (일, 사용자, 프로젝트, 모델) 단위로 미리 합산한 daily_costs 테이블에서 읽습니다.
+
+    store = get_analytics_store("user")
+    store.ingest(export)
+    store.aggregate("project", start_date="2025-01-01", end_date="2025-03-31")
+"""
+
+import os
+import threading
+
+from logging_config import get_logger
+from records import bucket_date
+
+logger = get_logger("analytics")
+
+BACKENDS = ("sqlite", "duckdb")
+# 테이블 구조가 바뀌면 올림. 저장된 버전이 다르면 테이블을 다시 만듭니다 (내보내기를 다시 저장해야 함)
+SCHEMA_VERSION = 2
+DAY_SECONDS = 86400
+DIMENSIONS = {"user": "user_id", "project": "project_id", "model": "model", "date": "day"}
+
+_META_TABLE = "CREATE TABLE IF NOT EXISTS analytics_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cost_rows (
+        start_time BIGINT NOT NULL,
+        day TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        line_item TEXT NOT NULL,
+        model TEXT NOT NULL,
+        cost DOUBLE NOT NULL,
+        row_count BIGINT NOT NULL,
+        PRIMARY KEY (start_time, user_id, project_id, line_item)
+    ){without_rowid}
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_costs (
+        day TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        model TEXT NOT NULL,
+        cost DOUBLE NOT NULL,
+        row_count BIGINT NOT NULL,
+        PRIMARY KEY (day, user_id, project_id, model)
+    ){without_rowid}
+    """,
+    # 차원별 집계가 테이블을 읽지 않고 인덱스만으로 끝나도록 cost/row_count까지 포함
+    "CREATE INDEX IF NOT EXISTS idx_daily_costs_project ON daily_costs (project_id, day, cost, row_count)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_costs_user ON daily_costs (user_id, day, cost, row_count)",
+    "CREATE INDEX IF NOT EXISTS idx_daily_costs_model ON daily_costs (model, day, cost, row_count)",
+)
+
+
+def _schema(backend):
+    # SQLite는 기본 키 순서로 행을 저장(WITHOUT ROWID)하여 날짜 범위 조회 시 별도 조회가 없도록 함
+    without_rowid = " WITHOUT ROWID" if backend == "sqlite" else ""
+    return [statement.replace("{without_rowid}", without_rowid) for statement in _SCHEMA]
+
+
+def _create_schema(conn, backend):
+    conn.execute(_META_TABLE)
+    row = conn.execute("SELECT value FROM analytics_meta WHERE key = 'schema_version'").fetchone()
+    if row is None or row[0] != str(SCHEMA_VERSION):
+        # 이전 구조의 테이블이 남아 있으면 삭제 (예전 버전은 버킷 안의 중복 키 행을 덮어써 합계가 틀림)
+        if any(_table_exists(conn, table) for table in ("daily_costs", "cost_rows")):
+            logger.warning("분석 저장소 구조가 바뀌어 저장된 행을 삭제합니다. 내보내기를 다시 저장해주세요.")
+        for table in ("daily_costs", "cost_rows"):
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute("DELETE FROM analytics_meta WHERE key = 'schema_version'")
+        conn.execute("INSERT INTO analytics_meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+    for statement in _schema(backend):
+        conn.execute(statement)
+
+
+def _table_exists(conn, table):
+    try:
+        conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchall()
+    except Exception:
+        return False
+    return True
+
+
+def default_analytics_path(kind="user"):
+    """내보내기 종류(user/project)별 분석 저장소 경로 (환경 변수 TRACKER_ANALYTICS_DIR, 기본값 ledger)
+
+    User 내보내기와 Project 내보내기는 같은 비용을 다른 기준으로 나눈 것이므로 따로 저장합니다.
+    """
+    return os.path.join(os.environ.get("TRACKER_ANALYTICS_DIR", "ledger"), f"{kind}_analytics.db")
+
+
+def _bucket_rows(start_time, day, results):
+    """버킷 하나의 행을 (사용자, 프로젝트, line_item)별로 합산한 저장용 값 목록.
+
+    같은 버킷 안에서 키가 같은 행은 서로 다른 사용 내역이므로 교체하지 않고 비용과 행 수를 더합니다.
+    """
+    merged = {}
+    for result in results:
+        amount = result.get("amount")
+        cost = amount.get("value") if isinstance(amount, dict) else None
+        # None/NaN은 0으로 처리 (cost_ledger.row_cost와 동일)
+        if cost is None or cost != cost:
+            cost = 0.0
+        key = (result.get("user_id") or "", result.get("project_id") or "",
+               result.get("line_item") or result.get("model") or "")
+        entry = merged.get(key)
+        if entry is None:
+            merged[key] = [cost, 1]
+        else:
+            entry[0] += cost
+            entry[1] += 1
+    return [
+        (start_time, day, user_id, project_id, line_item, line_item.split(",")[0].strip(), cost, count)
+        for (user_id, project_id, line_item), (cost, count) in merged.items()
+    ]
+
+
+class AnalyticsStore:
+    """비용 행 저장소. SQLite는 스레드마다 연결을 만들고, DuckDB는 연결 하나에서 스레드별 커서를 사용합니다.
+
+    Args:
+        path: DB 파일 경로 (기본값 default_analytics_path("user"))
+        backend: "sqlite" 또는 "duckdb" (duckdb 패키지 필요)
+    """
+
+    def __init__(self, path=None, backend="sqlite"):
+        if backend not in BACKENDS:
+            raise ValueError(f"알 수 없는 backend: {backend}")
+        self.path = path or default_analytics_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.backend = backend
+        self._local = threading.local()
+        self._duckdb = None
+        self._init_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        if self.backend == "duckdb":
+            with self._init_lock:
+                if self._duckdb is None:
+                    import duckdb
+
+                    self._duckdb = duckdb.connect(self.path)
+                    _create_schema(self._duckdb, self.backend)
+            conn = self._duckdb.cursor()
+        else:
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                _create_schema(conn, self.backend)
+        self._local.conn = conn
+        return conn
+
+    def _begin(self, conn):
+        conn.execute("BEGIN TRANSACTION" if self.backend == "duckdb" else "BEGIN IMMEDIATE")
+
+    # --- 저장 ---
+
+    def ingest(self, export, batch_size=50_000):
+        """내보내기 데이터의 행을 저장합니다.
+
+        한 버킷 안에서 (사용자, 프로젝트, line_item)이 같은 행은 합산하고, 이미 저장된 같은 버킷은
+        한 트랜잭션 안에서 행을 모두 지운 뒤 새 행으로 교체합니다. 같은 내보내기를 다시 저장해도
+        중복 집계되지 않고, 다시 받은 버킷에서 빠진 키의 행도 남지 않습니다.
+
+        Returns:
+            int: 저장한 (합산된) 행 수
+        """
+        buckets = export.get("data", []) if isinstance(export, dict) else export or []
+        conn = self._conn()
+        days = {}  # 날짜 -> 그 날짜의 버킷 start_time 목록
+        seen = set()  # 이번 호출에서 이미 비운 버킷. 나뉘어 들어온 같은 버킷은 이어서 합산
+        replaced = []
+        batch = []
+        stored = 0
+        self._begin(conn)
+        try:
+            for bucket in buckets:
+                if not isinstance(bucket, dict) or "start_time" not in bucket:
+                    continue
+                day = bucket_date(bucket)
+                start_time = bucket["start_time"]
+                days.setdefault(day, set()).add(start_time)
+                if start_time not in seen:
+                    seen.add(start_time)
+                    replaced.append((start_time,))
+                batch.extend(_bucket_rows(start_time, day, bucket.get("results") or ()))
+                if len(batch) >= batch_size:
+                    stored += self._replace(conn, replaced, batch)
+                    replaced, batch = [], []
+            if batch or replaced:
+                stored += self._replace(conn, replaced, batch)
+            self._rebuild_days(conn, days)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return stored
+
+    def _replace(self, conn, starts, rows):
+        # 새로 받은 버킷의 이전 행을 먼저 지우므로, 남은 충돌은 이번 호출에서 나뉘어 들어온 같은 버킷뿐
+        if starts:
+            conn.executemany("DELETE FROM cost_rows WHERE start_time = ?", starts)
+        if rows:
+            conn.executemany(
+                "INSERT INTO cost_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (start_time, user_id, project_id, line_item) DO UPDATE SET "
+                "cost = cost_rows.cost + excluded.cost, row_count = cost_rows.row_count + excluded.row_count",
+                rows,
+            )
+        return len(rows)
+
+    def _rebuild_days(self, conn, days):
+        # 바뀐 날짜의 합산 행만 다시 계산. 같은 날짜의 버킷은 24시간 안에 있으므로
+        # start_time 기본 키 범위로 좁힌 뒤 day로 거름
+        for day in sorted(days):
+            starts = days[day]
+            conn.execute("DELETE FROM daily_costs WHERE day = ?", (day,))
+            conn.execute(
+                "INSERT INTO daily_costs "
+                "SELECT day, user_id, project_id, model, SUM(cost), SUM(row_count) FROM cost_rows "
+                "WHERE start_time > ? AND start_time < ? AND day = ? GROUP BY day, user_id, project_id, model",
+                (min(starts) - DAY_SECONDS, max(starts) + DAY_SECONDS, day),
+            )
+
+    def clear(self):
+        """저장된 모든 행을 삭제합니다."""
+        conn = self._conn()
+        self._begin(conn)
+        conn.execute("DELETE FROM cost_rows")
+        conn.execute("DELETE FROM daily_costs")
+        conn.execute("COMMIT")
+
+    # --- 조회 ---
+
+    def _where(self, start_date, end_date, user_ids, project_ids, models):
+        clauses = []
+        params = []
+        if start_date:
+            clauses.append("day >= ?")
+            params.append(str(start_date))
+        if end_date:
+            clauses.append("day <= ?")
+            params.append(str(end_date))
+        for column, values in (("user_id", user_ids), ("project_id", project_ids), ("model", models)):
+            if values is None:
+                continue
+            values = ["" if value is None else value for value in values]
+            if not values:
+                # 빈 집합이면 결과도 비어 있음
+                clauses.append("1 = 0")
+                continue
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def aggregate(self, by="project", start_date=None, end_date=None, user_ids=None, project_ids=None, models=None):
+        """차원별 비용 합계와 내보내기 행 수를 조회합니다.
+
+        Args:
+            by: "user", "project", "model" 또는 "date"
+            start_date / end_date: 조회 기간 (YYYY-MM-DD, 양 끝 포함)
+            user_ids / project_ids / models: 포함할 값 목록 (None이면 전체)
+
+        Returns:
+            dict: {키: {"total_cost", "rows"}} (비용 내림차순, date는 날짜순). 빈 user_id/project_id는 None.
+                  rows는 요청 수가 아니라 합산된 내보내기 결과 행 수입니다.
+        """
+        if by not in DIMENSIONS:
+            raise ValueError(f"알 수 없는 기준: {by}")
+        column = DIMENSIONS[by]
+        where, params = self._where(start_date, end_date, user_ids, project_ids, models)
+        order = column if by == "date" else "2 DESC"
+        rows = self._conn().execute(
+            f"SELECT {column}, SUM(cost), SUM(row_count) FROM daily_costs{where} GROUP BY {column} ORDER BY {order}",
+            params,
+        ).fetchall()
+        return {
+            (key if key != "" else None): {"total_cost": cost, "rows": row_count}
+            for key, cost, row_count in rows
+        }
+
+    def daily_costs(self, **filters):
+        """일별 비용 [(날짜, 비용), ...]을 날짜순으로 반환합니다 (filters는 aggregate와 같음)."""
+        return [(day, values["total_cost"]) for day, values in self.aggregate("date", **filters).items()]
+
+    def total_cost(self, start_date=None, end_date=None, user_ids=None, project_ids=None, models=None):
+        """조건에 맞는 전체 비용"""
+        where, params = self._where(start_date, end_date, user_ids, project_ids, models)
+        row = self._conn().execute(f"SELECT SUM(cost) FROM daily_costs{where}", params).fetchone()
+        return row[0] or 0.0
+
+    def date_range(self):
+        """저장된 데이터의 (첫 날짜, 마지막 날짜). 비어 있으면 (None, None)"""
+        return tuple(self._conn().execute("SELECT MIN(day), MAX(day) FROM daily_costs").fetchone())
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_analytics_store(kind="user", path=None, backend=None):
+    """경로별로 하나의 AnalyticsStore를 공유합니다 (backend 기본값: 환경 변수 TRACKER_ANALYTICS_BACKEND 또는 sqlite)."""
+    path = os.path.abspath(path or default_analytics_path(kind))
+    backend = backend or os.environ.get("TRACKER_ANALYTICS_BACKEND", "sqlite")
+    with _stores_lock:
+        store = _stores.get((path, backend))
+        if store is None:
+            store = _stores[(path, backend)] = AnalyticsStore(path, backend)
+        return store
@@ -1,21 +1,15 @@
 import json
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import matplotlib.pyplot as plt
-import os
-from dotenv import load_dotenv
-
-# 환경 변수 로드
-load_dotenv()
-openai_org_id = os.environ.get("OPENAI_ORG_KEY")
 
 from utils import (
+    load_config,
     get_total_cost,
     group_by_date,
     group_by_model,
     group_by_userID,
     build_userinfo,
+    load_userinfo,
     get_name_with_userID,
     get_userID_with_name,
     rebuild_to_cost,
@@ -25,9 +19,13 @@ from utils import (
     get_organization_users,
     calculate_project_usage,
     find_budget_overages,
+    evaluate_budgets,
+    build_project_index,
     delete_api_key,
     bulk_delete_api_keys,
-    save_project_budgets,
+    set_project_budget,
+    update_project_budgets,
+    delete_project_budget,
     load_project_budgets,
     reset_project_budgets
 )
@@ -35,6 +33,25 @@ from utils import (
 # Import Apple design system
 from components_design import load_apple_design_system, AppleComponents, AppleCharts, AppleForms, safe_plotly_chart, safe_dataframe, EnhancedComponents
 
+from analytics_store import get_analytics_store
+from records import BucketIndex
+from forecast import forecast_spend
+from logging_config import configure_logging
+
+# Streamlit은 스크립트를 반복 실행하지만 핸들러는 한 번만 설정됨
+configure_logging()
+
+# 환경 변수(.env 포함)에서 조직 ID 로드
+openai_org_id = load_config()["org_id"]
+
+
+# 예산 상태 표시 (초과 사용 관리와 동일한 기준)
+BUDGET_STATUS_LABELS = {
+    "over": "🔴 위험 (초과)",
+    "warning": "🟠 경고",
+    "caution": "🟡 주의",
+    "safe": "🟢 안전",
+}
 
 st.set_page_config(layout="wide", page_title="OpenAI Usage Tracker")
 
@@ -63,6 +80,13 @@ with st.sidebar:
 if uploaded_user_file is not None:
     try:
         st.session_state.uploaded_data = json.load(uploaded_user_file)
+        # 새 파일일 때만 분석 저장소에 반영 (Streamlit은 매 상호작용마다 스크립트를 다시 실행)
+        upload_key = (uploaded_user_file.name, uploaded_user_file.size)
+        if st.session_state.get("analytics_user_upload") != upload_key:
+            get_analytics_store("user").ingest(st.session_state.uploaded_data)
+            # 기간/월별 비교용 시간 색인
+            st.session_state.uploaded_index = BucketIndex(st.session_state.uploaded_data)
+            st.session_state.analytics_user_upload = upload_key
         with st.sidebar:
             EnhancedComponents.render_compact_sidebar_status("사용자별 데이터 업로드 완료", "success")
     except json.JSONDecodeError:
@@ -95,6 +119,25 @@ if uploaded_project_file is not None:
         with st.sidebar:
             EnhancedComponents.render_compact_sidebar_status(f"파일 오류: {str(e)[:20]}...", "error")
 
+# 업로드 대신 Costs API에서 직접 동기화 (ledger/project_ledger.json에 이어서 저장)
+with st.sidebar:
+    if st.button("🔄 Costs API에서 동기화", key="sync_costs"):
+        from cost_ledger import CostLedger
+        from usage_sync import sync as sync_costs
+
+        try:
+            with st.spinner("비용 데이터를 가져오는 중..."):
+                sync_result = sync_costs("costs")
+            st.session_state.project_usage_data = CostLedger.load(sync_result["ledger_path"]).to_export()
+            if sync_result["errors"]:
+                EnhancedComponents.render_compact_sidebar_status("일부 구간 동기화 실패", "error")
+            else:
+                EnhancedComponents.render_compact_sidebar_status(
+                    f"동기화 완료 ({sync_result['changed_rows']}개 행 반영)", "success"
+                )
+        except Exception as e:
+            EnhancedComponents.render_compact_sidebar_status(f"동기화 오류: {str(e)[:20]}...", "error")
+
 st.sidebar.markdown('</div>', unsafe_allow_html=True)
 
 
@@ -138,8 +181,7 @@ if page == "📈 전체 사용량":
         
         if not st.session_state.userinfo:
             build_userinfo()
-            with open("userinfo.json") as fp:
-                st.session_state.userinfo = json.load(fp)
+            st.session_state.userinfo = load_userinfo()
 
         data = st.session_state.uploaded_data
         
@@ -156,8 +198,21 @@ if page == "📈 전체 사용량":
         total_requests = sum(len(data["data"]) for data in data_.values() if "data" in data)
         active_users = len([uid for uid in userID if uid is not None])
         
+        # 마지막 달의 전월 같은 기간 대비 변화 (업로드 시 만든 시간 색인의 누적 합계 사용)
+        cost_change, cost_change_type = None, "neutral"
+        bucket_index = st.session_state.get("uploaded_index")
+        if bucket_index is not None:
+            month_to_date = bucket_index.month_to_date()
+            if month_to_date and month_to_date["change_rate"] is not None:
+                cost_change = (
+                    f"{month_to_date['change_rate']:+.1f}% "
+                    f"(전월 1~{month_to_date['through_day']}일 대비)"
+                )
+                change = month_to_date["change"]
+                cost_change_type = "positive" if change > 0 else "negative" if change < 0 else "neutral"
+        
         metrics = [
-            {"value": f"${total_cost:.2f}", "label": "총 비용", "icon": "💰", "change": None, "change_type": "neutral"},
+            {"value": f"${total_cost:.2f}", "label": "총 비용", "icon": "💰", "change": cost_change, "change_type": cost_change_type},
             {"value": f"{total_requests:,}", "label": "API 요청", "icon": "⚡", "change": None, "change_type": "neutral"},
             {"value": f"{active_users}", "label": "활성 사용자", "icon": "👥", "change": None, "change_type": "neutral"},
             {"value": "100%", "label": "시스템 상태", "icon": "✅", "change": None, "change_type": "positive"}
@@ -210,6 +265,29 @@ if page == "📈 전체 사용량":
             icon="👥"
         )
 
+        # 기간별 조회: 업로드 이력이 쌓인 분석 저장소에서 SQL로 집계
+        analytics = get_analytics_store("user")
+        first_day, last_day = analytics.date_range()
+        if first_day:
+            with st.expander("🗓️ 기간별 조회 (누적 데이터)"):
+                selected = st.date_input(
+                    "조회 기간",
+                    value=(pd.Timestamp(first_day).date(), pd.Timestamp(last_day).date()),
+                    key="analytics_range",
+                )
+                if isinstance(selected, (list, tuple)) and len(selected) == 2:
+                    dimension = st.radio("기준", ["user", "project", "model"], horizontal=True, key="analytics_by")
+                    totals = analytics.aggregate(
+                        dimension, start_date=selected[0].isoformat(), end_date=selected[1].isoformat()
+                    )
+                    rows = []
+                    for key, values in totals.items():
+                        label = key
+                        if dimension == "user" and key is not None:
+                            label = get_name_with_userID(key, st.session_state.userinfo) or key
+                        rows.append({"기준": label, "비용(USD)": f"${values['total_cost']:.4f}", "행 수": values["rows"]})
+                    safe_dataframe(pd.DataFrame(rows), use_container_width=True)
+
 # 사용자별 분석 페이지
 elif page == "👤 사용자별 분석":
     if st.session_state.uploaded_data is None:
@@ -226,8 +304,7 @@ elif page == "👤 사용자별 분석":
         
         if not st.session_state.userinfo:
             build_userinfo()
-            with open("userinfo.json") as fp:
-                st.session_state.userinfo = json.load(fp)
+            st.session_state.userinfo = load_userinfo()
 
         data = st.session_state.uploaded_data
         
@@ -289,7 +366,9 @@ elif page == "👤 사용자별 분석":
         chart_data = {"date": date, "model": models, "Total Usage ($)": amounts}
         df = pd.DataFrame(chart_data)
 
-        # 누적 막대그래프 생성
+        # 누적 막대그래프 생성 (plotly는 이 페이지에서만 사용하므로 필요할 때 로드)
+        import plotly.express as px
+
         fig = px.bar(
             df,
             x="date",
@@ -624,8 +703,8 @@ elif page == "💰 사용 한도 관리":
                             with col2:
                                 if st.button(f"💾 저장", key=f"save_{project_id}"):
                                     st.session_state.project_budgets[project_id] = new_budget
-                                    # 파일에 저장
-                                    if save_project_budgets(st.session_state.project_budgets):
+                                    # 저장소에 해당 프로젝트만 저장
+                                    if set_project_budget(project_id, new_budget):
                                         st.success(f"✅ {project_name} 예산이 ${new_budget:.2f}로 설정되고 저장되었습니다.")
                                     else:
                                         st.warning(f"⚠️ {project_name} 예산은 설정되었지만 파일 저장에 실패했습니다.")
@@ -634,8 +713,8 @@ elif page == "💰 사용 한도 관리":
                                 if st.button(f"🗑️ 삭제", key=f"delete_{project_id}"):
                                     if project_id in st.session_state.project_budgets:
                                         del st.session_state.project_budgets[project_id]
-                                        # 파일에 저장
-                                        if save_project_budgets(st.session_state.project_budgets):
+                                        # 저장소에서 해당 프로젝트만 삭제
+                                        if delete_project_budget(project_id):
                                             st.success(f"✅ {project_name}의 예산 설정이 삭제되고 저장되었습니다.")
                                         else:
                                             st.warning(f"⚠️ {project_name}의 예산은 삭제되었지만 파일 저장에 실패했습니다.")
@@ -664,8 +743,9 @@ elif page == "💰 사용 한도 관리":
                     budget_summary = []
                     total_budget = 0
                     
+                    project_index = build_project_index(st.session_state.budget_projects)
                     for project_id, budget in st.session_state.project_budgets.items():
-                        project_name = next((p["name"] for p in st.session_state.budget_projects if p["id"] == project_id), "Unknown")
+                        project_name = project_index[project_id]["name"] if project_id in project_index else "Unknown"
                         budget_summary.append({
                             "프로젝트": project_name,
                             "프로젝트 ID": project_id[:20] + "...",
@@ -709,11 +789,11 @@ elif page == "💰 사용 한도 관리":
                                 st.session_state.project_budgets = {}
                             
                             # 모든 활성 프로젝트에 예산 적용
-                            for project in active_projects:
-                                st.session_state.project_budgets[project["id"]] = bulk_budget
+                            bulk_budgets = {project["id"]: bulk_budget for project in active_projects}
+                            st.session_state.project_budgets.update(bulk_budgets)
                             
-                            # 파일에 저장
-                            if save_project_budgets(st.session_state.project_budgets):
+                            # 저장소에 한 트랜잭션으로 저장
+                            if update_project_budgets(bulk_budgets):
                                 st.success(f"✅ {len(active_projects)}개의 활성 프로젝트에 ${bulk_budget:.2f} 예산이 일괄 적용되고 저장되었습니다!")
                             else:
                                 st.warning(f"⚠️ {len(active_projects)}개 프로젝트에 예산이 적용되었지만 파일 저장에 실패했습니다.")
@@ -820,69 +900,65 @@ elif page == "💰 사용 한도 관리":
                 # 프로젝트별 사용량 계산 (세션 상태의 프로젝트 데이터 사용)
                 project_usage = calculate_project_usage(st.session_state.project_usage_data)
                 
-                # 예산이 설정된 프로젝트들의 모니터링 정보
-                monitoring_data = []
+                # 최근 추세로 월말 예상 사용량과 예산 소진 예정일 계산
+                # (사용량이 업로드 데이터 전체의 합계이므로 예측도 데이터 첫날부터 누적)
+                spend_forecast = forecast_spend(
+                    st.session_state.project_usage_data,
+                    budgets=st.session_state.project_budgets,
+                    period_start="all",
+                )
                 
-                for project_id, budget in st.session_state.project_budgets.items():
-                    project_name = next((p["name"] for p in st.session_state.get('budget_projects', []) if p["id"] == project_id), "Unknown")
-                    
-                    # 실제 사용량 가져오기
-                    actual_usage = 0
-                    if project_id in project_usage:
-                        actual_usage = project_usage[project_id]["total_cost"]
-                    
-                    usage_rate = (actual_usage / budget) * 100 if budget > 0 else 0
-                    
-                    # 상태 결정 (초과 사용 관리와 동일한 기준)
-                    if actual_usage > budget:
-                        status = "🔴 위험 (초과)"
-                    elif usage_rate >= 90:
-                        status = "🟠 경고"
-                    elif usage_rate >= 70:
-                        status = "🟡 주의"
-                    else:
-                        status = "🟢 안전"
-                    
-                    monitoring_data.append({
-                        "프로젝트": project_name,
-                        "예산": f"${budget:.2f}",
-                        "사용량": f"${actual_usage:.2f}",
-                        "사용률": f"{usage_rate:.1f}%",
-                        "상태": status,
-                        "남은 예산": f"${max(0, budget - actual_usage):.2f}"
-                    })
+                # 예산이 설정된 프로젝트들의 사용량/사용률/상태를 숫자로 계산 (표시할 때만 포맷)
+                evaluation = evaluate_budgets(
+                    project_usage,
+                    st.session_state.project_budgets,
+                    st.session_state.get('budget_projects', []),
+                    forecasts=spend_forecast["forecasts"],
+                )
                 
-                if monitoring_data:
+                if evaluation["projects"]:
                     # 프로젝트별 예산 대비 사용률 테이블 (전체 너비 사용)
                     st.subheader("📋 프로젝트별 예산 사용 현황")
-                    monitoring_df = pd.DataFrame(monitoring_data)
+                    monitoring_df = pd.DataFrame([
+                        {
+                            "프로젝트": entry["project_name"],
+                            "예산": f"${entry['budget']:.2f}",
+                            "사용량": f"${entry['usage']:.2f}",
+                            "사용률": f"{entry['usage_rate']:.1f}%",
+                            "상태": BUDGET_STATUS_LABELS[entry["status"]],
+                            "남은 예산": f"${entry['remaining']:.2f}",
+                            "예상 기간 말 사용량": f"${entry['projected_usage']:.2f}",
+                            "예상 사용률": f"{entry['projected_rate']:.1f}%",
+                            "예산 소진 예정일": entry["exhaustion_date"] or "-",
+                        }
+                        for entry in evaluation["projects"]
+                    ])
+                    if spend_forecast["as_of"]:
+                        st.caption(
+                            f"예상치는 {spend_forecast['as_of']}까지의 일별 비용 추세로 "
+                            f"{spend_forecast['period_end']}까지 계산했습니다."
+                        )
                     
                     # 전체 너비를 활용하여 테이블 표시
                     # Streamlit 1.12.0에서 width를 조정하는 방법
                     st.dataframe(monitoring_df, width=1200, height=400)
                     
                     # 요약 통계 (실제 데이터 기반)
-                    total_budget = sum(st.session_state.project_budgets.values())
-                    total_usage = sum(float(row["사용량"][1:]) for row in monitoring_data)  # $ 제거 후 float 변환
-                    overall_usage_rate = (total_usage / total_budget) * 100 if total_budget > 0 else 0
-                    
-                    # 초과 프로젝트 개수 계산
-                    overage_count = len([row for row in monitoring_data if "초과" in row["상태"]])
+                    overage_count = evaluation["over_count"]
                     
                     col1, col2, col3, col4 = st.columns(4)
                     with col1:
-                        st.metric("📊 총 예산", f"${total_budget:.2f}")
+                        st.metric("📊 총 예산", f"${evaluation['total_budget']:.2f}")
                     with col2:
-                        st.metric("💸 총 사용량", f"${total_usage:.2f}")
+                        st.metric("💸 총 사용량", f"${evaluation['total_usage']:.2f}")
                     with col3:
-                        st.metric("📈 전체 사용률", f"{overall_usage_rate:.1f}%")
+                        st.metric("📈 전체 사용률", f"{evaluation['usage_rate']:.1f}%")
                     with col4:
                         st.metric("🚨 초과 프로젝트", f"{overage_count}개", delta=f"-{overage_count}" if overage_count > 0 else None)
                     
                     # 경고 알림 (개수만 표시)
-                    high_usage_projects = [row for row in monitoring_data if float(row["사용률"][:-1]) >= 90]
-                    if high_usage_projects:
-                        st.error(f"⚠️ {len(high_usage_projects)}개 프로젝트가 예산의 90% 이상을 사용했습니다!")
+                    if evaluation["high_usage_count"]:
+                        st.error(f"⚠️ {evaluation['high_usage_count']}개 프로젝트가 예산의 90% 이상을 사용했습니다!")
                 else:
                     st.info("예산이 설정된 프로젝트가 없습니다.")
                     
@@ -1178,6 +1254,9 @@ elif page == "💰 사용 한도 관리":
                                     if results["failed"]:
                                         st.error(f"❌ {len(results['failed'])}개의 API 키 삭제에 실패했습니다.")
                                     
+                                    if results["skipped"]:
+                                        st.warning(f"⏱️ 시간 제한으로 {len(results['skipped'])}개의 API 키는 삭제를 시도하지 않았습니다. 다시 실행해주세요.")
+                                    
                                     # API 키 목록 새로고침
                                     from utils import get_project_api_keys
                                     updated_keys = get_project_api_keys(confirm_data["project_id"], admin_api_key)
@@ -0,0 +1,85 @@
+"""
+Batch ingestion of cost exports
+여러 개의 월별 User/Project 내보내기 파일을 프로세스 풀에서 병렬로 파싱하고 하나로 병합합니다.
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from cost_ledger import CostLedger
+
+
+def classify_export(export):
+    """내보내기 종류를 판별합니다. user_id가 있는 행이 있으면 "user", 아니면 "project"."""
+    for bucket in export.get("data", []) if isinstance(export, dict) else []:
+        for result in bucket.get("results", []):
+            if result.get("user_id"):
+                return "user"
+    return "project"
+
+
+def collect_export_files(paths):
+    """파일, 디렉터리, glob 패턴 목록을 정렬된 JSON 파일 경로 목록으로 펼칩니다."""
+    if isinstance(paths, str):
+        paths = [paths]
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "*.json")))
+        elif glob.has_magic(path):
+            files.extend(glob.glob(path))
+        else:
+            files.append(path)
+    return sorted(set(files))
+
+
+def parse_export_file(path):
+    """내보내기 파일 하나를 파싱하여 (종류, 부분 원장)을 반환합니다. 워커 프로세스에서 실행됩니다."""
+    with open(path, "r", encoding="utf-8") as f:
+        export = json.load(f)
+    ledger = CostLedger()
+    ledger.ingest(export)
+    return classify_export(export), ledger
+
+
+def ingest_export_files(paths, max_workers=None):
+    """여러 내보내기 파일을 병렬로 파싱하여 종류별로 병합된 원장을 반환합니다.
+
+    Args:
+        paths: 파일, 디렉터리 또는 glob 패턴 목록
+        max_workers: 프로세스 수 (None이면 CPU 코어 수)
+
+    Returns:
+        dict: {"user": CostLedger, "project": CostLedger} 형태의 결과 (해당 종류가 있는 경우만)
+    """
+    files = collect_export_files(paths)
+    combined = {}
+
+    if len(files) <= 1 or max_workers == 1:
+        # 파일이 하나뿐이면 프로세스 생성 비용을 피하기 위해 현재 프로세스에서 처리
+        partials = map(parse_export_file, files)
+        for kind, ledger in partials:
+            combined.setdefault(kind, CostLedger()).merge(ledger)
+        return combined
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # map은 입력 순서를 유지하므로 병합 결과가 실행마다 동일
+        for kind, ledger in executor.map(parse_export_file, files):
+            combined.setdefault(kind, CostLedger()).merge(ledger)
+    return combined
+
+
+def summarize_ledger(ledger):
+    """원장의 주요 집계를 JSON 직렬화 가능한 dict로 요약합니다."""
+    return {
+        "rows": len(ledger),
+        "buckets": len(ledger.buckets),
+        "total_cost": ledger.total_cost,
+        "cost_by_user": ledger.cost_by_user,
+        "cost_by_project": ledger.cost_by_project,
+        "cost_by_model": ledger.cost_by_model,
+        "cost_by_date": ledger.cost_by_date,
+    }
@@ -0,0 +1,6 @@
+"""
+Benchmarks
+합성 내보내기 데이터(synthetic)와 집계 함수 벤치마크(aggregation)를 제공합니다.
+
+    python -m benchmarks.aggregation --sizes=10000,1000000
+"""
@@ -0,0 +1,153 @@
+"""
+Aggregation benchmarks
+utils 집계 함수를 합성 내보내기 데이터로 측정하고 결과를 JSON으로 저장합니다.
+
+    python -m benchmarks.aggregation --sizes=10000,1000000
+    python -m benchmarks.aggregation --sizes=10000000 --compare_to=benchmarks/results/<이전 결과>.json
+"""
+
+import gc
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# 저장소 루트의 모듈(utils 등)을 불러오기 위함
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_budgets, generate_export  # noqa: E402
+from jsonio import atomic_write_json, load_json_cached  # noqa: E402
+from utils import (  # noqa: E402
+    calculate_project_usage,
+    extract_results_from_buckets,
+    find_budget_overages,
+    get_total_cost,
+    group_by_date,
+    group_by_model,
+    group_by_project_id,
+    group_by_userID,
+)
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _repeats_for(rows):
+    if rows <= 100_000:
+        return 5
+    if rows <= 1_000_000:
+        return 3
+    return 1
+
+
+def _time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_size(rows, users=200, projects=40, days=30, seed=0, repeats=None):
+    """rows개 행의 합성 데이터에서 각 집계 함수의 실행 시간을 측정합니다."""
+    repeats = repeats or _repeats_for(rows)
+    export = generate_export(rows=rows, users=users, projects=projects, days=days, seed=seed)
+    budgets = generate_budgets(export, seed=seed)
+    lines = extract_results_from_buckets(export)
+    project_usage = calculate_project_usage(lines)
+
+    cases = {
+        "extract_results_from_buckets": lambda: extract_results_from_buckets(export),
+        "group_by_date": lambda: group_by_date(lines),
+        "group_by_userID": lambda: group_by_userID(lines),
+        "group_by_model": lambda: group_by_model(lines),
+        "group_by_project_id": lambda: group_by_project_id(lines),
+        "get_total_cost": lambda: get_total_cost(lines),
+        "calculate_project_usage": lambda: calculate_project_usage(lines),
+        "find_budget_overages": lambda: find_budget_overages(project_usage, budgets),
+    }
+
+    results = []
+    for name, func in cases.items():
+        timings = _time(func, repeats)
+        best = min(timings)
+        results.append({
+            "function": name,
+            "rows": rows,
+            "repeats": repeats,
+            "seconds_min": round(best, 6),
+            "seconds_median": round(statistics.median(timings), 6),
+            "rows_per_second": round(rows / best) if best > 0 else None,
+        })
+        print(f"{rows:>10,} rows  {name:<30} {best * 1000:10.2f} ms")
+    return results
+
+
+def compare(current, baseline_path):
+    """이전 결과 파일과 비교하여 함수/크기별 속도 비율을 출력합니다 (>1이면 빨라짐)."""
+    baseline = {
+        (entry["function"], entry["rows"]): entry["seconds_min"]
+        for entry in load_json_cached(baseline_path)["results"]
+    }
+    print(f"\n기준: {baseline_path}")
+    for entry in current["results"]:
+        before = baseline.get((entry["function"], entry["rows"]))
+        if before:
+            print(f"{entry['rows']:>10,} rows  {entry['function']:<30} x{before / entry['seconds_min']:.2f}")
+
+
+def run(sizes=DEFAULT_SIZES, users=200, projects=40, days=30, seed=0, output=None, compare_to=None):
+    """벤치마크를 실행하고 결과를 JSON으로 저장합니다.
+
+    Args:
+        sizes: 측정할 행 수 목록 (예: --sizes=10000,1000000)
+        users / projects / days: 합성 데이터 매개변수
+        seed: 합성 데이터 seed
+        output: 결과 파일 경로 (기본값 benchmarks/results/aggregation-<commit>-<시각>.json)
+        compare_to: 비교할 이전 결과 파일
+    """
+    if isinstance(sizes, int):
+        sizes = (sizes,)
+    commit = _git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    report = {
+        "benchmark": "aggregation",
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"users": users, "projects": projects, "days": days, "seed": seed},
+        "results": [],
+    }
+    for rows in sizes:
+        report["results"].extend(benchmark_size(int(rows), users=users, projects=projects, days=days, seed=seed))
+
+    output = output or os.path.join(RESULTS_DIR, f"aggregation-{commit or 'nogit'}-{timestamp}.json")
+    atomic_write_json(output, report, indent=2)
+    print(f"\n저장됨: {output}")
+
+    if compare_to:
+        compare(report, compare_to)
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(run)
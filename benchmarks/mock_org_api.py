@@ -0,0 +1,283 @@
+"""
+Mock OpenAI Organization API
+오프라인 부하/지연 시간 벤치마크용 로컬 대체 서버입니다. utils가 사용하는 조직 관리 엔드포인트
+(projects, users, api_keys, rate_limits)와 usage_sync가 사용하는 costs/usage 엔드포인트를
+pagination 포함 같은 응답 형태로 제공하며, 지연 시간과 429/5xx 응답 비율, 조직 규모를 설정할 수 있습니다.
+
+    python -m benchmarks.mock_org_api --port=8100 --projects=500 --latency_ms=40 --error_rate=0.01
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python main.py ...
+"""
+
+import asyncio
+import random
+import time
+
+from benchmarks.synthetic import DAY_SECONDS, DEFAULT_MODELS, generate_results
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+RATE_LIMIT_MODELS = ("gpt-4o", "gpt-4o-mini", "gpt-4.1", "o3-mini", "text-embedding-3-small")
+
+
+class MockOrg:
+    """조직 데이터 (프로젝트, 사용자, 프로젝트별 API 키/Rate Limit)"""
+
+    def __init__(self, projects=20, users=100, keys_per_project=5, seed=0):
+        rng = random.Random(seed)
+        created = int(time.time()) - 86400 * 365
+        self.projects = [
+            {
+                "object": "organization.project",
+                "id": f"proj_{i:05d}",
+                "name": f"Project {i}",
+                "created_at": created + i,
+                "archived_at": None,
+                "status": "active",
+            }
+            for i in range(projects)
+        ]
+        self.users = [
+            {
+                "object": "organization.user",
+                "id": f"user-{i:05d}",
+                "name": f"User {i}",
+                "email": f"user{i}@example.com",
+                "role": "owner" if i == 0 else "reader",
+                "added_at": created + i,
+            }
+            for i in range(users)
+        ]
+        self.api_keys = {}
+        self.rate_limits = {}
+        for project in self.projects:
+            project_id = project["id"]
+            self.api_keys[project_id] = [
+                {
+                    "object": "organization.project.api_key",
+                    "id": f"key_{project_id}_{k:03d}",
+                    "name": f"key {k}",
+                    "redacted_value": "sk-...abcd",
+                    "created_at": created + k,
+                    "last_used_at": created + rng.randrange(86400 * 365),
+                    "owner": {"type": "user", "user": self.users[rng.randrange(len(self.users))] if self.users else None},
+                }
+                for k in range(keys_per_project)
+            ]
+            self.rate_limits[project_id] = [
+                {
+                    "object": "project.rate_limit",
+                    "id": f"rl-{model}",
+                    "model": model,
+                    "max_requests_per_1_minute": 500,
+                    "max_tokens_per_1_minute": 200_000,
+                }
+                for model in RATE_LIMIT_MODELS
+            ]
+
+
+def daily_results(org, day_start, rows_per_day, seed):
+    """하루치 비용 결과를 (project_id, line_item)별로 합산하여 생성합니다. 같은 날이면 항상 같은 값입니다."""
+    rng = random.Random(seed * 1_000_003 + day_start // DAY_SECONDS)
+    rows = generate_results(rng, rows_per_day, len(org.users), len(org.projects), DEFAULT_MODELS, "user")
+    totals = {}
+    for row in rows:
+        key = (row["project_id"], row["line_item"], row["user_id"])
+        totals[key] = totals.get(key, 0) + row["amount"]["value"]
+    return totals
+
+
+def _bucket_page(bucket_starts, limit, page, build):
+    """costs/usage 응답 형식 (page 커서 기반 pagination, 커서는 다음 버킷 번호)"""
+    start = int(page) if page else 0
+    data = [build(bucket_start) for bucket_start in bucket_starts[start:start + limit]]
+    has_more = start + limit < len(bucket_starts)
+    return {
+        "object": "page",
+        "data": data,
+        "has_more": has_more,
+        "next_page": str(start + limit) if has_more else None,
+    }
+
+
+def _page(items, limit, after):
+    """OpenAI 목록 응답 형식 (after 커서 기반 pagination)"""
+    start = 0
+    if after:
+        for index, item in enumerate(items):
+            if item["id"] == after:
+                start = index + 1
+                break
+    data = items[start:start + limit]
+    return {
+        "object": "list",
+        "data": data,
+        "first_id": data[0]["id"] if data else None,
+        "last_id": data[-1]["id"] if data else None,
+        "has_more": start + limit < len(items),
+    }
+
+
+def create_app(projects=20, users=100, keys_per_project=5, latency_ms=0.0, jitter_ms=0.0,
+               rate_limit_rate=0.0, error_rate=0.0, seed=0, rows_per_day=200):
+    """설정된 조직 규모와 장애 특성을 가진 모의 API 앱을 생성합니다.
+
+    Args:
+        projects / users / keys_per_project: 조직 규모
+        latency_ms / jitter_ms: 응답마다 추가할 지연 시간 (평균, 균등 분포 폭)
+        rate_limit_rate: 429 응답 비율 (Retry-After: 0)
+        error_rate: 503 응답 비율
+        seed: 데이터 및 장애 주입 난수 seed
+        rows_per_day: costs/usage 엔드포인트가 하루에 생성할 결과 행 수 (합산 전)
+    """
+    org = MockOrg(projects=projects, users=users, keys_per_project=keys_per_project, seed=seed)
+    rng = random.Random(seed)
+    app = FastAPI(title="Mock OpenAI Organization API")
+    app.state.org = org
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        delay = latency_ms + (rng.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": "0"},
+            )
+        if roll < rate_limit_rate + error_rate:
+            return JSONResponse({"error": {"message": "Service unavailable", "type": "server_error"}}, status_code=503)
+        return await call_next(request)
+
+    def _check_auth(authorization):
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Missing bearer token")
+
+    def _project_or_404(project_id):
+        if project_id not in org.api_keys:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+    @app.get("/v1/organization/projects")
+    async def list_projects(limit: int = 20, after: str = None, authorization: str = Header(None)):
+        _check_auth(authorization)
+        return _page(org.projects, limit, after)
+
+    @app.get("/v1/organization/users")
+    async def list_users(limit: int = 20, after: str = None, authorization: str = Header(None)):
+        _check_auth(authorization)
+        return _page(org.users, limit, after)
+
+    @app.get("/v1/organization/projects/{project_id}/api_keys")
+    async def list_api_keys(project_id: str, limit: int = 20, after: str = None, authorization: str = Header(None)):
+        _check_auth(authorization)
+        _project_or_404(project_id)
+        return _page(org.api_keys[project_id], limit, after)
+
+    @app.delete("/v1/organization/projects/{project_id}/api_keys/{key_id}")
+    async def delete_api_key(project_id: str, key_id: str, authorization: str = Header(None)):
+        _check_auth(authorization)
+        _project_or_404(project_id)
+        keys = org.api_keys[project_id]
+        for index, key in enumerate(keys):
+            if key["id"] == key_id:
+                del keys[index]
+                return {"object": "organization.project.api_key.deleted", "id": key_id, "deleted": True}
+        raise HTTPException(status_code=404, detail="API key not found")
+
+    @app.get("/v1/organization/projects/{project_id}/rate_limits")
+    async def list_rate_limits(project_id: str, limit: int = 100, after: str = None, authorization: str = Header(None)):
+        _check_auth(authorization)
+        _project_or_404(project_id)
+        return _page(org.rate_limits[project_id], limit, after)
+
+    @app.post("/v1/organization/projects/{project_id}/rate_limits/{rate_limit_id}")
+    async def update_rate_limit(project_id: str, rate_limit_id: str, request: Request, authorization: str = Header(None)):
+        _check_auth(authorization)
+        _project_or_404(project_id)
+        body = await request.json()
+        for limit in org.rate_limits[project_id]:
+            if limit["id"] == rate_limit_id:
+                for field in ("max_requests_per_1_minute", "max_tokens_per_1_minute"):
+                    if field in body:
+                        limit[field] = body[field]
+                return limit
+        raise HTTPException(status_code=404, detail="Rate limit not found")
+
+    def _bucket_starts(start_time, end_time):
+        first = start_time // DAY_SECONDS * DAY_SECONDS
+        end = end_time if end_time is not None else int(time.time())
+        return list(range(first, end, DAY_SECONDS))
+
+    @app.get("/v1/organization/costs")
+    async def costs(start_time: int, end_time: int = None, limit: int = 7, page: str = None,
+                    authorization: str = Header(None)):
+        _check_auth(authorization)
+
+        def build(bucket_start):
+            totals = {}
+            for (project_id, line_item, _), value in daily_results(org, bucket_start, rows_per_day, seed).items():
+                totals[(project_id, line_item)] = totals.get((project_id, line_item), 0) + value
+            return {
+                "object": "bucket",
+                "start_time": bucket_start,
+                "end_time": bucket_start + DAY_SECONDS,
+                "results": [
+                    {
+                        "object": "organization.costs.result",
+                        "amount": {"value": round(value, 8), "currency": "usd"},
+                        "line_item": line_item,
+                        "project_id": project_id,
+                    }
+                    for (project_id, line_item), value in sorted(totals.items())
+                ],
+            }
+
+        return _bucket_page(_bucket_starts(start_time, end_time), min(limit, 180), page, build)
+
+    @app.get("/v1/organization/usage/completions")
+    async def usage_completions(start_time: int, end_time: int = None, limit: int = 7, page: str = None,
+                                authorization: str = Header(None)):
+        _check_auth(authorization)
+
+        def build(bucket_start):
+            totals = {}
+            for (project_id, line_item, user_id), value in daily_results(org, bucket_start, rows_per_day, seed).items():
+                key = (user_id, project_id, line_item.split(",")[0])
+                totals[key] = totals.get(key, 0) + value
+            return {
+                "object": "bucket",
+                "start_time": bucket_start,
+                "end_time": bucket_start + DAY_SECONDS,
+                "results": [
+                    {
+                        "object": "organization.usage.completions.result",
+                        # 비용에 비례하는 가상의 토큰/요청 수
+                        "input_tokens": int(value * 200_000),
+                        "output_tokens": int(value * 50_000),
+                        "num_model_requests": max(1, int(value * 100)),
+                        "user_id": user_id,
+                        "project_id": project_id,
+                        "model": model,
+                    }
+                    for (user_id, project_id, model), value in sorted(totals.items())
+                ],
+            }
+
+        return _bucket_page(_bucket_starts(start_time, end_time), min(limit, 31), page, build)
+
+    return app
+
+
+def run(host="127.0.0.1", port=8100, **options):
+    """모의 서버를 실행합니다. options는 create_app 인자와 같습니다."""
+    import uvicorn
+
+    uvicorn.run(create_app(**options), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(run)
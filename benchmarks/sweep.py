@@ -0,0 +1,128 @@
+"""
+End-to-end sweep benchmarks
+로컬 모의 조직 API(mock_org_api)를 백그라운드에서 실행하고 utils의 조직 관리 함수(전체 조회/삭제)를
+실제 HTTP로 호출하여 측정합니다. 같은 설정과 seed이면 재현 가능한 결과를 얻습니다.
+
+    python -m benchmarks.sweep --projects=200 --latency_ms=20 --rate_limit_rate=0.02
+"""
+
+import os
+import platform
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.aggregation import RESULTS_DIR, _git_commit  # noqa: E402
+from benchmarks.mock_org_api import create_app  # noqa: E402
+from jsonio import atomic_write_json  # noqa: E402
+from metrics import UPSTREAM_REQUESTS, UPSTREAM_RETRIES  # noqa: E402
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(**options):
+    """모의 서버를 백그라운드 스레드에서 실행하고 (server, base_url)을 반환합니다."""
+    import uvicorn
+
+    port = _free_port()
+    config = uvicorn.Config(create_app(**options), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("모의 서버를 시작하지 못했습니다.")
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}/v1"
+
+
+def _upstream_totals():
+    requests_total = sum(UPSTREAM_REQUESTS.samples().values())
+    retries_total = sum(UPSTREAM_RETRIES.samples().values())
+    return requests_total, retries_total
+
+
+def run(projects=50, users=200, keys_per_project=5, latency_ms=20.0, jitter_ms=5.0,
+        rate_limit_rate=0.0, error_rate=0.0, delete_keys=20, seed=0, output=None):
+    """모의 서버를 대상으로 조직 관리 sweep을 실행하고 결과를 JSON으로 저장합니다."""
+    from logging_config import configure_logging
+
+    configure_logging(level="ERROR")
+    server, base_url = start_mock_server(
+        projects=projects, users=users, keys_per_project=keys_per_project, latency_ms=latency_ms,
+        jitter_ms=jitter_ms, rate_limit_rate=rate_limit_rate, error_rate=error_rate, seed=seed,
+    )
+    # utils는 첫 API 호출 시점에 설정을 읽으므로 import 전에 지정
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("OPENAI_ORG_KEY", "org-benchmark")
+    import utils
+
+    def delete_sweep():
+        org = server.config.app.state.org
+        targets = [
+            (project_id, key["id"], key["name"])
+            for project_id, keys in org.api_keys.items()
+            for key in keys
+        ][:delete_keys]
+        return utils.bulk_delete_api_keys(targets)
+
+    cases = {
+        "list_organization_projects": utils.list_organization_projects,
+        "get_organization_users": utils.get_organization_users,
+        "list_api_keys": utils.list_api_keys,
+        "get_all_projects_rate_limits": utils.get_all_projects_rate_limits,
+        "bulk_delete_api_keys": delete_sweep,
+    }
+
+    results = []
+    try:
+        for name, func in cases.items():
+            before_requests, before_retries = _upstream_totals()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            after_requests, after_retries = _upstream_totals()
+            results.append({
+                "sweep": name,
+                "seconds": round(elapsed, 6),
+                "upstream_requests": after_requests - before_requests,
+                "retries": after_retries - before_retries,
+            })
+            print(f"{name:<30} {elapsed * 1000:10.1f} ms  요청 {after_requests - before_requests}회")
+    finally:
+        server.should_exit = True
+
+    commit = _git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "benchmark": "sweep",
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "projects": projects, "users": users, "keys_per_project": keys_per_project,
+            "latency_ms": latency_ms, "jitter_ms": jitter_ms, "rate_limit_rate": rate_limit_rate,
+            "error_rate": error_rate, "delete_keys": delete_keys, "seed": seed,
+        },
+        "results": results,
+    }
+    output = output or os.path.join(RESULTS_DIR, f"sweep-{commit or 'nogit'}-{timestamp}.json")
+    atomic_write_json(output, report, indent=2)
+    print(f"\n저장됨: {output}")
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(run)
@@ -0,0 +1,112 @@
+"""
+Synthetic cost exports
+OpenAI Usage > Cost 내보내기와 같은 data[].results[] 버킷 구조의 합성 데이터를 생성합니다.
+react-app/src/utils/dataProcessor.ts의 generateSampleData와 같은 형태이지만,
+사용자/프로젝트/모델/일 수/행 수를 지정할 수 있고 seed가 같으면 항상 같은 데이터를 만듭니다.
+"""
+
+import random
+
+DAY_SECONDS = 86400
+# 2025-01-01 00:00:00 UTC
+DEFAULT_START = 1735689600
+
+DEFAULT_MODELS = (
+    "gpt-4o-2024-08-06",
+    "gpt-4o-mini-2024-07-18",
+    "gpt-4.1-2025-04-14",
+    "o3-mini-2025-01-31",
+    "text-embedding-3-small",
+    "gpt-3.5-turbo-0125",
+)
+
+
+def _weights(count, skew):
+    # 실제 조직처럼 소수의 사용자/프로젝트가 대부분의 비용을 차지하도록 Zipf 형태 가중치 사용
+    return [1 / (i + 1) ** skew for i in range(count)]
+
+
+def generate_results(rng, count, users, projects, models, kind):
+    """버킷 하나에 들어갈 결과 행 count개를 생성합니다."""
+    user_ids = [f"user-{i:05d}" for i in range(users)]
+    project_ids = [f"proj_{i:05d}" for i in range(projects)]
+    user_weights = _weights(users, 1.1)
+    project_weights = _weights(projects, 0.9)
+
+    picked_users = rng.choices(user_ids, user_weights, k=count)
+    picked_projects = rng.choices(project_ids, project_weights, k=count)
+    picked_models = rng.choices(models, k=count)
+
+    results = []
+    for user_id, project_id, model in zip(picked_users, picked_projects, picked_models):
+        direction = "input" if rng.random() < 0.6 else "output"
+        result = {
+            "object": "organization.costs.result",
+            "amount": {"value": round(rng.lognormvariate(-4.0, 1.5), 8), "currency": "usd"},
+            "line_item": f"{model}, {direction}",
+            "project_id": project_id,
+        }
+        if kind == "user":
+            result["user_id"] = user_id
+        results.append(result)
+    return results
+
+
+def generate_export(rows=10_000, users=50, projects=10, models=DEFAULT_MODELS, days=30,
+                    kind="user", seed=0, start_time=DEFAULT_START, pool_size=100_000):
+    """일 단위 버킷 days개에 총 rows개의 결과를 고르게 나눈 내보내기 데이터를 생성합니다.
+
+    Args:
+        rows: 전체 결과 행 수
+        users / projects: 사용자/프로젝트 수
+        models: 모델 이름 목록 (line_item은 "<모델>, input|output")
+        days: 버킷(일) 수
+        kind: "user"이면 user_id 포함, "project"이면 project_id만 포함
+        seed: 난수 seed
+        start_time: 첫 버킷의 시작 시각 (unix time)
+        pool_size: 서로 다른 결과 dict 수. rows가 이보다 크면 같은 dict를 여러 번 참조하여
+                   1천만 행도 메모리에 올릴 수 있게 합니다 (집계 함수는 결과를 수정하지 않음).
+                   None이면 모든 행을 새로 만듭니다.
+
+    Returns:
+        dict: {"object": "page", "data": [bucket, ...], "has_more": False, "next_page": None}
+    """
+    rng = random.Random(seed)
+    models = tuple(models)
+    distinct = rows if pool_size is None else min(rows, pool_size)
+    pool = generate_results(rng, distinct, users, projects, models, kind)
+
+    per_day, remainder = divmod(rows, days)
+    buckets = []
+    offset = 0
+    for day in range(days):
+        count = per_day + (1 if day < remainder else 0)
+        if pool_size is None or rows <= pool_size:
+            results = pool[offset:offset + count]
+        else:
+            start = offset % distinct
+            results = [pool[(start + i) % distinct] for i in range(count)]
+        offset += count
+        bucket_start = start_time + day * DAY_SECONDS
+        buckets.append({
+            "object": "bucket",
+            "start_time": bucket_start,
+            "end_time": bucket_start + DAY_SECONDS,
+            "results": results,
+        })
+    return {"object": "page", "data": buckets, "has_more": False, "next_page": None}
+
+
+def generate_budgets(export, fraction=0.5, seed=0):
+    """내보내기 데이터의 프로젝트 일부에 실제 비용의 50~150% 예산을 설정합니다 (일부는 초과)."""
+    rng = random.Random(seed)
+    costs = {}
+    for bucket in export["data"]:
+        for result in bucket["results"]:
+            project_id = result.get("project_id")
+            costs[project_id] = costs.get(project_id, 0) + result["amount"]["value"]
+    budgets = {}
+    for project_id, cost in sorted(costs.items()):
+        if rng.random() < fraction:
+            budgets[project_id] = round(cost * rng.uniform(0.5, 1.5), 2)
+    return budgets
@@ -0,0 +1,297 @@
+"""
+Budget watcher
+비용 내보내기 파일을 주기적으로 원장에 반영하고, 새 비용이 생긴 프로젝트만 예산과 비교하여
+70/90/100% 임계값을 새로 넘으면 알림을 보냅니다. 알림은 큐(같은 프로세스), 웹훅(로컬 HTTP),
+로그로 보낼 수 있습니다.
+
+    python main.py watch exports/ --interval=60 --webhook=http://127.0.0.1:9000/alerts
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from batch_ingest import collect_export_files
+from cost_ledger import CostLedger
+from logging_config import get_logger
+from metrics import BUDGET_ALERTS, WATCH_CYCLE_SECONDS, WATCH_DIRTY_PROJECTS
+from records import bucket_date
+
+logger = get_logger("watcher")
+
+DEFAULT_THRESHOLDS = (70, 90, 100)
+STATE_META_KEY = "budget_watcher_state"
+
+
+class QueueSink:
+    """알림을 queue.Queue에 넣습니다. 같은 프로세스의 다른 스레드가 소비합니다."""
+
+    def __init__(self, maxsize=10000):
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def send(self, alert):
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            logger.warning("알림 큐가 가득 차 알림을 버렸습니다: %s", alert["project_id"])
+            return False
+        return True
+
+
+class WebhookSink:
+    """알림을 JSON으로 로컬 웹훅 URL에 POST합니다."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        import requests
+
+        try:
+            response = requests.post(self.url, json=alert, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.error("웹훅 전송 실패 (%s): %s", self.url, e)
+            return False
+        if response.status_code >= 400:
+            logger.error("웹훅 응답 오류 (%s): %s", self.url, response.status_code)
+            return False
+        return True
+
+
+class LogSink:
+    """알림을 로그로 남깁니다."""
+
+    def send(self, alert):
+        logger.warning(
+            "예산 %s%% 도달: %s 사용 $%.2f / 예산 $%.2f (%.1f%%)",
+            alert["threshold"], alert["project_id"], alert["usage"], alert["budget"], alert["usage_rate"],
+        )
+        return True
+
+
+def crossed_threshold(usage, budget, thresholds=DEFAULT_THRESHOLDS):
+    """사용량이 넘은 가장 높은 임계값 (없으면 0)
+
+    100% 미만 임계값은 도달하면(>=) 넘은 것으로 봅니다 (budget_status의 warning/caution과 동일).
+    100% 이상 임계값은 budget_status의 "over"와 같이 예산을 초과해야(>) 넘은 것으로 봅니다.
+    """
+    usage_rate = usage / budget * 100
+    level = 0
+    for threshold in thresholds:
+        if usage > budget * threshold / 100 if threshold >= 100 else usage_rate >= threshold:
+            level = threshold
+    return level
+
+
+class BudgetWatcher:
+    """원장을 유지하며 주기마다 변경된 프로젝트만 예산과 비교합니다.
+
+    Args:
+        sources: 내보내기 파일/디렉터리/glob 목록 (수정 시각과 크기가 바뀐 파일만 다시 읽음)
+        ledger_path: 원장 저장 경로 (None이면 메모리에만 보관)
+        sinks: send(alert)를 가진 알림 대상 목록 (기본값 LogSink)
+        thresholds: 알림 임계값 (%)
+        period: "month"이면 원장의 최신 월 비용, "all"이면 원장 전체 비용을 예산과 비교
+        budgets_loader: {project_id: budget}를 반환하는 함수 (기본값 utils.load_project_budgets)
+        store: 알림 상태를 저장할 SettingsStore (None이면 settings_store.get_store())
+        save_interval: 원장 파일 저장 최소 간격(초). 전체 원장을 다시 쓰므로 매 주기 저장하지 않음
+    """
+
+    def __init__(self, sources=(), ledger_path=None, sinks=None, thresholds=DEFAULT_THRESHOLDS,
+                 period="month", budgets_loader=None, store=None, save_interval=300.0):
+        if period not in ("month", "all"):
+            raise ValueError(f"알 수 없는 period: {period}")
+        self.sources = sources
+        self.ledger_path = ledger_path
+        self.sinks = list(sinks) if sinks else [LogSink()]
+        self.thresholds = tuple(sorted(thresholds))
+        self.period = period
+        if budgets_loader is None:
+            from utils import load_project_budgets as budgets_loader
+        self.budgets_loader = budgets_loader
+        if store is None:
+            from settings_store import get_store
+
+            store = get_store()
+        self.store = store
+
+        self.save_interval = save_interval
+        self.ledger = CostLedger.load(ledger_path) if ledger_path else CostLedger()
+        self._unsaved = False
+        self._last_save = time.monotonic()
+        self._seen_files = {}  # 경로 -> (mtime_ns, size)
+        self._budgets = {}
+        self._levels = self._load_state()  # 기간 -> {project_id: 마지막으로 알린 임계값}
+        self._stop = threading.Event()
+
+    def _load_state(self):
+        raw = self.store.get_meta(STATE_META_KEY)
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            logger.warning("감시 상태를 읽을 수 없어 초기화합니다.")
+            return {}
+
+    def _save_state(self):
+        self.store.set_meta(STATE_META_KEY, json.dumps(self._levels))
+
+    def _changed_files(self):
+        changed = []
+        for path in collect_export_files(self.sources) if self.sources else []:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._seen_files.get(path) != signature:
+                self._seen_files[path] = signature
+                changed.append(path)
+        return changed
+
+    def ingest(self, export):
+        """내보내기 데이터를 원장에 반영합니다 (API 동기화 등 파일 외 입력용)."""
+        return self.ledger.ingest(export)
+
+    def _ingest_files(self):
+        changed = 0
+        for path in self._changed_files():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    changed += self.ledger.ingest(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error("내보내기 파일을 읽을 수 없습니다 (%s): %s", path, e)
+        return changed
+
+    def _period_key(self):
+        latest = self.ledger._latest_start
+        if self.period == "all" or latest is None:
+            return "all"
+        return bucket_date(self.ledger.buckets[latest])[:7]
+
+    def _usage(self, project_id, period_key):
+        if period_key == "all":
+            return self.ledger.cost_by_project.get(project_id, 0)
+        return self.ledger.project_month_cost(project_id, period_key)
+
+    def _dirty_budget_projects(self, budgets):
+        # 예산이 추가/변경/삭제된 프로젝트도 다시 평가
+        changed = {
+            project_id for project_id in budgets.keys() | self._budgets.keys()
+            if budgets.get(project_id) != self._budgets.get(project_id)
+        }
+        self._budgets = dict(budgets)
+        return changed
+
+    def evaluate(self, project_ids):
+        """주어진 프로젝트를 예산과 비교하여 새로 넘은 임계값의 알림 목록을 반환합니다."""
+        from utils import budget_status
+
+        period_key = self._period_key()
+        if period_key not in self._levels:
+            # 새 기간이 시작되면 지난 기간의 알림 기록은 버림
+            self._levels = {period_key: {}}
+        levels = self._levels[period_key]
+        alerts = []
+        state_changed = False
+        for project_id in project_ids:
+            budget = self._budgets.get(project_id)
+            if not budget or budget <= 0:
+                if levels.pop(project_id, None) is not None:
+                    state_changed = True
+                continue
+            usage = self._usage(project_id, period_key)
+            usage_rate = usage / budget * 100
+            level = crossed_threshold(usage, budget, self.thresholds)
+            previous = levels.get(project_id, 0)
+            if level == previous:
+                continue
+            # 예산 증액 등으로 내려간 경우 알림 없이 기록만 낮춰 다시 넘으면 알림
+            levels[project_id] = level
+            state_changed = True
+            if level < previous:
+                continue
+            alerts.append({
+                "project_id": project_id,
+                "period": period_key,
+                "threshold": level,
+                "previous_threshold": previous,
+                "budget": budget,
+                "usage": usage,
+                "usage_rate": usage_rate,
+                "status": budget_status(usage, budget, usage_rate),
+                "at": datetime.now(timezone.utc).isoformat(),
+            })
+        if state_changed:
+            self._save_state()
+        return alerts
+
+    def _emit(self, alert):
+        for sink in self.sinks:
+            try:
+                ok = sink.send(alert)
+            except Exception as e:
+                logger.error("알림 전송 실패 (%s): %s", type(sink).__name__, e)
+                ok = False
+            BUDGET_ALERTS.inc(str(alert["threshold"]), "ok" if ok else "error")
+
+    def cycle(self):
+        """한 주기: 새 내보내기 반영 -> 변경된 프로젝트만 평가 -> 알림 전송. 알림 목록을 반환합니다."""
+        start = time.perf_counter()
+        changed_rows = self._ingest_files()
+        dirty = self.ledger.take_dirty_projects()
+        dirty |= self._dirty_budget_projects(self.budgets_loader())
+        alerts = self.evaluate(dirty) if dirty else []
+        for alert in alerts:
+            self._emit(alert)
+        if changed_rows:
+            self._unsaved = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.flush()
+
+        elapsed = time.perf_counter() - start
+        WATCH_CYCLE_SECONDS.observe(elapsed)
+        WATCH_DIRTY_PROJECTS.observe(len(dirty))
+        logger.debug(
+            "감시 주기: %d개 행 반영, %d개 프로젝트 평가, 알림 %d건 (%.3fs)",
+            changed_rows, len(dirty), len(alerts), elapsed,
+        )
+        return alerts
+
+    def flush(self):
+        """반영했지만 저장하지 않은 원장을 파일로 저장합니다."""
+        if self._unsaved and self.ledger_path:
+            self.ledger.save(self.ledger_path)
+        self._unsaved = False
+        self._last_save = time.monotonic()
+
+    def run(self, interval=60.0, cycles=None):
+        """stop()이 호출되거나 cycles번 실행할 때까지 interval초마다 cycle()을 실행합니다."""
+        count = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.cycle()
+                except Exception:
+                    logger.exception("감시 주기 실패")
+                count += 1
+                if cycles is not None and count >= cycles:
+                    break
+                self._stop.wait(interval)
+        finally:
+            self.flush()
+
+    def start(self, interval=60.0):
+        """백그라운드 데몬 스레드에서 run()을 시작합니다."""
+        self._stop.clear()
+        thread = threading.Thread(target=self.run, args=(interval,), name="budget-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
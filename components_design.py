@@ -3,10 +3,9 @@ Enhanced UI Components for OpenAI Usage Tracker
 Aesthetic improvements while maintaining functionality
 """
 
+import re
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
@@ -29,10 +28,8 @@ def safe_plotly_chart(fig, **kwargs):
         safe_kwargs = {k: v for k, v in kwargs.items() if k not in ['use_container_width']}
         return st.plotly_chart(fig, **safe_kwargs)
 
-def load_apple_design_system():
-    """Load Apple-style design system with premium aesthetics"""
-    css = """
-    <style>
+# Apple design system stylesheet (source form; minified once at import below)
+_APPLE_DESIGN_CSS = """
     /* Apple System Fonts - San Francisco inspired */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -1296,8 +1293,19 @@ def load_apple_design_system():
         color: var(--text-secondary);
         margin: 0.25rem 0 0 0;
     }
-    </style>
-    
+"""
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace in a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+# Dark theme detection script (kept from the original inline markup)
+_THEME_SCRIPT = """
     <script>
     // JavaScript for comprehensive dark theme detection
     (function() {
@@ -1357,8 +1365,20 @@ def load_apple_design_system():
         setInterval(updateTheme, 1000);
     })();
     </script>
+"""
+
+# Precomputed once per process so reruns never re-process the stylesheet
+_APPLE_DESIGN_CSS_MIN = _minify_css(_APPLE_DESIGN_CSS)
+_APPLE_DESIGN_MARKUP = f"<style>{_APPLE_DESIGN_CSS_MIN}</style>\n{_THEME_SCRIPT}"
+
+
+def load_apple_design_system():
+    """Load Apple-style design system with premium aesthetics
+
+    Emits the precomputed minified stylesheet and the theme script inline. Streamlit
+    drops elements that a rerun does not emit again, so this runs on every rerun.
     """
-    st.markdown(css, unsafe_allow_html=True)
+    st.markdown(_APPLE_DESIGN_MARKUP, unsafe_allow_html=True)
 
 
 def load_enhanced_css():
@@ -1869,8 +1889,10 @@ class AppleCharts:
     """Enhanced chart components with better aesthetics"""
     
     @staticmethod
-    def create_usage_dashboard_chart(data: pd.DataFrame, title: str = "Usage Overview") -> go.Figure:
+    def create_usage_dashboard_chart(data: pd.DataFrame, title: str = "Usage Overview") -> "go.Figure":
         """Create enhanced usage dashboard chart"""
+        import plotly.express as px  # loaded on demand to keep app startup light
+
         fig = px.bar(
             data, 
             x="date", 
@@ -1918,8 +1940,10 @@ class AppleCharts:
         return fig
     
     @staticmethod
-    def create_budget_overview_chart(budget_data: Dict, usage_data: Dict) -> go.Figure:
+    def create_budget_overview_chart(budget_data: Dict, usage_data: Dict) -> "go.Figure":
         """Create enhanced budget vs usage chart"""
+        import plotly.graph_objects as go  # loaded on demand to keep app startup light
+
         projects = list(budget_data.keys())
         budgets = list(budget_data.values())
         usage = [usage_data.get(p, 0) for p in projects]
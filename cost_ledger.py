@@ -0,0 +1,256 @@
+"""
+Incremental cost ledger
+매일 내려받는 비용 내보내기(export)를 누적 저장하고, 새로 들어온 행만 집계에 반영합니다.
+"""
+
+import json
+import os
+
+from jsonio import atomic_write_json
+from records import UsageRow, bucket_date
+
+
+def row_cost(row):
+    """행의 비용(amount.value)을 안전하게 가져옵니다. NaN/None은 0으로 처리합니다."""
+    amount = row.get("amount")
+    if not isinstance(amount, dict):
+        return 0
+    cost = amount.get("value")
+    if cost is None or (isinstance(cost, float) and cost != cost):
+        return 0
+    return cost
+
+
+def _user_of(row):
+    user_id = row.get("user_id")
+    return "unknown_user" if user_id is None or user_id == "" else user_id
+
+
+def _project_of(row):
+    project_id = row.get("project_id")
+    return "no_project" if project_id is None or project_id == "" else project_id
+
+
+def _model_of(row):
+    return (row.get("line_item") or "").split(",")[0].strip()
+
+
+def _add(totals, key, value):
+    totals[key] = totals.get(key, 0) + value
+
+
+class CostLedger:
+    """비용 내보내기를 버킷 단위로 보관하며 집계를 제자리(in place)에서 갱신합니다.
+
+    이미 저장된 start_time의 버킷은 건너뛰고, 가장 최근 버킷(진행 중일 수 있는 당일 버킷)만
+    새 내보내기의 같은 버킷으로 교체합니다. 따라서 일일 갱신 비용은 전체 이력이 아닌 새 행 수에 비례합니다.
+    한 버킷 안에서 (사용자, 프로젝트, line_item)이 같은 행도 서로 다른 사용 내역(예: 다른 API 키)이므로
+    모두 보관합니다.
+    """
+
+    def __init__(self):
+        self.buckets = {}  # start_time -> 저장된 버킷
+        self._row_count = 0
+        self._latest_start = None
+
+        self.total_cost = 0
+        self.cost_by_date = {}
+        self.cost_by_user = {}
+        self.cost_by_project = {}
+        self.cost_by_model = {}
+        # (YYYY-MM, project_id) -> 비용. 월별 예산 비교용
+        self.cost_by_project_month = {}
+        # 마지막 take_dirty_projects 이후 비용이 바뀐 프로젝트
+        self.dirty_projects = set()
+
+    def __len__(self):
+        return self._row_count
+
+    def _apply(self, row, sign):
+        cost = row_cost(row) * sign
+        self.total_cost += cost
+        _add(self.cost_by_date, row["date"], cost)
+        _add(self.cost_by_user, _user_of(row), cost)
+        project = _project_of(row)
+        _add(self.cost_by_project, project, cost)
+        _add(self.cost_by_project_month, (row["date"][:7], project), cost)
+        _add(self.cost_by_model, _model_of(row), cost)
+        self.dirty_projects.add(project)
+
+    def _merge_bucket(self, bucket, append=False):
+        """버킷의 행을 반영합니다. 이미 저장된 버킷이면 행 전체를 새 행으로 교체하고,
+        append이면(같은 내보내기에서 같은 버킷이 나뉘어 온 경우) 기존 행 뒤에 추가합니다.
+        """
+        start = bucket["start_time"]
+        incoming = list(bucket["results"])
+        stored = self.buckets.get(start)
+        if stored is None:
+            stored = {
+                "object": bucket.get("object", "bucket"),
+                "start_time": start,
+                "end_time": bucket.get("end_time"),
+                "results": [],
+            }
+            self.buckets[start] = stored
+            if self._latest_start is None or start > self._latest_start:
+                self._latest_start = start
+
+        date = bucket_date(stored)
+        results = stored["results"]
+        if results and not append:
+            if results == incoming:
+                return 0
+            # 진행 중인 버킷이 갱신된 경우: 이전 행을 모두 빼고 새 행으로 교체
+            for previous in results:
+                self._apply(UsageRow(previous, stored, date), -1)
+            self._row_count -= len(results)
+            results.clear()
+        for result in incoming:
+            results.append(result)
+            self._apply(UsageRow(result, stored, date), 1)
+        self._row_count += len(incoming)
+        return len(incoming)
+
+    def ingest(self, export):
+        """새 내보내기 데이터를 병합하고, 추가되거나 교체된 행 수를 반환합니다."""
+        if isinstance(export, dict):
+            buckets = export.get("data", [])
+        else:
+            buckets = export or []
+
+        latest = self._latest_start
+        seen = set()
+        changed = 0
+        for bucket in buckets:
+            if not isinstance(bucket, dict) or "results" not in bucket or "start_time" not in bucket:
+                continue
+            start = bucket["start_time"]
+            if start in seen:
+                # 같은 내보내기 안에서 나뉘어 온 같은 버킷은 이어 붙임
+                changed += self._merge_bucket(bucket, append=True)
+                continue
+            # 이미 저장된 닫힌 버킷은 다시 처리하지 않음
+            if start in self.buckets and start != latest:
+                continue
+            seen.add(start)
+            changed += self._merge_bucket(bucket)
+        return changed
+
+    def merge(self, other):
+        """다른 원장(예: 병렬 파싱된 부분 결과)을 이 원장에 합칩니다.
+
+        버킷이 겹치지 않으면 집계값을 그대로 더하고, 겹치는 버킷은 other의 버킷으로 교체합니다.
+        """
+        if self.buckets.keys().isdisjoint(other.buckets):
+            self.buckets.update(other.buckets)
+            self._row_count += other._row_count
+            if other._latest_start is not None and (
+                self._latest_start is None or other._latest_start > self._latest_start
+            ):
+                self._latest_start = other._latest_start
+            self.total_cost += other.total_cost
+            for mine, theirs in (
+                (self.cost_by_date, other.cost_by_date),
+                (self.cost_by_user, other.cost_by_user),
+                (self.cost_by_project, other.cost_by_project),
+                (self.cost_by_model, other.cost_by_model),
+                (self.cost_by_project_month, other.cost_by_project_month),
+            ):
+                for key, value in theirs.items():
+                    _add(mine, key, value)
+            self.dirty_projects.update(other.cost_by_project)
+            return len(other)
+
+        changed = 0
+        for bucket in other.sorted_buckets():
+            changed += self._merge_bucket(bucket)
+        return changed
+
+    def take_dirty_projects(self):
+        """마지막 호출 이후 비용이 바뀐 프로젝트 집합을 반환하고 초기화합니다."""
+        dirty, self.dirty_projects = self.dirty_projects, set()
+        return dirty
+
+    def project_month_cost(self, project_id, month):
+        """프로젝트의 월(YYYY-MM) 비용"""
+        return self.cost_by_project_month.get((month, project_id), 0)
+
+    def sorted_buckets(self):
+        """start_time 순으로 정렬된 버킷 목록을 반환합니다."""
+        return [self.buckets[start] for start in sorted(self.buckets)]
+
+    def rows(self):
+        """저장된 모든 행을 UsageRow 목록으로 반환합니다 (utils 집계 함수에 그대로 사용 가능)."""
+        rows = []
+        for bucket in self.sorted_buckets():
+            date = bucket_date(bucket)
+            rows.extend(UsageRow(result, bucket, date) for result in bucket["results"])
+        return rows
+
+    def to_export(self):
+        """OpenAI 비용 내보내기와 동일한 data[].results[] 구조로 변환합니다."""
+        return {"object": "page", "data": self.sorted_buckets()}
+
+    def save(self, path, snapshots=1):
+        """원장을 내보내기 JSON 형식으로 원자적으로 저장합니다 (직전 버전은 스냅샷으로 보관)."""
+        atomic_write_json(path, self.to_export(), snapshots=snapshots)
+
+    @classmethod
+    def load(cls, path):
+        """저장된 원장을 불러옵니다. 파일이 없으면 빈 원장을 반환합니다."""
+        ledger = cls()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                ledger.ingest(json.load(f))
+        return ledger
+
+
+# Usage API(/organization/usage/completions) 결과 행의 숫자 항목
+USAGE_FIELDS = ("input_tokens", "output_tokens", "input_cached_tokens", "input_audio_tokens",
+                "output_audio_tokens", "num_model_requests")
+
+
+def _add_usage(totals, key, row, sign):
+    entry = totals.get(key)
+    if entry is None:
+        entry = totals[key] = dict.fromkeys(USAGE_FIELDS, 0)
+    for field in USAGE_FIELDS:
+        value = row.get(field)
+        if value:
+            entry[field] += value * sign
+
+
+class UsageLedger(CostLedger):
+    """Usage API 결과(토큰/요청 수, 비용 없음)를 보관하는 원장.
+
+    버킷 저장/교체/증분 병합은 CostLedger와 같고, 비용 대신 USAGE_FIELDS 합계를
+    사용자/프로젝트/모델/날짜별로 유지합니다. 행의 모델은 line_item이 아닌 model 필드입니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.usage_total = dict.fromkeys(USAGE_FIELDS, 0)
+        self.usage_by_date = {}
+        self.usage_by_user = {}
+        self.usage_by_project = {}
+        self.usage_by_model = {}
+
+    def _apply(self, row, sign):
+        for field in USAGE_FIELDS:
+            value = row.get(field)
+            if value:
+                self.usage_total[field] += value * sign
+        _add_usage(self.usage_by_date, row["date"], row, sign)
+        _add_usage(self.usage_by_user, _user_of(row), row, sign)
+        project = _project_of(row)
+        _add_usage(self.usage_by_project, project, row, sign)
+        _add_usage(self.usage_by_model, row.get("model") or _model_of(row), row, sign)
+        self.dirty_projects.add(project)
+
+    def merge(self, other):
+        """다른 사용량 원장의 버킷을 병합합니다 (겹치는 버킷은 교체, 합계는 _apply로 다시 계산)."""
+        changed = 0
+        for bucket in other.sorted_buckets():
+            changed += self._merge_bucket(bucket)
+        return changed
+
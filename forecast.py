@@ -0,0 +1,218 @@
+"""
+Spend forecasting
+비용 내보내기의 일별 비용을 프로젝트(또는 사용자) x 일 행렬로 만들고, 최근 기간의 선형 추세를
+모든 프로젝트에 대해 한 번에(numpy 벡터 연산) 맞춰 월말 예상 비용과 예산 소진 예정일을 계산합니다.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from records import UsageFilter, bucket_date
+
+DEFAULT_WINDOW = 14
+
+
+def _key_of(result, by):
+    if by == "user":
+        key = result.get("user_id")
+        return "unknown_user" if key is None or key == "" else key
+    key = result.get("project_id")
+    return "no_project" if key is None or key == "" else key
+
+
+def _amount(result):
+    amount = result.get("amount")
+    if not isinstance(amount, dict):
+        return 0.0
+    value = amount.get("value")
+    # None/NaN은 0으로 처리 (cost_ledger.row_cost와 동일)
+    return 0.0 if value is None or value != value else value
+
+
+def daily_cost_matrix(export, by="project", filters=None):
+    """내보내기 데이터를 키 x 일 비용 행렬로 변환합니다.
+
+    Args:
+        export: 비용 내보내기 (data[].results[] 또는 버킷 목록)
+        by: "project" 또는 "user"
+        filters: 포함할 기간/사용자/프로젝트/모델 (UsageFilter 또는 같은 키의 dict, 선택)
+
+    Returns:
+        dict: {"keys": [키, ...], "dates": [date, ...] (빈 날 없이 연속), "costs": ndarray (키 수 x 일 수)}
+    """
+    if by not in ("project", "user"):
+        raise ValueError(f"알 수 없는 기준: {by}")
+    buckets = export.get("data", []) if isinstance(export, dict) else export or []
+    filters = UsageFilter.coerce(filters)
+    row_filter = filters.match_row if filters is not None and filters.has_row_conditions() else None
+
+    key_index = {}
+    key_ids = []
+    day_ids = []
+    values = []
+    bucket_days = []
+    for bucket in buckets:
+        if not isinstance(bucket, dict) or "start_time" not in bucket:
+            continue
+        day_text = bucket_date(bucket)
+        if filters is not None and not filters.match_date(day_text):
+            continue
+        results = bucket.get("results") or []
+        if row_filter is not None:
+            results = [result for result in results if row_filter(result)]
+        day = date.fromisoformat(day_text)
+        bucket_days.append(day)
+        for result in results:
+            key = _key_of(result, by)
+            index = key_index.get(key)
+            if index is None:
+                index = key_index[key] = len(key_index)
+            key_ids.append(index)
+            values.append(_amount(result))
+        day_ids.extend([day.toordinal()] * len(results))
+
+    if not bucket_days:
+        return {"keys": [], "dates": [], "costs": np.zeros((0, 0))}
+
+    first = min(bucket_days)
+    days = (max(bucket_days) - first).days + 1
+    keys = list(key_index)
+    flat = np.asarray(key_ids, dtype=np.int64) * days + (np.asarray(day_ids, dtype=np.int64) - first.toordinal())
+    costs = np.bincount(flat, weights=np.asarray(values, dtype=np.float64), minlength=len(keys) * days)
+    return {
+        "keys": keys,
+        "dates": [first + timedelta(days=i) for i in range(days)],
+        "costs": costs.reshape(len(keys), days),
+    }
+
+
+def fit_trends(costs, window=DEFAULT_WINDOW):
+    """각 행(키)의 최근 window일에 최소제곱 직선을 맞춥니다.
+
+    Returns:
+        (slope, intercept): 각각 길이가 키 수인 배열. x는 전체 기간의 일 번호(0부터)입니다.
+    """
+    keys, days = costs.shape
+    if days == 0:
+        return np.zeros(keys), np.zeros(keys)
+    window = max(1, min(window, days))
+    x = np.arange(days - window, days, dtype=np.float64)
+    y = costs[:, -window:]
+    x_mean = x.mean()
+    y_mean = y.mean(axis=1)
+    dx = x - x_mean
+    denominator = (dx * dx).sum()
+    slope = (y - y_mean[:, None]) @ dx / denominator if denominator > 0 else np.zeros(keys)
+    return slope, y_mean - slope * x_mean
+
+
+def _month_bounds(day):
+    start = day.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def _as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def forecast_spend(export, by="project", budgets=None, period_start=None, period_end=None,
+                   window=DEFAULT_WINDOW, filters=None):
+    """키별 기간 말 예상 비용과 예산 소진 예정일을 계산합니다.
+
+    기간은 기본적으로 데이터 마지막 날이 속한 달이며, 기간 안에서 이미 쓴 비용에
+    남은 날마다 추세선 값(음수는 0)을 더해 예상합니다. 예산과 비교하는 사용량이 내보내기 전체
+    합계라면 period_start="all"로 같은 기간을 사용하세요.
+
+    Args:
+        export: 비용 내보내기
+        by: "project" 또는 "user"
+        budgets: {키: 예산} (선택). 있으면 소진 예정일과 예상 사용률을 계산
+        period_start: 기간 첫날 (date 또는 "YYYY-MM-DD", "all"이면 데이터 첫날, 기본값 월초)
+        period_end: 기간 마지막 날 (date 또는 "YYYY-MM-DD", 기본값 월말)
+        window: 추세를 맞출 최근 일 수
+        filters: 예측에 포함할 기간/사용자/프로젝트/모델 (daily_cost_matrix 참고). 걸러진 사용량과
+                 비교할 때는 같은 조건을 넘기세요
+
+    Returns:
+        dict: {
+            "as_of", "period_start", "period_end" (ISO 날짜 문자열),
+            "forecasts": {키: {"spent", "daily_trend", "slope", "remaining", "projected", "budget",
+                               "projected_rate", "exhaustion_date", "as_of"}},
+        }
+        remaining은 남은 날의 예상 비용 합계(projected - spent)이고, exhaustion_date는 이미 예산을
+        넘었으면 실제로 넘은 날입니다.
+    """
+    matrix = daily_cost_matrix(export, by, filters)
+    dates, costs, keys = matrix["dates"], matrix["costs"], matrix["keys"]
+    if not dates:
+        return {"as_of": None, "period_start": None, "period_end": None, "forecasts": {}}
+
+    as_of = dates[-1]
+    month_start, month_end = _month_bounds(as_of)
+    if period_start == "all":
+        period_start = dates[0]
+    else:
+        period_start = _as_date(period_start) if period_start is not None else month_start
+    period_end = _as_date(period_end) if period_end is not None else month_end
+    # 기간 안의 실제 비용 열 [first_in_period, last_in_period)와 그 뒤의 예상 일 [future_start, period_end]
+    first_in_period = min(max(0, (period_start - dates[0]).days), len(dates))
+    last_in_period = min(len(dates), max(0, (period_end - dates[0]).days + 1))
+    future_start = max(as_of + timedelta(days=1), period_start)
+    remaining = max(0, (period_end - future_start).days + 1)
+
+    period_costs = costs[:, first_in_period:max(first_in_period, last_in_period)]
+    spent = period_costs.sum(axis=1)
+    slope, intercept = fit_trends(costs, window)
+    days = costs.shape[1]
+    # 추세선의 x는 데이터 첫날부터의 일 번호이므로 기간이 데이터 뒤에서 시작하면 그만큼 건너뜀
+    future_offset = (future_start - dates[0]).days
+    future_x = np.arange(future_offset, future_offset + remaining, dtype=np.float64)
+    future = np.clip(intercept[:, None] + slope[:, None] * future_x, 0, None)
+    remaining_cost = future.sum(axis=1)
+    projected = spent + remaining_cost
+    daily_trend = np.clip(intercept + slope * (days - 1), 0, None)
+
+    budget_values = np.full(len(keys), np.nan)
+    if budgets:
+        for i, key in enumerate(keys):
+            budget = budgets.get(key)
+            if budget:
+                budget_values[i] = budget
+
+    # 실제 누적 비용 -> 이후 예상 누적 비용을 이어 붙여 처음 예산에 닿는 날을 찾음
+    cumulative = np.concatenate(
+        [np.cumsum(period_costs, axis=1), spent[:, None] + np.cumsum(future, axis=1)], axis=1
+    )
+    reached = cumulative >= budget_values[:, None]
+    has_reached = reached.any(axis=1)
+    first_reached = reached.argmax(axis=1)
+    # 누적 비용 열의 첫날: 기간 안에 실제 데이터가 있으면 그 첫날, 없으면 예상 첫날
+    period_first_day = dates[first_in_period] if period_costs.shape[1] else future_start
+
+    forecasts = {}
+    for i, key in enumerate(keys):
+        budget = budget_values[i]
+        has_budget = not np.isnan(budget)
+        exhaustion_date = None
+        if has_budget and has_reached[i]:
+            exhaustion_date = (period_first_day + timedelta(days=int(first_reached[i]))).isoformat()
+        forecasts[key] = {
+            "spent": float(spent[i]),
+            "daily_trend": float(daily_trend[i]),
+            "slope": float(slope[i]),
+            "remaining": float(remaining_cost[i]),
+            "projected": float(projected[i]),
+            "budget": float(budget) if has_budget else None,
+            "projected_rate": float(projected[i] / budget * 100) if has_budget else None,
+            "exhaustion_date": exhaustion_date,
+            "as_of": as_of.isoformat(),
+        }
+
+    return {
+        "as_of": as_of.isoformat(),
+        "period_start": period_start.isoformat(),
+        "period_end": period_end.isoformat(),
+        "forecasts": forecasts,
+    }
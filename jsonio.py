@@ -0,0 +1,144 @@
+"""
+Crash-safe JSON file I/O
+임시 파일에 기록하고 fsync한 뒤 원자적으로 교체하므로, 동시에 읽는 쪽은 항상 완전한 파일만 보게 됩니다.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from metrics import CACHE_LOOKUPS
+
+SNAPSHOT_DIRNAME = ".snapshots"
+
+# 절대 경로 -> (파일 시그니처, 파싱된 데이터)
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _signature(stat):
+    # 원자적 교체는 inode가 바뀌고, 제자리 수정은 mtime/크기가 바뀜
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def load_json_cached(path):
+    """JSON 파일을 읽어 메모리에 보관하고, 파일이 바뀌었을 때만 다시 파싱합니다.
+
+    반복 호출은 os.stat 한 번으로 끝나며, 다른 프로세스가 파일을 수정하면 다음 호출에서 바로 반영됩니다.
+    반환된 객체는 호출자 간에 공유되므로 수정하지 말고 필요하면 복사해서 사용하세요.
+    파일이 없으면 FileNotFoundError가 발생합니다.
+    """
+    key = os.path.abspath(path)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == _signature(os.stat(key)):
+        CACHE_LOOKUPS.inc("json_file", "hit")
+        return entry[1]
+    CACHE_LOOKUPS.inc("json_file", "miss")
+
+    with open(key, "r", encoding="utf-8") as f:
+        # 읽은 파일 자체의 시그니처를 사용하여 stat과 open 사이의 교체에도 안전
+        signature = _signature(os.fstat(f.fileno()))
+        data = json.load(f)
+    with _cache_lock:
+        _cache[key] = (signature, data)
+    return data
+
+
+def invalidate_json_cache(path=None):
+    """캐시를 비웁니다. path를 지정하면 해당 파일만 비웁니다."""
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
+
+
+def _fsync_dir(directory):
+    # 디렉터리 항목(rename) 자체도 디스크에 기록 (지원하지 않는 플랫폼은 생략)
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _snapshot_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIRNAME)
+
+
+def list_snapshots(path):
+    """path의 스냅샷 경로 목록을 오래된 순으로 반환합니다."""
+    directory = _snapshot_dir(path)
+    prefix = os.path.basename(path) + "."
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory) if name.startswith(prefix))
+    return [os.path.join(directory, name) for name in names]
+
+
+def _take_snapshot(path, keep):
+    """현재 파일을 .snapshots/<파일명>.<타임스탬프>로 보관하고 keep개만 남깁니다."""
+    directory = _snapshot_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    snapshot = os.path.join(directory, f"{os.path.basename(path)}.{time.time_ns():020d}")
+    try:
+        # 곧 교체될 파일이므로 하드 링크로 복사 비용 없이 보관
+        os.link(path, snapshot)
+    except OSError:
+        shutil.copy2(path, snapshot)
+
+    for old in list_snapshots(path)[:-keep]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def atomic_write_json(path, data, snapshots=0, cache=False, **dump_kwargs):
+    """JSON 데이터를 원자적으로 저장합니다.
+
+    Args:
+        path: 저장할 파일 경로
+        data: JSON 직렬화 가능한 데이터
+        snapshots: 0보다 크면 교체 직전의 파일을 버전별 스냅샷으로 최대 N개 보관
+        cache: True이면 저장한 데이터를 load_json_cached 캐시에 바로 넣어 직후 읽기를 생략
+               (이후 data를 수정하지 않는 경우에만 사용)
+        **dump_kwargs: json.dump에 전달할 인자 (기본값 ensure_ascii=False)
+    """
+    dump_kwargs.setdefault("ensure_ascii", False)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+
+        exists = os.path.exists(path)
+        # mkstemp는 0600으로 생성하므로 기존 파일 권한(없으면 0644)을 유지
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if exists else 0o644)
+        if exists and snapshots > 0:
+            _take_snapshot(path, snapshots)
+
+        os.replace(tmp_path, path)
+        _fsync_dir(directory)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    key = os.path.abspath(path)
+    with _cache_lock:
+        if cache:
+            _cache[key] = (_signature(os.stat(key)), data)
+        else:
+            _cache.pop(key, None)
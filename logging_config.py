@@ -0,0 +1,108 @@
+"""
+Structured logging
+utils/서버의 모든 로그를 "tracker" 로거 아래로 모읍니다. 레벨/형식/샘플링은 환경 변수로 설정합니다.
+
+    TRACKER_LOG_LEVEL   기본 INFO. 프로젝트별 반복 로그는 DEBUG이므로 기본 레벨에서는 포맷 비용 없이 건너뜁니다.
+    TRACKER_LOG_FORMAT  text(기본) 또는 json (한 줄에 JSON 객체 하나)
+    TRACKER_LOG_SAMPLE  WARNING 미만 로그를 남길 비율 (0~1, 기본 1). 같은 메시지 템플릿별로 N개 중 1개를 남깁니다.
+
+메시지는 f-string 대신 %-인자로 전달하여 비활성 레벨에서는 문자열을 만들지 않으며,
+extra={...}로 전달한 필드는 json 형식에서 별도 키로 출력됩니다.
+"""
+
+import itertools
+import json
+import logging
+import os
+import threading
+
+ROOT_LOGGER = "tracker"
+
+# LogRecord 기본 속성 (extra 필드 구분용)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def get_logger(name):
+    """tracker 하위 로거를 반환합니다 (예: get_logger("utils") -> "tracker.utils")."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def _extra_fields(record):
+    return {key: value for key, value in record.__dict__.items() if key not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄짜리 JSON 로그 (ts, level, logger, msg + extra 필드)"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """사람이 읽는 형식. extra 필드는 메시지 뒤에 key=value로 붙입니다."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        text = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """WARNING 미만 로그를 메시지 템플릿별로 every개 중 1개만 통과시킵니다."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counters = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        key = (record.name, record.msg)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % self.every == 0
+
+
+def configure_logging(level=None, fmt=None, sample=None):
+    """tracker 로거에 핸들러를 한 번만 설정합니다. 인자가 없으면 환경 변수 값을 사용합니다."""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        level = (level or os.environ.get("TRACKER_LOG_LEVEL", "INFO")).upper()
+        fmt = (fmt or os.environ.get("TRACKER_LOG_FORMAT", "text")).lower()
+        if sample is None:
+            sample = float(os.environ.get("TRACKER_LOG_SAMPLE", "1"))
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+        if sample < 1:
+            handler.addFilter(SamplingFilter(sample))
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(level)
+        logger.addHandler(handler)
+        # uvicorn 등이 루트 로거에 설정한 핸들러로 중복 출력되지 않도록 함
+        logger.propagate = False
+        _configured = True
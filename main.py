@@ -1,10 +1,159 @@
 import fire
+import os
 import subprocess
+import sys
 
 
 def main(app_path, port=51075):
     subprocess.run(["streamlit", "run", app_path, "--server.port", str(port)])
 
 
+def ingest(*paths, output_dir="ledger", workers=None, analytics=False):
+    """여러 내보내기 파일을 병렬로 파싱하여 종류별 원장(user/project)에 병합합니다.
+
+    analytics가 True이면 행을 종류별 분석 저장소(<output_dir>/<종류>_analytics.db)에도 저장합니다.
+    """
+    from batch_ingest import ingest_export_files
+    from cost_ledger import CostLedger
+
+    os.makedirs(output_dir, exist_ok=True)
+    for kind, ledger in ingest_export_files(paths, max_workers=workers).items():
+        ledger_path = os.path.join(output_dir, f"{kind}_ledger.json")
+        stored = CostLedger.load(ledger_path)
+        changed = stored.ingest(ledger.to_export())
+        stored.save(ledger_path)
+        print(f"{kind}: {changed}개 행 병합, 총 {len(stored)}개 행, 총 비용 ${stored.total_cost:.2f} -> {ledger_path}")
+        if analytics:
+            from analytics_store import get_analytics_store
+
+            store = get_analytics_store(kind, path=os.path.join(output_dir, f"{kind}_analytics.db"))
+            rows = store.ingest(ledger.to_export())
+            print(f"{kind}: {rows}개 행 -> {store.path}")
+
+
+def _split_list(value):
+    # fire는 "a,b"를 튜플로, "a"를 문자열로 넘김
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value)
+
+
+def report(*paths, output_dir="reports", budgets=None, userinfo=None, workers=None, fmt="both",
+           start_date=None, end_date=None, projects=None, users=None, models=None):
+    """UI 없이 내보내기 파일을 집계하여 사용자별/프로젝트별 비용과 예산 초과 보고서를 저장합니다.
+
+    fmt는 csv, json 또는 both입니다. start_date/end_date(YYYY-MM-DD)와 projects/users/models(쉼표 구분)로
+    집계 대상을 좁힐 수 있습니다.
+    """
+    from report import REPORT_FORMATS, build_report, write_report
+
+    if fmt not in REPORT_FORMATS:
+        print(f"❌ 알 수 없는 보고서 형식입니다: {fmt} (가능한 값: {', '.join(REPORT_FORMATS)})")
+        sys.exit(2)
+
+    filters = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "project_ids": _split_list(projects),
+        "user_ids": _split_list(users),
+        "models": _split_list(models),
+    }
+    result = build_report(paths, budgets_file=budgets, userinfo_file=userinfo, workers=workers, filters=filters)
+    for path in write_report(result, output_dir=output_dir, fmt=fmt):
+        print(f"저장됨: {path}")
+    summary = result["summary"]
+    print(
+        f"기간 {summary['start_date']} ~ {summary['end_date']}, 사용자 {summary['user_count']}명, "
+        f"프로젝트 {summary['project_count']}개, 예산 초과 {summary['overage_count']}개"
+    )
+
+
+def sync(source="costs", ledger=None, days=30, chunk_days=7, workers=4):
+    """OpenAI Costs/Usage API에서 최근 데이터를 가져와 로컬 원장에 병합합니다 (마지막 버킷부터 이어서)."""
+    from usage_sync import sync as sync_source
+
+    result = sync_source(source, ledger_path=ledger, days=days, chunk_days=chunk_days, max_workers=workers)
+    print(
+        f"{result['source']}: {result['synced_chunks']}/{result['chunks']}개 구간, {result['buckets']}개 버킷, "
+        f"{result['changed_rows']}개 행 반영, 총 {result['total_rows']}개 행 -> {result['ledger_path']}"
+    )
+    print("합계: " + ", ".join(f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value:,}"
+                             for key, value in result["totals"].items()))
+    for error in result["errors"]:
+        print(f"❌ {error}")
+    if result["errors"]:
+        sys.exit(1)
+
+
+def watch(*paths, ledger="ledger/watch_ledger.json", interval=60, period="month", webhook=None, once=False):
+    """내보내기 파일을 주기적으로 반영하고 예산 70/90/100% 도달 시 알림을 보냅니다."""
+    from budget_watcher import BudgetWatcher, LogSink, WebhookSink
+
+    sinks = [LogSink()]
+    if webhook:
+        sinks.append(WebhookSink(webhook))
+    if ledger:
+        os.makedirs(os.path.dirname(ledger) or ".", exist_ok=True)
+    watcher = BudgetWatcher(paths, ledger_path=ledger, sinks=sinks, period=period)
+    if once:
+        for alert in watcher.cycle():
+            print(f"{alert['project_id']}: {alert['threshold']}% 도달 ({alert['usage_rate']:.1f}%)")
+        watcher.flush()
+        return
+    try:
+        watcher.run(interval=interval)
+    except KeyboardInterrupt:
+        watcher.stop()
+
+
+def import_time(module="utils", budget_ms=50, forbidden=("requests", "dotenv", "pandas", "streamlit", "plotly", "matplotlib")):
+    """새 인터프리터에서 모듈 import 시간을 측정하고 예산(ms)을 넘거나 무거운 모듈을 불러오면 실패합니다."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        sys.exit(result.returncode)
+
+    # 형식: "import time: self [us] | cumulative | imported package"
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if name.strip() == "site":
+            # 인터프리터 시작 시 로드되는 모듈은 측정 대상에서 제외
+            timings = []
+            continue
+        timings.append((int(cumulative_us), int(self_us), name.strip()))
+
+    total_ms = next((c for c, _, name in timings if name == module), 0) / 1000
+    loaded = {name.split(".")[0] for _, _, name in timings}
+    heavy = sorted(loaded.intersection(forbidden))
+
+    print(f"import {module}: {total_ms:.1f} ms (예산 {budget_ms} ms)")
+    for cumulative_us, _, name in sorted(timings, reverse=True)[:10]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if heavy:
+        print(f"❌ import 시 불필요한 모듈이 로드되었습니다: {', '.join(heavy)}")
+        sys.exit(1)
+    if total_ms > budget_ms:
+        print("❌ import 시간 예산을 초과했습니다.")
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    fire.Fire(main)
+    from logging_config import configure_logging
+
+    configure_logging()
+    commands = {"run": main, "ingest": ingest, "report": report, "sync": sync, "watch": watch, "import_time": import_time}
+    # 기존 호출 방식(python main.py app.py / python main.py --app_path app.py)은 run으로 처리
+    if len(sys.argv) < 2 or (sys.argv[1] not in commands and sys.argv[1] not in ("-h", "--help")):
+        sys.argv.insert(1, "run")
+    fire.Fire(commands)
@@ -0,0 +1,170 @@
+"""
+Lightweight in-process metrics
+외부 의존성 없이 카운터/히스토그램을 메모리에 보관하고 Prometheus 텍스트 형식으로 내보냅니다.
+레이블 값은 위치 인자로 받아 튜플 키로 저장하므로 호출당 비용은 dict 조회와 잠금 한 번입니다.
+"""
+
+import bisect
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 초 단위 지연 시간 버킷
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+
+def _format_labels(labelnames, labels, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (레이블 조합별 버킷 카운트, 합계, 개수)"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 -> [버킷별 카운트..., +Inf 카운트, 합계]
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            values = {labels: list(state) for labels, state in self._values.items()}
+        for labels, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class CacheRatio:
+    """캐시 조회 카운터에서 캐시별 적중률을 계산하여 게이지로 내보냅니다."""
+
+    def __init__(self, name, documentation, lookups):
+        self.name = name
+        self.documentation = documentation
+        self.lookups = lookups
+        _registry.append(self)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        totals = {}
+        for (cache, result), value in self.lookups.samples().items():
+            hits, total = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (value if result == "hit" else 0), total + value)
+        for cache, (hits, total) in sorted(totals.items()):
+            lines.append(f'{self.name}{{cache="{_escape(cache)}"}} {_format_value(hits / total if total else 0.0)}')
+        return lines
+
+
+def render():
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- FastAPI 라우트 ---
+HTTP_REQUESTS = Counter(
+    "tracker_http_requests_total", "HTTP requests handled by the API server", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "tracker_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+
+# --- OpenAI 조직 API 호출 ---
+UPSTREAM_REQUESTS = Counter(
+    "tracker_upstream_requests_total", "OpenAI API calls by endpoint and status", ("endpoint", "method", "status")
+)
+UPSTREAM_LATENCY = Histogram(
+    "tracker_upstream_request_duration_seconds", "OpenAI API call latency by endpoint", ("endpoint", "method")
+)
+UPSTREAM_RETRIES = Counter(
+    "tracker_upstream_retries_total", "Retried OpenAI API calls by endpoint and reason", ("endpoint", "reason")
+)
+UPSTREAM_PAGES = Histogram(
+    "tracker_upstream_pages", "Pages fetched per paginated OpenAI listing", ("endpoint",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+# --- 캐시 ---
+CACHE_LOOKUPS = Counter("tracker_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result"))
+CACHE_HIT_RATIO = CacheRatio("tracker_cache_hit_ratio", "Cache hit ratio since process start", CACHE_LOOKUPS)
+
+# --- 예산 감시 ---
+BUDGET_ALERTS = Counter("tracker_budget_alerts_total", "Budget threshold alerts emitted", ("threshold", "sink_result"))
+WATCH_CYCLE_SECONDS = Histogram(
+    "tracker_budget_watch_cycle_seconds", "Budget watcher cycle duration", (),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+WATCH_DIRTY_PROJECTS = Histogram(
+    "tracker_budget_watch_dirty_projects", "Projects re-evaluated per watcher cycle", (),
+    buckets=(0, 1, 10, 100, 1000, 10000),
+)
@@ -1,5 +1,14 @@
-from fastapi import FastAPI, Header, HTTPException
+import hmac
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
@@ -17,9 +26,20 @@ from utils import (
     load_rate_limit_template,
     apply_rate_limit_template_to_project,
     build_userinfo,
+    load_config,
+    load_userinfo,
     extract_results_from_buckets,
     group_by_userID,
 )
+from analytics_store import DIMENSIONS, get_analytics_store
+from batch_ingest import collect_export_files, ingest_export_files, summarize_ledger
+from revocation import DEFAULT_RULES, enforce_budget_policy
+from logging_config import configure_logging, get_logger
+from metrics import CONTENT_TYPE, HTTP_LATENCY, HTTP_REQUESTS, render as render_metrics
+from profiling import ProfileSession, env_mode
+
+configure_logging()
+logger = get_logger("server")
 
 app = FastAPI(title="OpenAI Organization API Wrapper", version="1.0.0")
 
@@ -33,6 +53,67 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """라우트 템플릿별 요청 수와 지연 시간을 기록합니다 (경로 파라미터 값은 레이블에 넣지 않음)."""
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        HTTP_LATENCY.observe(time.perf_counter() - start, request.method, path)
+        HTTP_REQUESTS.inc(request.method, path, status)
+
+
+# 프로파일링은 TRACKER_PROFILE 환경 변수로 켠 서버에서만 사용 (?profile 쿼리와 /debug/profiles 포함)
+PROFILING_ENABLED = env_mode() is not None
+
+# 최근 프로파일 결과 (id -> ProfileSession), 오래된 것부터 삭제
+MAX_PROFILES = 50
+_profiles = OrderedDict()
+_profile_seq = 0
+_profiles_lock = threading.Lock()
+
+
+def _store_profile(session):
+    global _profile_seq
+    with _profiles_lock:
+        _profile_seq += 1
+        profile_id = str(_profile_seq)
+        _profiles[profile_id] = session
+        while len(_profiles) > MAX_PROFILES:
+            _profiles.popitem(last=False)
+    return profile_id
+
+
+def _find_profile(profile_id):
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """TRACKER_PROFILE이 설정된 서버에서 요청의 구간별 시간을 기록합니다.
+
+    기본 모드는 환경 변수를 따르며, 요청마다 ?profile=cprofile(cProfile 포함) 또는 ?profile=0(끄기)으로 바꿀 수 있습니다.
+    """
+    if not PROFILING_ENABLED or request.url.path.startswith("/debug/profiles"):
+        return await call_next(request)
+    mode = request.query_params.get("profile") or env_mode()
+    if not mode or mode == "0":
+        return await call_next(request)
+
+    session = ProfileSession(f"{request.method} {request.url.path}", cprofile=mode == "cprofile")
+    with session:
+        response = await call_next(request)
+    response.headers["X-Profile-Id"] = _store_profile(session)
+    return response
+
+
 class BulkDeleteItem(BaseModel):
     project_id: str
     api_key_id: str
@@ -61,6 +142,19 @@ class UserUsageAnalysisRequest(BaseModel):
     usage_data: Dict[str, Any]  # The uploaded user usage data
 
 
+class BatchIngestRequest(BaseModel):
+    paths: List[str]  # 수집 디렉터리(TRACKER_INGEST_DIR) 기준 상대 경로의 파일, 디렉터리 또는 glob 패턴
+    max_workers: Optional[int] = None
+    analytics: bool = False  # True이면 종류별 분석 저장소에도 저장
+
+
+class RevocationRequest(BaseModel):
+    overages: List[Dict[str, Any]]  # find_budget_overages 결과 (project_id, budget, actual_usage)
+    rules: Optional[List[Dict[str, Any]]] = None  # 없으면 revocation.DEFAULT_RULES
+    dry_run: bool = True
+    max_workers: int = 8
+
+
 class GenerateUserinfoResponse(BaseModel):
     success: bool
     message: str
@@ -79,7 +173,7 @@ def _extract_admin_key(
         if key.startswith(('sk-', 'sk-proj-')):
             return key
         else:
-            print(f"⚠️ 올바르지 않은 API 키 형식입니다: {key[:10]}...")
+            logger.warning("올바르지 않은 API 키 형식입니다: %s...", key[:10])
             return key  # Still return it for testing purposes
     # Support Authorization: Bearer <token>
     if authorization and authorization.lower().startswith("bearer "):
@@ -87,11 +181,99 @@ def _extract_admin_key(
     return None
 
 
+def _require_admin_key(
+    x_admin_api_key: Optional[str], authorization: Optional[str]
+) -> str:
+    """서버에 설정된 관리자 키(OPENAI_API_KEY)와 일치하는 키를 요구합니다 (서버 파일/저장소를 다루는 엔드포인트용)."""
+    admin_key = _extract_admin_key(x_admin_api_key, authorization)
+    if not admin_key:
+        raise HTTPException(status_code=401, detail="Admin API key required")
+    expected = load_config()["api_key"]
+    if not expected or not hmac.compare_digest(admin_key.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin API key")
+    return admin_key
+
+
+def _ingest_dir() -> str:
+    return os.path.realpath(os.environ.get("TRACKER_INGEST_DIR", "exports"))
+
+
+def _resolve_ingest_paths(paths: List[str]) -> List[str]:
+    """요청 경로를 수집 디렉터리 안의 파일 목록으로 바꿉니다. 절대 경로와 ".."는 거부합니다."""
+    base = _ingest_dir()
+    resolved = []
+    for path in paths:
+        if not path or os.path.isabs(path) or ".." in path.replace("\\", "/").split("/"):
+            raise HTTPException(status_code=400, detail=f"Invalid ingest path: {path}")
+        resolved.append(os.path.join(base, path))
+    # 심볼릭 링크로 디렉터리 밖을 가리키는 파일은 제외
+    return [
+        path for path in collect_export_files(resolved)
+        if os.path.commonpath([base, os.path.realpath(path)]) == base
+    ]
+
+
 @app.get("/health")
 async def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics() -> Response:
+    """라우트/업스트림 API 호출/캐시 지표를 Prometheus 텍스트 형식으로 반환합니다."""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
+debug_router = APIRouter()
+
+
+@debug_router.get("/debug/profiles")
+async def list_profiles() -> Dict[str, Any]:
+    """최근 프로파일링된 요청 목록 (최신순)"""
+    with _profiles_lock:
+        sessions = list(reversed(_profiles.items()))
+    items = [
+        {"id": profile_id, "name": session.name, "duration_ms": session.breakdown()["duration_ms"]}
+        for profile_id, session in sessions
+    ]
+    return {"profiles": items}
+
+
+@debug_router.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str) -> Dict[str, Any]:
+    """요청 하나의 구간별 호출 수/누적 시간/최대 시간"""
+    session = _find_profile(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return session.breakdown()
+
+
+@debug_router.get("/debug/profiles/{profile_id}/pstats")
+async def get_profile_pstats(profile_id: str) -> Response:
+    """cProfile 결과를 pstats 파일로 내려받습니다 (snakeviz, flameprof 등으로 확인)."""
+    session = _find_profile(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    fd, path = tempfile.mkstemp(suffix=".pstats")
+    os.close(fd)
+    try:
+        if not session.dump_pstats(path):
+            raise HTTPException(status_code=404, detail="Profile has no cProfile data (use ?profile=cprofile)")
+        with open(path, "rb") as f:
+            data = f.read()
+    finally:
+        os.remove(path)
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'},
+    )
+
+
+if PROFILING_ENABLED:
+    app.include_router(debug_router)
+
+
 @app.get("/org/projects")
 async def org_projects(
     x_admin_api_key: Optional[str] = Header(default=None),
@@ -163,6 +345,28 @@ async def bulk_delete(
     return {"success": True, "result": results}
 
 
+@app.post("/keys/revocations")
+async def revoke_overage_keys(
+    body: RevocationRequest,
+    x_admin_api_key: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None),
+) -> Dict[str, Any]:
+    """예산 초과 프로젝트에 회수 규칙을 적용합니다. dry_run(기본값)이면 삭제 계획만 반환합니다."""
+    admin_key = _extract_admin_key(x_admin_api_key, authorization)
+    try:
+        outcome = await run_in_threadpool(
+            enforce_budget_policy,
+            body.overages,
+            body.rules if body.rules is not None else DEFAULT_RULES,
+            admin_key,
+            body.dry_run,
+            body.max_workers,
+        )
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid revocation request: {e}")
+    return {"success": True, "data": outcome}
+
+
 # Rate Limit Management Endpoints
 
 @app.get("/projects/{project_id}/rate_limits")
@@ -281,7 +485,6 @@ async def generate_userinfo_from_usage(
     authorization: Optional[str] = Header(default=None),
 ) -> GenerateUserinfoResponse:
     """사용자별 사용량 데이터에서 user_id들을 추출하고 OpenAI API를 통해 userinfo.json을 생성합니다."""
-    print("🚀 /generate-userinfo API 호출됨!")
     admin_key = _extract_admin_key(x_admin_api_key, authorization)
     
     try:
@@ -298,7 +501,7 @@ async def generate_userinfo_from_usage(
             if user_id and user_id != "unknown_user":
                 user_ids.add(user_id)
         
-        print(f"📊 사용량 데이터에서 {len(user_ids)}개의 고유한 사용자 ID를 발견했습니다: {list(user_ids)[:5]}{'...' if len(user_ids) > 5 else ''}")
+        logger.info("사용량 데이터에서 %d개의 고유한 사용자 ID를 발견했습니다.", len(user_ids))
         
         if not user_ids:
             return GenerateUserinfoResponse(
@@ -307,16 +510,14 @@ async def generate_userinfo_from_usage(
             )
         
         # OpenAI API를 통해 조직 사용자 정보 가져오기
-        print("🔍 OpenAI Organization API에서 사용자 정보를 가져오는 중...")
+        logger.info("OpenAI Organization API에서 사용자 정보를 가져오는 중")
         success = build_userinfo(admin_key)
         
         if success:
             # 생성된 userinfo.json 파일을 읽어서 응답에 포함
             try:
-                import json
-                from utils import INFO_FILEPATH
-                with open(INFO_FILEPATH, "r", encoding="utf-8") as f:
-                    userinfo_data = json.load(f)
+                # build_userinfo가 저장하면서 캐시를 채우므로 파일을 다시 파싱하지 않음
+                userinfo_data = load_userinfo().to_list()
                 
                 return GenerateUserinfoResponse(
                     success=True,
@@ -326,7 +527,7 @@ async def generate_userinfo_from_usage(
                     userinfo_data=userinfo_data
                 )
             except Exception as e:
-                print(f"⚠️ 생성된 userinfo.json 파일 읽기 실패: {e}")
+                logger.warning("생성된 userinfo.json 파일 읽기 실패: %s", e)
                 return GenerateUserinfoResponse(
                     success=True,
                     message=f"사용자 정보 파일이 성공적으로 생성되었습니다. {len(user_ids)}개의 사용자 ID가 발견되었습니다. (파일 읽기 실패)",
@@ -335,7 +536,7 @@ async def generate_userinfo_from_usage(
                 )
         else:
             # API 키 권한 문제인 경우, mock userinfo 데이터를 생성해서 반환
-            print("⚠️ OpenAI API 키 권한 문제로 인해 mock userinfo 데이터를 생성합니다.")
+            logger.warning("OpenAI API 키 권한 문제로 인해 mock userinfo 데이터를 생성합니다.")
             mock_userinfo_data = {}
             
             # 발견된 user_id들에 대해 mock 사용자 정보 생성
@@ -354,7 +555,7 @@ async def generate_userinfo_from_usage(
             )
     
     except Exception as e:
-        print(f"❌ userinfo 생성 중 오류 발생: {e}")
+        logger.exception("userinfo 생성 중 오류 발생: %s", e)
         return GenerateUserinfoResponse(
             success=False,
             message=f"userinfo 생성 중 오류가 발생했습니다: {str(e)}"
@@ -370,7 +571,7 @@ async def build_userinfo_endpoint(
     admin_key = _extract_admin_key(x_admin_api_key, authorization)
     
     try:
-        print("🔍 OpenAI Organization API에서 사용자 정보를 가져오는 중...")
+        logger.info("OpenAI Organization API에서 사용자 정보를 가져오는 중")
         success = build_userinfo(admin_key)
         
         if success:
@@ -386,11 +587,66 @@ async def build_userinfo_endpoint(
             )
     
     except Exception as e:
-        print(f"❌ userinfo 생성 중 오류 발생: {e}")
+        logger.exception("userinfo 생성 중 오류 발생: %s", e)
         return GenerateUserinfoResponse(
             success=False,
             message=f"userinfo 생성 중 오류가 발생했습니다: {str(e)}"
         )
 
 
+@app.post("/ingest/batch")
+async def ingest_batch(
+    body: BatchIngestRequest,
+    x_admin_api_key: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None),
+) -> Dict[str, Any]:
+    """수집 디렉터리의 비용 내보내기 파일들을 병렬로 파싱하여 종류별 병합 결과를 반환합니다."""
+    _require_admin_key(x_admin_api_key, authorization)
+    files = _resolve_ingest_paths(body.paths)
+    if not files:
+        raise HTTPException(status_code=404, detail="No export files found")
+    try:
+        ledgers = await run_in_threadpool(ingest_export_files, files, body.max_workers)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Failed to ingest exports: {e}")
+    if not ledgers:
+        raise HTTPException(status_code=404, detail="No export files found")
+    if body.analytics:
+        for kind, ledger in ledgers.items():
+            await run_in_threadpool(get_analytics_store(kind).ingest, ledger.to_export())
+    return {
+        "data": {kind: summarize_ledger(ledger) for kind, ledger in ledgers.items()},
+        "success": True,
+    }
+
+
+
+@app.get("/analytics/{kind}/costs")
+async def analytics_costs(
+    kind: str,
+    by: str = "project",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    user_id: Optional[List[str]] = Query(default=None),
+    project_id: Optional[List[str]] = Query(default=None),
+    model: Optional[List[str]] = Query(default=None),
+) -> Dict[str, Any]:
+    """분석 저장소에서 기간/사용자/프로젝트/모델 조건으로 차원별 비용을 집계합니다."""
+    if kind not in ("user", "project") or by not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid kind or dimension: {kind}/{by}")
+    store = get_analytics_store(kind)
+    filters = {
+        "start_date": start_date, "end_date": end_date,
+        "user_ids": user_id, "project_ids": project_id, "models": model,
+    }
+    totals = await run_in_threadpool(store.aggregate, by, **filters)
+    date_range = await run_in_threadpool(store.date_range)
+    return {
+        "data": [{"key": key, **values} for key, values in totals.items()],
+        "total_cost": sum(values["total_cost"] for values in totals.values()),
+        "date_range": date_range,
+        "success": True,
+    }
+
+
 # To run: uvicorn org_api_server:app --reload --port 8000
@@ -0,0 +1,166 @@
+"""
+Opt-in profiling spans
+집계 함수와 OpenAI API 호출에 이름 있는 타이밍 구간(span)을 기록하여 요청 단위로 시간 분포를 확인합니다.
+
+세션이 활성화되지 않은 평소에는 @profiled 함수 호출당 ContextVar 조회 한 번만 추가됩니다.
+cProfile 모드에서는 가장 바깥 구간을 cProfile로 실행하고, 결과를 pstats 파일(snakeviz,
+flameprof 등에서 사용 가능)로 내보낼 수 있습니다.
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+
+# TRACKER_PROFILE=1 이면 모든 서버 요청에 구간 기록, cprofile 이면 cProfile 덤프도 수집
+PROFILE_ENV = "TRACKER_PROFILE"
+
+_current = contextvars.ContextVar("tracker_profile_session", default=None)
+_depth = threading.local()
+
+
+def env_mode():
+    """환경 변수로 지정된 프로파일링 모드 (None, "spans", "cprofile")"""
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "off"):
+        return None
+    return "cprofile" if value == "cprofile" else "spans"
+
+
+class ProfileSession:
+    """한 요청(또는 작업) 동안의 구간별 호출 수/누적 시간/최대 시간을 모읍니다."""
+
+    def __init__(self, name, cprofile=False):
+        self.name = name
+        self.cprofile = cprofile
+        self.started = time.time()
+        self.duration = None
+        self.spans = {}
+        self._stats = None
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._token = None
+
+    def record(self, name, elapsed):
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [1, elapsed, elapsed]
+            else:
+                span[0] += 1
+                span[1] += elapsed
+                if elapsed > span[2]:
+                    span[2] = elapsed
+
+    def add_profile(self, profile):
+        import pstats
+
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self._start
+        _current.reset(self._token)
+        return False
+
+    def breakdown(self):
+        """구간별 통계를 누적 시간 순으로 반환합니다 (시간 단위 ms)."""
+        with self._lock:
+            spans = sorted(self.spans.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "name": self.name,
+            "started_at": self.started,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "has_pstats": self._stats is not None,
+            "spans": [
+                {
+                    "name": name,
+                    "calls": calls,
+                    "total_ms": round(total * 1000, 3),
+                    "max_ms": round(longest * 1000, 3),
+                }
+                for name, (calls, total, longest) in spans
+            ],
+        }
+
+    def dump_pstats(self, path):
+        """수집한 cProfile 결과를 pstats 형식 파일로 저장합니다. 없으면 False."""
+        with self._lock:
+            if self._stats is None:
+                return False
+            self._stats.dump_stats(path)
+        return True
+
+
+def current_session():
+    return _current.get()
+
+
+def _run(session, name, func, args, kwargs):
+    depth = getattr(_depth, "value", 0)
+    _depth.value = depth + 1
+    start = time.perf_counter()
+    try:
+        if session.cprofile and depth == 0:
+            import cProfile
+
+            # 가장 바깥 구간만 cProfile로 실행 (스레드별 프로파일러이므로 스레드풀에서도 동작)
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                session.add_profile(profile)
+        return func(*args, **kwargs)
+    finally:
+        session.record(name, time.perf_counter() - start)
+        _depth.value = depth
+
+
+def profiled(name=None):
+    """세션이 활성화된 경우에만 함수 실행 시간을 구간으로 기록하는 데코레이터"""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            session = _current.get()
+            if session is None:
+                return func(*args, **kwargs)
+            return _run(session, span_name, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class span:
+    """코드 블록을 구간으로 기록합니다. 세션이 없으면 아무 것도 하지 않습니다.
+
+        with span("pandas.DataFrame"):
+            df = pd.DataFrame(rows)
+    """
+
+    __slots__ = ("name", "session", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.session = _current.get()
+        if self.session is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.session is not None:
+            self.session.record(self.name, time.perf_counter() - self.start)
+        return False
@@ -0,0 +1,476 @@
+"""
+Compact record types for OpenAI usage data
+dict 대신 __slots__ 기반 레코드로 행 단위 메모리를 줄입니다.
+"""
+
+import bisect
+import calendar
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+
+
+def bucket_date(bucket):
+    """버킷의 start_time을 기준으로 날짜 문자열(YYYY-MM-DD)을 계산합니다."""
+    return datetime.fromtimestamp(bucket["start_time"]).strftime("%Y-%m-%d")
+
+
+class UsageRow(Mapping):
+    """버킷 결과 한 건을 복사나 변경 없이 참조하는 읽기 전용 뷰입니다.
+
+    date / start_time / end_time은 원본 결과에 쓰지 않고 버킷에서 읽어오므로
+    업로드된 원본 데이터가 그대로 유지됩니다. 같은 버킷의 행들은 날짜 문자열을 공유합니다.
+    """
+
+    __slots__ = ("_result", "_bucket", "_date")
+
+    _TIME_KEYS = ("date", "start_time", "end_time")
+
+    def __init__(self, result, bucket, date=None):
+        self._result = result
+        self._bucket = bucket
+        self._date = date if date is not None else bucket_date(bucket)
+
+    def __getitem__(self, key):
+        if key == "date":
+            return self._date
+        if key == "start_time" or key == "end_time":
+            return self._bucket[key]
+        return self._result[key]
+
+    def get(self, key, default=None):
+        # Mapping.get은 예외 처리를 거치므로 자주 호출되는 경로를 직접 구현
+        if key == "date":
+            return self._date
+        if key == "start_time" or key == "end_time":
+            return self._bucket.get(key, default)
+        return self._result.get(key, default)
+
+    def __contains__(self, key):
+        if key == "date":
+            return True
+        if key == "start_time" or key == "end_time":
+            return key in self._bucket
+        return key in self._result
+
+    def __iter__(self):
+        for key in self._result:
+            if key not in self._TIME_KEYS:
+                yield key
+        yield "date"
+        for key in ("start_time", "end_time"):
+            if key in self._bucket:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        """기존 결과 dict 형태(date, start_time, end_time 포함)로 변환합니다."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"UsageRow({self.to_dict()!r})"
+
+
+_MISSING = object()
+
+
+class Record(Mapping):
+    """고정 필드를 __slots__에 저장하는 읽기 전용 레코드의 기반 클래스입니다.
+
+    Mapping 인터페이스를 제공하므로 기존 dict 기반 코드(.get, [], in)와 JSON 직렬화가
+    그대로 동작합니다. 정의되지 않은 필드는 _extra에 보관되어 원래 JSON 형태를 유지합니다.
+    """
+
+    __slots__ = ("_extra",)
+
+    _fields = ()
+
+    @classmethod
+    def from_dict(cls, data, **overrides):
+        """API 응답 dict로부터 레코드를 생성합니다. overrides는 필드 값을 덮어씁니다."""
+        record = cls.__new__(cls)
+        extra = None
+        for key, value in data.items():
+            if key in cls._fields:
+                continue
+            if extra is None:
+                extra = {}
+            extra[key] = value
+        for field in cls._fields:
+            if field in overrides:
+                value = overrides[field]
+            else:
+                value = data.get(field, _MISSING)
+            setattr(record, field, value)
+        record._extra = extra
+        return record
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra is not None:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._fields:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in self._fields:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field in self._fields:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        """기존 JSON 형태의 dict로 변환합니다."""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Project(Record):
+    """조직 프로젝트 (/v1/organization/projects)"""
+
+    __slots__ = _fields = ("object", "id", "name", "created_at", "archived_at", "status")
+
+
+class ApiKey(Record):
+    """프로젝트 API 키 (/v1/organization/projects/{project_id}/api_keys)"""
+
+    __slots__ = _fields = (
+        "object", "id", "name", "redacted_value", "created_at", "last_used_at", "owner",
+        "project_id", "project_name",
+    )
+
+
+class RateLimit(Record):
+    """get_all_projects_rate_limits에서 사용하는 필터링된 Rate Limit 항목"""
+
+    __slots__ = _fields = ("id", "model", "max_requests_per_1_minute", "max_tokens_per_1_minute")
+
+    @classmethod
+    def from_api(cls, limit):
+        """API 응답에서 필요한 필드만 남긴 Rate Limit 레코드를 생성합니다."""
+        record = cls.__new__(cls)
+        record.id = limit.get("id", "")
+        record.model = limit.get("model", "")
+        record.max_requests_per_1_minute = limit.get("max_requests_per_1_minute", 0)
+        record.max_tokens_per_1_minute = limit.get("max_tokens_per_1_minute", 0)
+        record._extra = None
+        return record
+
+
+class UserDirectory(Sequence):
+    """userinfo 목록에 ID/이름 색인을 붙인 읽기 전용 사용자 디렉터리입니다.
+
+    목록처럼 순회할 수 있으며, 이름 조회는 매번 전체를 훑지 않고 색인을 사용합니다.
+    이름이 중복되면 목록에서 먼저 나온 사용자를 반환합니다 (기존 순차 검색과 동일).
+    """
+
+    __slots__ = ("_users", "_by_id", "_by_name")
+
+    def __init__(self, users=()):
+        self._users = list(users)
+        self._by_id = {}
+        self._by_name = {}
+        for user in self._users:
+            self._by_id.setdefault(user.get("id"), user)
+            self._by_name.setdefault(user.get("name"), user)
+
+    def __getitem__(self, index):
+        return self._users[index]
+
+    def __len__(self):
+        return len(self._users)
+
+    def get(self, user_id, default=None):
+        """ID로 사용자 정보를 찾습니다."""
+        return self._by_id.get(user_id, default)
+
+    def get_name(self, user_id):
+        user = self._by_id.get(user_id)
+        return user.get("name") if user is not None else None
+
+    def get_id(self, name):
+        user = self._by_name.get(name)
+        return user.get("id") if user is not None else None
+
+    def to_list(self):
+        return list(self._users)
+
+
+def _value_set(values):
+    if values is None:
+        return None
+    if isinstance(values, str):
+        return frozenset((values,))
+    return frozenset(values)
+
+
+class UsageFilter:
+    """집계 함수에 넘기는 행 조건 (기간, 사용자/프로젝트/모델 집합). None인 조건은 적용하지 않습니다.
+
+    기간은 버킷 날짜(YYYY-MM-DD, 양 끝 포함)로 먼저 비교하므로 범위 밖 버킷은 행을 보지 않고 건너뜁니다.
+    사용자/프로젝트 값은 그룹화 키와 같게 비교합니다 (빈 user_id는 "unknown_user", 빈 project_id는 "no_project").
+    """
+
+    __slots__ = ("start_date", "end_date", "user_ids", "project_ids", "models")
+
+    def __init__(self, start_date=None, end_date=None, user_ids=None, project_ids=None, models=None):
+        self.start_date = str(start_date) if start_date else None
+        self.end_date = str(end_date) if end_date else None
+        self.user_ids = _value_set(user_ids)
+        self.project_ids = _value_set(project_ids)
+        self.models = _value_set(models)
+
+    @classmethod
+    def coerce(cls, filters):
+        """None, dict 또는 UsageFilter를 UsageFilter로 변환합니다. 조건이 없으면 None을 반환합니다."""
+        if filters is None:
+            return None
+        if not isinstance(filters, cls):
+            filters = cls(**filters)
+        return None if filters.is_empty() else filters
+
+    def is_empty(self):
+        return (
+            self.start_date is None and self.end_date is None
+            and self.user_ids is None and self.project_ids is None and self.models is None
+        )
+
+    def has_row_conditions(self):
+        """기간 외에 행마다 확인할 조건이 있는지"""
+        return self.user_ids is not None or self.project_ids is not None or self.models is not None
+
+    def match_date(self, date):
+        """날짜(YYYY-MM-DD)가 기간 안에 있는지"""
+        if self.start_date is not None and date < self.start_date:
+            return False
+        if self.end_date is not None and date > self.end_date:
+            return False
+        return True
+
+    def match_row(self, row):
+        """행의 사용자/프로젝트/모델이 조건에 맞는지 (기간은 확인하지 않음)"""
+        if self.user_ids is not None:
+            user_id = row.get("user_id")
+            if (user_id if user_id else "unknown_user") not in self.user_ids:
+                return False
+        if self.project_ids is not None:
+            project_id = row.get("project_id")
+            if (project_id if project_id else "no_project") not in self.project_ids:
+                return False
+        if self.models is not None:
+            model = (row.get("line_item") or "").split(",")[0].strip()
+            if model not in self.models:
+                return False
+        return True
+
+    def __call__(self, row):
+        date = row.get("date")
+        return (date is None or self.match_date(date)) and self.match_row(row)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__ if getattr(self, name) is not None)
+        return f"UsageFilter({fields})"
+
+
+def _result_cost(result):
+    amount = result.get("amount")
+    cost = amount.get("value") if isinstance(amount, dict) else None
+    return 0 if cost is None or (isinstance(cost, float) and cost != cost) else cost
+
+
+class BucketIndex(Sequence):
+    """내보내기 버킷을 start_time 순으로 정렬해 둔 읽기 전용 시간 색인입니다.
+
+    버킷별 날짜와 누적 비용을 함께 보관하므로, 기간에 해당하는 버킷 구간은 이진 탐색으로 찾고
+    기간/월 합계는 누적 비용의 차로 계산합니다 (전체 버킷이나 행을 다시 훑지 않음).
+    utils 집계 함수에 내보내기 대신 넘기면 filters의 기간도 이 색인으로 잘라냅니다.
+    """
+
+    __slots__ = ("_buckets", "_starts", "_dates", "_cost_prefix", "_months")
+
+    def __init__(self, data):
+        buckets = data.get("data", []) if isinstance(data, dict) else data or []
+        buckets = [bucket for bucket in buckets if isinstance(bucket, dict) and "start_time" in bucket]
+        starts = [bucket["start_time"] for bucket in buckets]
+        if any(later < earlier for earlier, later in zip(starts, starts[1:])):
+            buckets.sort(key=lambda bucket: bucket["start_time"])
+            starts = [bucket["start_time"] for bucket in buckets]
+        self._buckets = buckets
+        self._starts = starts
+        self._dates = [bucket_date(bucket) for bucket in buckets]
+
+        # _cost_prefix[i] = 앞의 i개 버킷 비용 합계, _months = {YYYY-MM: (첫 위치, 끝 위치)}
+        prefix = [0]
+        months = {}
+        for position, (bucket, date) in enumerate(zip(buckets, self._dates)):
+            prefix.append(prefix[-1] + sum(_result_cost(result) for result in bucket.get("results") or ()))
+            month = date[:7]
+            first = months.get(month, (position,))[0]
+            months[month] = (first, position + 1)
+        self._cost_prefix = prefix
+        self._months = months
+
+    def __getitem__(self, index):
+        return self._buckets[index]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def positions(self, start_date=None, end_date=None):
+        """기간(YYYY-MM-DD, 양 끝 포함)에 해당하는 버킷 위치 [lo, hi)"""
+        lo = bisect.bisect_left(self._dates, str(start_date)) if start_date else 0
+        hi = bisect.bisect_right(self._dates, str(end_date)) if end_date else len(self._dates)
+        return lo, max(lo, hi)
+
+    def time_positions(self, start_time=None, end_time=None):
+        """start_time이 [start_time, end_time)에 있는 버킷 위치 [lo, hi)"""
+        lo = bisect.bisect_left(self._starts, start_time) if start_time is not None else 0
+        hi = bisect.bisect_left(self._starts, end_time) if end_time is not None else len(self._starts)
+        return lo, max(lo, hi)
+
+    def slice(self, start_date=None, end_date=None):
+        """기간에 해당하는 버킷 목록"""
+        lo, hi = self.positions(start_date, end_date)
+        return self._buckets[lo:hi]
+
+    def dated(self, start_date=None, end_date=None):
+        """기간에 해당하는 (버킷, 날짜) 목록"""
+        lo, hi = self.positions(start_date, end_date)
+        return list(zip(self._buckets[lo:hi], self._dates[lo:hi]))
+
+    def total_cost(self, start_date=None, end_date=None):
+        """기간의 총 비용"""
+        lo, hi = self.positions(start_date, end_date)
+        return self._cost_prefix[hi] - self._cost_prefix[lo]
+
+    def date_range(self):
+        """(첫 날짜, 마지막 날짜). 비어 있으면 (None, None)"""
+        return (self._dates[0], self._dates[-1]) if self._dates else (None, None)
+
+    def months(self):
+        """데이터가 있는 월(YYYY-MM) 목록 (오름차순)"""
+        return list(self._months)
+
+    def month_buckets(self, month):
+        """해당 월의 버킷 목록"""
+        lo, hi = self._months.get(month, (0, 0))
+        return self._buckets[lo:hi]
+
+    def month_cost(self, month):
+        """해당 월의 총 비용"""
+        lo, hi = self._months.get(month, (0, 0))
+        return self._cost_prefix[hi] - self._cost_prefix[lo]
+
+    def month_over_month(self):
+        """월별 총 비용과 전월 대비 변화량/변화율(%) 목록
+
+        Returns:
+            list: [{"month", "total_cost", "previous_cost", "change", "change_rate"}, ...]
+                  첫 달과 전월 비용이 0인 달의 change_rate는 None
+        """
+        comparison = []
+        previous = None
+        for month in self._months:
+            cost = self.month_cost(month)
+            change = cost - previous if previous is not None else None
+            comparison.append({
+                "month": month,
+                "total_cost": cost,
+                "previous_cost": previous,
+                "change": change,
+                "change_rate": change / previous * 100 if previous else None,
+            })
+            previous = cost
+        return comparison
+
+    def month_to_date(self, month=None):
+        """월의 데이터가 있는 마지막 날까지의 비용을 전월 같은 날짜 범위와 비교합니다.
+
+        진행 중인 달(예: 3월 1일까지만 있는 경우)을 전월 전체와 비교하지 않도록 3/1~3/N과 2/1~2/N을
+        비교합니다 (전월이 N일보다 짧으면 전월 말일까지).
+
+        Args:
+            month: 비교할 월(YYYY-MM, 기본값 데이터의 마지막 월)
+
+        Returns:
+            dict: {"month", "previous_month", "through_day", "total_cost", "previous_cost", "change",
+                   "change_rate"}. 데이터가 전월 1일부터 있지 않거나 전월 비용이 0이면 change/change_rate는 None.
+                   데이터가 없으면 None
+        """
+        if month is None:
+            if not self._months:
+                return None
+            month = next(reversed(self._months))
+        if month not in self._months:
+            return None
+        lo, hi = self._months[month]
+        last_day = self._dates[hi - 1]
+        through_day = int(last_day[8:10])
+        year, month_number = int(month[:4]), int(month[5:7])
+        if month_number == 1:
+            year, month_number = year - 1, 12
+        else:
+            month_number -= 1
+        previous_month = f"{year:04d}-{month_number:02d}"
+        previous_end = min(through_day, calendar.monthrange(year, month_number)[1])
+
+        cost = self.total_cost(f"{month}-01", last_day)
+        comparable = bool(self._dates) and self._dates[0] <= f"{previous_month}-01"
+        previous = self.total_cost(f"{previous_month}-01", f"{previous_month}-{previous_end:02d}") if comparable else None
+        change = cost - previous if previous else None
+        return {
+            "month": month,
+            "previous_month": previous_month,
+            "through_day": through_day,
+            "total_cost": cost,
+            "previous_cost": previous,
+            "change": change,
+            "change_rate": change / previous * 100 if change is not None else None,
+        }
+
+    def compare_months(self, month, previous_month, key):
+        """두 달의 비용을 key(row -> 그룹 키)별로 비교합니다. 두 달의 버킷만 읽습니다.
+
+        Returns:
+            dict: {그룹 키: {"current", "previous", "change"}}
+        """
+        totals = {}
+        for slot, target in ((0, month), (1, previous_month)):
+            for bucket in self.month_buckets(target):
+                for result in bucket.get("results") or ():
+                    group = key(result)
+                    entry = totals.get(group)
+                    if entry is None:
+                        entry = totals[group] = [0, 0]
+                    entry[slot] += _result_cost(result)
+        return {
+            group: {"current": current, "previous": previous, "change": current - previous}
+            for group, (current, previous) in totals.items()
+        }
+
+
+def to_dicts(records):
+    """레코드 목록을 JSON 직렬화 가능한 dict 목록으로 변환합니다."""
+    return [record.to_dict() if isinstance(record, Mapping) else record for record in records]
@@ -0,0 +1,152 @@
+"""
+Headless cost report
+Streamlit 없이 내보내기 파일을 집계하여 사용자별/프로젝트별 비용과 예산 초과 내역을 CSV/JSON으로 저장합니다.
+"""
+
+import csv
+import os
+
+from batch_ingest import ingest_export_files
+from forecast import forecast_spend
+from jsonio import atomic_write_json, load_json_cached
+from records import UsageFilter
+from utils import (
+    calculate_project_usage,
+    find_budget_overages,
+    get_name_with_userID,
+    get_total_cost,
+    group_by_userID,
+    load_project_budgets,
+    load_userinfo,
+    project_budget_forecast,
+)
+
+REPORT_FORMATS = ("csv", "json", "both")
+
+
+def build_report(paths, budgets_file="project_budgets.json", userinfo_file=None, workers=None, filters=None):
+    """내보내기 파일들을 병렬로 읽어 보고서 데이터를 생성합니다.
+
+    Args:
+        paths: 내보내기 파일, 디렉터리 또는 glob 패턴 목록
+        budgets_file: 프로젝트 예산 JSON 파일 경로 (없으면 설정 저장소의 예산 사용)
+        userinfo_file: 사용자 이름 표시용 userinfo.json 경로 (선택)
+        workers: 파싱에 사용할 프로세스 수 (None이면 CPU 코어 수)
+        filters: 집계할 기간/사용자/프로젝트/모델 (UsageFilter 또는 같은 키의 dict, 선택)
+
+    Returns:
+        dict: {"summary": {...}, "users": [...], "projects": [...], "overages": [...]}
+    """
+    ledgers = ingest_export_files(paths, max_workers=workers)
+    user_ledger = ledgers.get("user")
+    # 프로젝트 내보내기가 없으면 사용자 내보내기의 project_id로 프로젝트 집계
+    project_ledger = ledgers.get("project", user_ledger)
+
+    userinfo = load_userinfo(userinfo_file) if userinfo_file else []
+    filters = UsageFilter.coerce(filters)
+
+    users = []
+    if user_ledger is not None:
+        for user_id, lines in group_by_userID(user_ledger.rows(), filters).items():
+            users.append({
+                "user_id": user_id,
+                "name": get_name_with_userID(user_id, userinfo) if userinfo else None,
+                "total_cost": get_total_cost(lines)[0],
+                "requests": len(lines),
+            })
+        users.sort(key=lambda x: x["total_cost"], reverse=True)
+
+    projects = []
+    overages = []
+    if project_ledger is not None:
+        project_usage = calculate_project_usage(project_ledger.rows(), filters)
+        if budgets_file and os.path.exists(budgets_file):
+            budgets = load_json_cached(budgets_file)
+        else:
+            budgets = load_project_budgets()
+        # total_cost와 같은 행(같은 조건, 데이터 첫날부터)으로 예측
+        forecasts = forecast_spend(
+            project_ledger.to_export(), budgets=budgets, period_start="all", filters=filters
+        )["forecasts"]
+        for project_id, usage in project_usage.items():
+            budget = budgets.get(project_id)
+            projected, exhaustion_date = project_budget_forecast(
+                usage["total_cost"], budget, forecasts.get(project_id)
+            )
+            projects.append({
+                "project_id": project_id,
+                "total_cost": usage["total_cost"],
+                "requests": usage["total_requests"],
+                "users": len(usage["users"]),
+                "budget": budget,
+                "projected_cost": projected,
+                "exhaustion_date": exhaustion_date,
+            })
+        projects.sort(key=lambda x: x["total_cost"], reverse=True)
+
+        for overage in find_budget_overages(project_usage, budgets):
+            overages.append({k: v for k, v in overage.items() if k != "usage_details"})
+
+    dates = sorted(project_ledger.cost_by_date) if project_ledger is not None else []
+    if filters is not None:
+        dates = [date for date in dates if filters.match_date(date)]
+    summary = {
+        "start_date": dates[0] if dates else None,
+        "end_date": dates[-1] if dates else None,
+        "user_total_cost": _total(user_ledger, users, filters),
+        "project_total_cost": _total(project_ledger, projects, filters),
+        "user_count": len(users),
+        "project_count": len(projects),
+        "overage_count": len(overages),
+    }
+    return {"summary": summary, "users": users, "projects": projects, "overages": overages}
+
+
+def _total(ledger, entries, filters):
+    # 조건이 없으면 원장 합계, 있으면 걸러진 항목의 합계
+    if ledger is None:
+        return None
+    if filters is None:
+        return ledger.total_cost
+    return sum(entry["total_cost"] for entry in entries)
+
+
+def _write_csv(path, rows, fieldnames):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_report(report, output_dir="reports", fmt="both"):
+    """보고서를 output_dir에 CSV(users/projects/overages.csv) 및/또는 JSON(report.json)으로 저장합니다.
+
+    fmt는 REPORT_FORMATS 중 하나이며, 그 외 값이면 ValueError를 발생시킵니다.
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"알 수 없는 보고서 형식: {fmt} (가능한 값: {', '.join(REPORT_FORMATS)})")
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+
+    if fmt in ("csv", "both"):
+        tables = {
+            "users.csv": (report["users"], ["user_id", "name", "total_cost", "requests"]),
+            "projects.csv": (report["projects"], [
+                "project_id", "total_cost", "requests", "users", "budget", "projected_cost", "exhaustion_date",
+            ]),
+            "overages.csv": (report["overages"], [
+                "project_id", "project_name", "budget", "actual_usage",
+                "overage_amount", "overage_percentage",
+            ]),
+        }
+        for filename, (rows, fieldnames) in tables.items():
+            path = os.path.join(output_dir, filename)
+            _write_csv(path, rows, fieldnames)
+            written.append(path)
+
+    if fmt in ("json", "both"):
+        path = os.path.join(output_dir, "report.json")
+        atomic_write_json(path, report, indent=2)
+        written.append(path)
+
+    return written
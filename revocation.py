@@ -0,0 +1,197 @@
+"""
+Key revocation policy
+예산 초과 프로젝트(find_budget_overages 결과)에 규칙을 적용하여 삭제할 API 키 목록(계획)을 만들고,
+계획을 동시에 실행합니다. dry_run이면 계획만 반환하고 키를 삭제하지 않습니다.
+
+규칙 예시 (사용률은 예산 대비 %, idle_days가 없으면 프로젝트의 모든 키):
+    [
+        {"name": "idle-keys", "min_usage_rate": 100, "idle_days": 30},
+        {"name": "hard-stop", "min_usage_rate": 150},
+    ]
+"""
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from logging_config import get_logger
+
+logger = get_logger("revocation")
+
+DAY_SECONDS = 86400
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RULES = (
+    {"name": "idle-keys", "min_usage_rate": 100, "idle_days": 30},
+    {"name": "hard-stop", "min_usage_rate": 150},
+)
+
+
+def normalize_rules(rules):
+    """규칙을 검증하고 min_usage_rate가 높은 순으로 정렬합니다."""
+    normalized = []
+    for index, rule in enumerate(rules or ()):
+        min_usage_rate = rule.get("min_usage_rate", 100)
+        idle_days = rule.get("idle_days")
+        if min_usage_rate < 0 or (idle_days is not None and idle_days < 0):
+            raise ValueError(f"잘못된 규칙: {rule}")
+        normalized.append({
+            "name": rule.get("name") or f"rule-{index + 1}",
+            "min_usage_rate": min_usage_rate,
+            "idle_days": idle_days,
+        })
+    normalized.sort(key=lambda rule: rule["min_usage_rate"], reverse=True)
+    return normalized
+
+
+def _effective_rule(usage_rate, rules):
+    """사용률에 적용되는 규칙 중 가장 넓게 삭제하는 규칙 (idle_days가 가장 짧은 규칙)"""
+    chosen = None
+    for rule in rules:
+        if usage_rate < rule["min_usage_rate"]:
+            continue
+        if rule["idle_days"] is None:
+            return rule
+        if chosen is None or rule["idle_days"] < chosen["idle_days"]:
+            chosen = rule
+    return chosen
+
+
+def _last_activity(key):
+    last_used = key.get("last_used_at")
+    return last_used if last_used is not None else key.get("created_at") or 0
+
+
+def build_revocation_plan(overages, keys_by_project, rules=DEFAULT_RULES, now=None):
+    """예산 초과 프로젝트마다 규칙에 맞는 삭제 대상 키를 계산합니다.
+
+    Args:
+        overages: find_budget_overages 결과 (project_id, budget, actual_usage 필요)
+        keys_by_project: {project_id: [API 키, ...]} (get_project_api_keys 결과)
+        rules: 규칙 목록 (모듈 설명 참고)
+        now: 기준 시각 (unix time, 기본값 현재)
+
+    Returns:
+        dict: {
+            "projects": [{"project_id", "project_name", "usage_rate", "rule", "keys": [...]}, ...],
+            "total_keys", "skipped" (키 목록을 가져오지 못한 project_id 목록),
+        }
+    """
+    rules = normalize_rules(rules)
+    now = time.time() if now is None else now
+    projects = []
+    skipped = []
+    total_keys = 0
+
+    for overage in overages:
+        project_id = overage["project_id"]
+        budget = overage.get("budget") or 0
+        usage_rate = overage["actual_usage"] / budget * 100 if budget > 0 else 0
+        rule = _effective_rule(usage_rate, rules)
+        if rule is None:
+            continue
+        keys = keys_by_project.get(project_id)
+        if keys is None:
+            skipped.append(project_id)
+            continue
+
+        if rule["idle_days"] is None:
+            targets = keys
+        else:
+            cutoff = now - rule["idle_days"] * DAY_SECONDS
+            targets = [key for key in keys if _last_activity(key) < cutoff]
+        if not targets:
+            continue
+
+        projects.append({
+            "project_id": project_id,
+            "project_name": overage.get("project_name", project_id),
+            "usage_rate": usage_rate,
+            "rule": rule["name"],
+            "keys": [
+                {"api_key_id": key.get("id"), "key_name": key.get("name", ""), "last_used_at": key.get("last_used_at")}
+                for key in targets
+            ],
+        })
+        total_keys += len(targets)
+
+    return {"projects": projects, "total_keys": total_keys, "skipped": skipped}
+
+
+def _map_concurrently(func, items, max_workers):
+    # 스레드에서도 sweep 마감 시간(ContextVar)이 적용되도록 현재 컨텍스트를 복사하여 실행
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(context.copy().run, func, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def fetch_keys_for_overages(overages, admin_api_key=None, max_workers=DEFAULT_MAX_WORKERS):
+    """초과 프로젝트들의 API 키 목록을 동시에 가져옵니다. 실패한 프로젝트는 결과에서 빠집니다."""
+    from utils import get_project_api_keys
+
+    project_ids = list(dict.fromkeys(overage["project_id"] for overage in overages))
+    if not project_ids:
+        return {}
+    keys = _map_concurrently(
+        lambda project_id: get_project_api_keys(project_id, admin_api_key), project_ids, max_workers
+    )
+    return {project_id: project_keys for project_id, project_keys in zip(project_ids, keys) if project_keys is not None}
+
+
+def execute_revocation_plan(plan, admin_api_key=None, dry_run=True, max_workers=DEFAULT_MAX_WORKERS):
+    """계획의 키를 동시에 삭제합니다.
+
+    Returns:
+        dict: {"dry_run", "success": [...], "failed": [...], "skipped": [...]} (bulk_delete_api_keys와 같은 형태.
+              skipped는 마감 시간이 지나 삭제 요청을 보내지 않은 키)
+    """
+    from utils import _deadline_exceeded, delete_api_key
+
+    targets = [
+        {"project_id": project["project_id"], "api_key_id": key["api_key_id"], "key_name": key["key_name"]}
+        for project in plan["projects"]
+        for key in project["keys"]
+    ]
+    if dry_run:
+        return {"dry_run": True, "success": [], "failed": [], "skipped": [], "planned": targets}
+
+    def revoke(target):
+        # 마감 시간이 지나면 남은 키는 요청하지 않고 건너뜀 (API 실패와 구분)
+        if _deadline_exceeded():
+            return "skipped"
+        ok = delete_api_key(target["project_id"], target["api_key_id"], admin_api_key)
+        return "success" if ok else "failed"
+
+    results = {"dry_run": False, "success": [], "failed": [], "skipped": []}
+    if targets:
+        for target, outcome in zip(targets, _map_concurrently(revoke, targets, max_workers)):
+            results[outcome].append(target)
+    logger.info(
+        "키 회수: 성공 %d개, 실패 %d개, 건너뜀 %d개",
+        len(results["success"]), len(results["failed"]), len(results["skipped"]),
+    )
+    return results
+
+
+def enforce_budget_policy(overages, rules=DEFAULT_RULES, admin_api_key=None, dry_run=True,
+                          max_workers=DEFAULT_MAX_WORKERS, now=None):
+    """키 조회 -> 계획 계산 -> (dry_run이 아니면) 실행을 한 번에 수행합니다.
+
+    Returns:
+        dict: {"plan": build_revocation_plan 결과, "result": execute_revocation_plan 결과}
+    """
+    from utils import sweep_deadline
+
+    with sweep_deadline():
+        # 규칙이 적용되지 않는 프로젝트의 키는 조회하지 않음
+        normalized = normalize_rules(rules)
+        candidates = [
+            overage for overage in overages
+            if _effective_rule(
+                overage["actual_usage"] / overage["budget"] * 100 if overage.get("budget") else 0, normalized
+            ) is not None
+        ]
+        keys_by_project = fetch_keys_for_overages(candidates, admin_api_key, max_workers)
+        plan = build_revocation_plan(candidates, keys_by_project, normalized, now=now)
+        result = execute_revocation_plan(plan, admin_api_key, dry_run=dry_run, max_workers=max_workers)
+    return {"plan": plan, "result": result}
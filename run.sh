@@ -1,3 +1,3 @@
-python3 main.py \
+python3 main.py run \
     --app_path app.py \
     --port 51075 \
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+SQLite settings store
+프로젝트 예산과 Rate Limit 템플릿을 SQLite(WAL 모드)에 행 단위로 저장합니다.
+여러 서버 워커와 Streamlit 세션이 동시에 읽고 쓸 수 있으며, 읽기는 메모리 캐시를 사용합니다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import CACHE_LOOKUPS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS project_budgets (
+    project_id TEXT PRIMARY KEY,
+    budget REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_limit_templates (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def default_db_path():
+    """설정 DB 경로 (환경 변수 TRACKER_DB_PATH, 기본값 tracker.db)"""
+    return os.environ.get("TRACKER_DB_PATH", "tracker.db")
+
+
+class SettingsStore:
+    """예산/템플릿 저장소. 프로세스 안에서는 연결 하나와 읽기 캐시 하나를 모든 스레드가 공유합니다.
+
+    Streamlit은 rerun마다 새 스레드에서 스크립트를 실행하므로, 스레드별 연결/캐시로는 캐시가
+    적중하지 않고 스키마 설정도 매번 다시 실행됩니다. 연결과 캐시는 잠금 안에서만 사용합니다.
+    다른 프로세스가 커밋하면 PRAGMA data_version 값이 바뀌므로, 읽기 시 이 값만 확인하여
+    캐시를 무효화합니다. 자신의 쓰기는 캐시에 바로 반영합니다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        self._lock = threading.RLock()
+        self._conn = None
+        self._version = None
+        self._budgets = None
+        self._templates = {}
+
+    def _connection(self):
+        """공유 연결을 반환하고, 다른 연결의 커밋이 있었으면 캐시를 비웁니다. 잠금 안에서 호출합니다."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._version = version
+            self._budgets = None
+            self._templates = {}
+        return self._conn
+
+    def _write(self, statements):
+        """여러 SQL 문을 하나의 트랜잭션으로 실행합니다. 잠금 안에서 호출합니다."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                if isinstance(params, list):
+                    conn.executemany(sql, params)
+                else:
+                    conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- 프로젝트 예산 ---
+
+    def get_budgets(self):
+        """{project_id: budget} 사본을 반환합니다."""
+        with self._lock:
+            conn = self._connection()
+            if self._budgets is None:
+                CACHE_LOOKUPS.inc("settings_budgets", "miss")
+                rows = conn.execute("SELECT project_id, budget FROM project_budgets")
+                self._budgets = dict(rows.fetchall())
+            else:
+                CACHE_LOOKUPS.inc("settings_budgets", "hit")
+            return dict(self._budgets)
+
+    def set_budget(self, project_id, budget):
+        """프로젝트 하나의 예산을 저장(upsert)합니다."""
+        self.set_budgets({project_id: budget})
+
+    def set_budgets(self, budgets):
+        """여러 프로젝트의 예산을 한 트랜잭션으로 저장(upsert)합니다. 다른 프로젝트는 유지됩니다."""
+        now = time.time()
+        with self._lock:
+            self._write([(
+                "INSERT INTO project_budgets (project_id, budget, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(project_id) DO UPDATE SET budget = excluded.budget, updated_at = excluded.updated_at",
+                [(project_id, float(budget), now) for project_id, budget in budgets.items()],
+            )])
+            if self._budgets is not None:
+                self._budgets.update({k: float(v) for k, v in budgets.items()})
+
+    def replace_budgets(self, budgets):
+        """전체 예산을 주어진 값으로 교체합니다."""
+        now = time.time()
+        with self._lock:
+            self._write([
+                ("DELETE FROM project_budgets", ()),
+                (
+                    "INSERT INTO project_budgets (project_id, budget, updated_at) VALUES (?, ?, ?)",
+                    [(project_id, float(budget), now) for project_id, budget in budgets.items()],
+                ),
+            ])
+            self._budgets = {k: float(v) for k, v in budgets.items()}
+
+    def delete_budget(self, project_id):
+        """프로젝트 하나의 예산을 삭제합니다."""
+        with self._lock:
+            self._write([("DELETE FROM project_budgets WHERE project_id = ?", (project_id,))])
+            if self._budgets is not None:
+                self._budgets.pop(project_id, None)
+
+    def clear_budgets(self):
+        """모든 예산을 삭제합니다."""
+        with self._lock:
+            self._write([("DELETE FROM project_budgets", ())])
+            self._budgets = {}
+
+    # --- Rate Limit 템플릿 ---
+
+    def get_template(self, name):
+        """템플릿 데이터의 사본을 반환합니다. 없으면 None.
+
+        캐시에는 저장된 JSON 문자열을 두고 매번 새로 파싱하므로, 반환값을 수정해도 캐시는 바뀌지 않습니다.
+        """
+        with self._lock:
+            conn = self._connection()
+            if name not in self._templates:
+                CACHE_LOOKUPS.inc("settings_templates", "miss")
+                row = conn.execute(
+                    "SELECT data FROM rate_limit_templates WHERE name = ?", (name,)
+                ).fetchone()
+                self._templates[name] = row[0] if row else None
+            else:
+                CACHE_LOOKUPS.inc("settings_templates", "hit")
+            data = self._templates[name]
+        return json.loads(data) if data is not None else None
+
+    def save_template(self, name, data):
+        """템플릿을 저장(upsert)합니다."""
+        serialized = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._write([(
+                "INSERT INTO rate_limit_templates (name, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (name, serialized, time.time()),
+            )])
+            self._templates[name] = serialized
+
+    # --- 메타 정보 ---
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._write([(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )])
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=None):
+    """경로별로 하나의 SettingsStore를 공유합니다."""
+    path = os.path.abspath(path or default_db_path())
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = SettingsStore(path)
+        return store
@@ -0,0 +1,44 @@
+from analytics_store import AnalyticsStore
+
+DAY = 86400
+START = 1_772_000_000 // DAY * DAY
+
+
+def _bucket(start, *rows):
+    return {
+        "start_time": start,
+        "end_time": start + DAY,
+        "results": [
+            {"amount": {"value": cost}, "user_id": user_id, "project_id": "proj_1", "line_item": "gpt-4o, input"}
+            for user_id, cost in rows
+        ],
+    }
+
+
+def _store(tmp_path):
+    return AnalyticsStore(str(tmp_path / "analytics.db"))
+
+
+def test_reingested_bucket_drops_missing_keys(tmp_path):
+    store = _store(tmp_path)
+    store.ingest({"data": [_bucket(START, ("user_1", 1.0), ("user_2", 2.0))]})
+    store.ingest({"data": [_bucket(START, ("user_1", 1.5))]})
+
+    assert store.total_cost() == 1.5
+    assert list(store.aggregate("user")) == ["user_1"]
+
+
+def test_same_export_ingested_twice_is_not_double_counted(tmp_path):
+    store = _store(tmp_path)
+    export = {"data": [_bucket(START, ("user_1", 1.0), ("user_1", 2.0)), _bucket(START + DAY, ("user_2", 4.0))]}
+    store.ingest(export)
+    store.ingest(export)
+
+    assert store.total_cost() == 7.0
+
+
+def test_split_bucket_within_one_export_is_summed(tmp_path):
+    store = _store(tmp_path)
+    store.ingest({"data": [_bucket(START, ("user_1", 1.0)), _bucket(START, ("user_1", 2.0))]}, batch_size=1)
+
+    assert store.total_cost() == 3.0
@@ -0,0 +1,15 @@
+from budget_watcher import crossed_threshold
+from utils import budget_status
+
+
+def test_full_budget_alert_matches_over_status():
+    assert crossed_threshold(100.0, 100.0) == 90
+    assert budget_status(100.0, 100.0) != "over"
+
+    assert crossed_threshold(100.01, 100.0) == 100
+    assert budget_status(100.01, 100.0) == "over"
+
+
+def test_lower_thresholds_fire_on_reaching_them():
+    assert crossed_threshold(70.0, 100.0) == 70
+    assert crossed_threshold(69.99, 100.0) == 0
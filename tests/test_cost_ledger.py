@@ -0,0 +1,63 @@
+from cost_ledger import CostLedger
+from utils import get_total_cost
+
+DAY = 86400
+START = 1740787200  # 2025-03-01 UTC
+
+
+def _row(cost, user_id="user-1", project_id="proj_1", line_item="gpt-4o, input"):
+    return {"amount": {"value": cost}, "user_id": user_id, "project_id": project_id, "line_item": line_item}
+
+
+def _export(*buckets):
+    return {
+        "data": [
+            {"start_time": start, "end_time": start + DAY, "results": list(results)}
+            for start, results in buckets
+        ]
+    }
+
+
+def test_duplicate_keys_in_one_bucket_are_all_kept():
+    export = _export((START, [_row(1.0), _row(2.0)]))
+    ledger = CostLedger()
+
+    assert ledger.ingest(export) == 2
+    assert len(ledger) == 2
+    assert ledger.total_cost == get_total_cost(export)[0] == 3.0
+    assert ledger.cost_by_project["proj_1"] == 3.0
+
+
+def test_latest_bucket_is_replaced_by_later_export():
+    ledger = CostLedger()
+    ledger.ingest(_export((START, [_row(1.0)]), (START + DAY, [_row(1.0), _row(2.0)])))
+
+    # 진행 중이던 마지막 버킷이 갱신되어 다시 내려받은 경우: 행 하나가 빠지고 값이 바뀜
+    ledger.ingest(_export((START + DAY, [_row(5.0)])))
+
+    assert len(ledger) == 2
+    assert ledger.total_cost == 6.0
+    assert ledger.cost_by_date == {"2025-03-01": 1.0, "2025-03-02": 5.0}
+
+
+def test_same_export_ingested_twice_is_not_double_counted():
+    export = _export((START, [_row(1.0), _row(2.0)]), (START + DAY, [_row(4.0), _row(4.0)]))
+    ledger = CostLedger()
+    ledger.ingest(export)
+
+    assert ledger.ingest(export) == 0
+    assert ledger.total_cost == 11.0
+    assert len(ledger) == 4
+
+
+def test_merge_keeps_duplicate_keys():
+    first = CostLedger()
+    first.ingest(_export((START, [_row(1.0), _row(2.0)])))
+    second = CostLedger()
+    second.ingest(_export((START + DAY, [_row(3.0), _row(3.0)])))
+
+    first.merge(second)
+
+    assert len(first) == 4
+    assert first.total_cost == 9.0
+    assert CostLedger().ingest(first.to_export()) == 4
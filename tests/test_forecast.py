@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+from forecast import forecast_spend
+
+DAY = 86400
+
+
+def _daily_export(days, start="2026-03-01", cost=10.0, project_id="proj_1"):
+    # bucket_date와 같은 로컬 시간 기준으로 자정 버킷을 만듦
+    first = int(datetime.fromisoformat(start).timestamp())
+    return {
+        "data": [
+            {
+                "start_time": first + i * DAY,
+                "end_time": first + (i + 1) * DAY,
+                "results": [{"amount": {"value": cost}, "project_id": project_id}],
+            }
+            for i in range(days)
+        ]
+    }
+
+
+def test_period_starting_after_the_data_only_projects_period_days():
+    result = forecast_spend(
+        _daily_export(10), budgets={"proj_1": 50}, period_start="2026-03-20", period_end="2026-03-31"
+    )
+    forecast = result["forecasts"]["proj_1"]
+
+    assert result["period_start"] == "2026-03-20"
+    assert forecast["spent"] == 0
+    # 3/20 ~ 3/31 12일 x $10
+    assert forecast["projected"] == pytest.approx(120.0)
+    assert forecast["exhaustion_date"] == "2026-03-24"
+
+
+def test_period_start_all_counts_every_data_day():
+    result = forecast_spend(_daily_export(10), budgets={"proj_1": 50}, period_start="all")
+    forecast = result["forecasts"]["proj_1"]
+
+    assert result["period_start"] == "2026-03-01"
+    assert forecast["spent"] == pytest.approx(100.0)
+    # 3/11 ~ 3/31 21일 x $10
+    assert forecast["remaining"] == pytest.approx(210.0)
+    assert forecast["projected"] == pytest.approx(310.0)
+    # 이미 초과한 예산은 실제로 넘은 날
+    assert forecast["exhaustion_date"] == "2026-03-05"
+
+
+def test_period_ending_before_the_last_data_day_has_no_projection():
+    result = forecast_spend(
+        _daily_export(10), budgets={"proj_1": 50}, period_start="2026-03-05", period_end="2026-03-08"
+    )
+    forecast = result["forecasts"]["proj_1"]
+
+    assert forecast["spent"] == pytest.approx(40.0)
+    assert forecast["remaining"] == 0
+    assert forecast["exhaustion_date"] is None
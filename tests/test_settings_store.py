@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+
+import pytest
+
+import utils
+from metrics import CACHE_LOOKUPS
+from settings_store import SettingsStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SettingsStore(str(tmp_path / "tracker.db"))
+    monkeypatch.setattr(utils, "get_store", lambda: store)
+    return store
+
+
+def _write_template(path, data, mtime_ns):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_template_file_edit_is_reimported(tmp_path, store):
+    path = tmp_path / "rate_limit_template_default.json"
+    _write_template(path, {"rate_limits": [{"model": "a", "max_requests_per_1_minute": 10}]}, 1_000_000_000)
+    assert utils.load_rate_limit_template(str(path))["rate_limits"][0]["max_requests_per_1_minute"] == 10
+
+    _write_template(path, {"rate_limits": [{"model": "a", "max_requests_per_1_minute": 20}]}, 2_000_000_000)
+    assert utils.load_rate_limit_template(str(path))["rate_limits"][0]["max_requests_per_1_minute"] == 20
+
+
+def test_saved_template_wins_until_file_changes(tmp_path, store):
+    path = tmp_path / "rate_limit_template_default.json"
+    _write_template(path, {"rate_limits": []}, 1_000_000_000)
+    utils.load_rate_limit_template(str(path))
+
+    utils.save_rate_limit_template({"rate_limits": [{"model": "b"}]}, str(path))
+    assert utils.load_rate_limit_template(str(path)) == {"rate_limits": [{"model": "b"}]}
+
+
+def test_same_file_name_in_different_directories(tmp_path, store):
+    for sub, value in (("a", 1), ("b", 2)):
+        (tmp_path / sub).mkdir()
+        _write_template(tmp_path / sub / "rate_limit_template.json", {"value": value}, 1_000_000_000)
+
+    assert utils.load_rate_limit_template(str(tmp_path / "a" / "rate_limit_template.json")) == {"value": 1}
+    assert utils.load_rate_limit_template(str(tmp_path / "b" / "rate_limit_template.json")) == {"value": 2}
+
+
+def test_read_cache_is_shared_across_threads(store):
+    store.set_budgets({"proj_1": 10.0})
+    store.get_budgets()
+    hits = CACHE_LOOKUPS.value("settings_budgets", "hit")
+
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(store.get_budgets()))
+    thread.start()
+    thread.join()
+
+    assert result == {"proj_1": 10.0}
+    assert CACHE_LOOKUPS.value("settings_budgets", "hit") == hits + 1
+
+
+def test_other_connection_commit_invalidates_cache(tmp_path, store):
+    store.set_budgets({"proj_1": 10.0})
+    assert store.get_budgets() == {"proj_1": 10.0}
+
+    SettingsStore(store.path).set_budgets({"proj_1": 25.0})
+    assert store.get_budgets() == {"proj_1": 25.0}
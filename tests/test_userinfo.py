@@ -0,0 +1,10 @@
+from utils import get_name_with_userID, get_userID_with_name
+
+
+def test_plain_list_edited_in_place_is_not_stale():
+    users = [{"id": "user_1", "name": "alice"}]
+    assert get_name_with_userID("user_1", users) == "alice"
+
+    users[0] = {"id": "user_2", "name": "bob"}
+    assert get_name_with_userID("user_1", users) is None
+    assert get_userID_with_name("bob", users) == "user_2"
@@ -0,0 +1,176 @@
+"""
+Cost/usage API sync
+OpenAI 조직 Costs/Usage API에서 일 단위 버킷을 직접 가져와 로컬 원장(CostLedger 파일)에 병합합니다.
+기간을 여러 구간(chunk)으로 나눠 동시에 가져오고(구간 안에서는 next_page pagination),
+원장의 마지막 버킷부터 다시 시작하므로 매번 전체 기간을 내려받지 않습니다.
+
+    python main.py sync --days=90
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 python main.py sync   # benchmarks.mock_org_api 대상
+"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cost_ledger import CostLedger, UsageLedger
+from logging_config import get_logger
+
+logger = get_logger("sync")
+
+DAY_SECONDS = 86400
+DEFAULT_DAYS = 30
+DEFAULT_CHUNK_DAYS = 7
+DEFAULT_MAX_WORKERS = 4
+
+# 종류별 API 경로, 요청 파라미터, 기본 원장 파일과 원장 종류
+# (usage 행에는 비용이 없으므로 토큰/요청 수를 집계하는 UsageLedger에 저장)
+SOURCES = {
+    "costs": {
+        "endpoint": "/organization/costs",
+        "params": {"bucket_width": "1d", "group_by": ["project_id", "line_item"], "limit": 180},
+        "ledger": "project_ledger.json",
+        "ledger_class": CostLedger,
+    },
+    "usage": {
+        "endpoint": "/organization/usage/completions",
+        "params": {"bucket_width": "1d", "group_by": ["user_id", "project_id", "model"], "limit": 31},
+        "ledger": "usage_ledger.json",
+        "ledger_class": UsageLedger,
+    },
+}
+
+
+class SyncError(Exception):
+    """구간을 가져오지 못했을 때 발생합니다."""
+
+
+def _day_start(timestamp):
+    return int(timestamp) // DAY_SECONDS * DAY_SECONDS
+
+
+def plan_chunks(start_time, end_time, chunk_days=DEFAULT_CHUNK_DAYS):
+    """[start_time, end_time)을 chunk_days일 단위 구간 목록으로 나눕니다."""
+    step = max(1, int(chunk_days)) * DAY_SECONDS
+    return [(start, min(start + step, end_time)) for start in range(start_time, end_time, step)]
+
+
+def fetch_buckets(source, start_time, end_time, headers):
+    """한 구간의 모든 버킷을 next_page를 따라 가져옵니다. 실패하면 SyncError를 발생시킵니다."""
+    import requests
+
+    from utils import _api_request, _api_url, _deadline_exceeded
+
+    spec = SOURCES[source]
+    url = _api_url(spec["endpoint"])
+    params = dict(spec["params"], start_time=start_time, end_time=end_time)
+    buckets = []
+    while True:
+        try:
+            response = _api_request("GET", spec["endpoint"], url, headers, params=params)
+        except requests.exceptions.RequestException as e:
+            raise SyncError(f"{source} {start_time}-{end_time}: {e}") from e
+        if response.status_code != 200:
+            raise SyncError(f"{source} {start_time}-{end_time}: HTTP {response.status_code} {response.text}")
+        page = response.json()
+        buckets.extend(page.get("data", []))
+        next_page = page.get("next_page")
+        if not page.get("has_more") or not next_page:
+            return buckets
+        if _deadline_exceeded():
+            raise SyncError(f"{source} {start_time}-{end_time}: 마감 시간 초과")
+        params["page"] = next_page
+
+
+def resume_start(ledger, days=DEFAULT_DAYS, now=None):
+    """원장의 마지막 버킷(진행 중일 수 있음)부터, 비어 있으면 최근 days일부터 시작합니다."""
+    if ledger._latest_start is not None:
+        return ledger._latest_start
+    now = time.time() if now is None else now
+    return _day_start(now) - (int(days) - 1) * DAY_SECONDS
+
+
+def sync(source="costs", ledger_path=None, start_time=None, end_time=None, days=DEFAULT_DAYS,
+         chunk_days=DEFAULT_CHUNK_DAYS, max_workers=DEFAULT_MAX_WORKERS, admin_api_key=None, deadline=None):
+    """API에서 버킷을 가져와 원장에 병합하고 저장합니다.
+
+    구간은 동시에 가져오지만 원장에는 시간 순서대로 병합하며, 실패한 구간이 있으면 그 앞까지만
+    반영합니다. 따라서 다음 실행은 반영된 마지막 버킷부터 빈틈없이 이어집니다.
+
+    Args:
+        source: "costs" (프로젝트/line_item별 비용) 또는 "usage" (사용자/프로젝트/모델별 completions 사용량)
+        ledger_path: 원장 파일 (기본값 ledger/<SOURCES[source]["ledger"]>)
+        start_time / end_time: 가져올 기간 (unix time). 기본값은 원장의 마지막 버킷 ~ 현재
+        days: 원장이 비어 있을 때 가져올 최근 일 수
+        chunk_days: 구간 길이(일)
+        max_workers: 동시에 가져올 구간 수
+        admin_api_key: 관리자 API 키 (없으면 환경 변수)
+        deadline: 전체 동기화 마감 시간(초, 기본값 OPENAI_SWEEP_DEADLINE)
+
+    Returns:
+        dict: {"source", "ledger_path", "start_time", "end_time", "chunks", "synced_chunks",
+               "buckets", "changed_rows", "total_rows", "totals", "errors"}
+        totals는 costs면 {"total_cost"}, usage면 토큰/요청 수 합계 (cost_ledger.USAGE_FIELDS)
+    """
+    from utils import _credentials, sweep_deadline
+
+    if source not in SOURCES:
+        raise ValueError(f"알 수 없는 source: {source}")
+    ledger_path = ledger_path or os.path.join("ledger", SOURCES[source]["ledger"])
+    ledger = SOURCES[source]["ledger_class"].load(ledger_path)
+
+    api_key, org_id = _credentials(admin_api_key)
+    headers = {"Authorization": f"Bearer {api_key}", "OpenAI-Organization": org_id}
+
+    end_time = int(time.time()) if end_time is None else int(end_time)
+    start_time = resume_start(ledger, days) if start_time is None else _day_start(start_time)
+    chunks = plan_chunks(start_time, end_time, chunk_days)
+
+    results = [None] * len(chunks)
+    with sweep_deadline(deadline):
+        # 스레드에서도 sweep 마감 시간(ContextVar)이 적용되도록 현재 컨텍스트를 복사하여 실행
+        context = contextvars.copy_context()
+
+        def fetch(index):
+            start, end = chunks[index]
+            try:
+                results[index] = fetch_buckets(source, start, end, headers)
+            except SyncError as e:
+                results[index] = e
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            list(executor.map(lambda index: context.copy().run(fetch, index), range(len(chunks))))
+
+    changed_rows = 0
+    bucket_count = 0
+    synced_chunks = 0
+    errors = []
+    for result in results:
+        if isinstance(result, SyncError):
+            errors.append(str(result))
+            break
+        result.sort(key=lambda bucket: bucket.get("start_time", 0))
+        changed_rows += ledger.ingest(result)
+        bucket_count += len(result)
+        synced_chunks += 1
+    if errors:
+        logger.warning("동기화 중단 (%d/%d 구간 반영): %s", synced_chunks, len(chunks), errors[0])
+
+    if changed_rows:
+        os.makedirs(os.path.dirname(ledger_path) or ".", exist_ok=True)
+        ledger.save(ledger_path)
+    logger.info("%s 동기화: %d개 구간, %d개 버킷, %d개 행 반영", source, synced_chunks, bucket_count, changed_rows)
+
+    return {
+        "source": source,
+        "ledger_path": ledger_path,
+        "start_time": start_time,
+        "end_time": end_time,
+        "chunks": len(chunks),
+        "synced_chunks": synced_chunks,
+        "buckets": bucket_count,
+        "changed_rows": changed_rows,
+        "total_rows": len(ledger),
+        "totals": dict(ledger.usage_total) if isinstance(ledger, UsageLedger) else {"total_cost": ledger.total_cost},
+        "errors": errors,
+    }
@@ -1,57 +1,313 @@
+import contextlib
+import contextvars
+import functools
 import json
 import os
-import requests
-import logging
+import threading
+import time
 from datetime import datetime
-from dotenv import load_dotenv
 
-# 환경 변수 로드
-load_dotenv()
+from jsonio import atomic_write_json, load_json_cached
+from logging_config import get_logger
+from metrics import CACHE_LOOKUPS, UPSTREAM_LATENCY, UPSTREAM_PAGES, UPSTREAM_REQUESTS, UPSTREAM_RETRIES
+from profiling import profiled, span
+from records import ApiKey, BucketIndex, Project, RateLimit, UsageFilter, UsageRow, UserDirectory, bucket_date
+from settings_store import get_store
+
+logger = get_logger("utils")
+
+# userinfo.json 교체 시 보관할 이전 버전 수
+USERINFO_SNAPSHOTS = 5
+
+# 사용자 디렉터리 동기화 직렬화 및 (원본 목록, UserDirectory) 캐시
+_userinfo_lock = threading.Lock()
+_userinfo_directory = None
+
+# 설정은 import 시점이 아닌 첫 API 호출 시점에 로드합니다.
+# (집계 함수만 사용하는 서버/CLI는 dotenv, requests를 불러오지 않음)
+_config = None
+
+
+def load_config():
+    """환경 변수(.env 포함)에서 API 설정을 읽어옵니다. 최초 1회만 로드하여 재사용합니다."""
+    global _config
+    if _config is None:
+        from dotenv import load_dotenv
+
+        # 환경 변수 로드
+        load_dotenv()
+        _config = {
+            "api_key": os.environ.get("OPENAI_API_KEY"),
+            "org_id": os.environ.get("OPENAI_ORG_KEY"),
+            "userinfo_path": os.environ.get("USERINFO_PATH", "userinfo.json"),
+            # 프록시나 로컬 모의 서버(benchmarks/mock_org_api.py)를 사용할 때 변경
+            "base_url": os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/"),
+            "timeouts": {
+                kind: _parse_timeout(os.environ.get(f"OPENAI_TIMEOUT_{kind.upper()}"), default)
+                for kind, default in DEFAULT_TIMEOUTS.items()
+            },
+            "sweep_deadline": float(os.environ.get("OPENAI_SWEEP_DEADLINE", DEFAULT_SWEEP_DEADLINE)),
+        }
+    return _config
+
+
+# 엔드포인트 종류별 (연결, 읽기) 타임아웃 기본값(초)
+# list: 목록 조회, mutate: 키 삭제/Rate Limit 수정, rate_limit: 프로젝트별 Rate Limit 조회
+DEFAULT_TIMEOUTS = {
+    "list": (3.05, 15.0),
+    "mutate": (3.05, 20.0),
+    "rate_limit": (3.05, 10.0),
+}
+# 여러 요청으로 이루어진 전체 조회(sweep) 한 번에 허용할 시간(초)
+DEFAULT_SWEEP_DEADLINE = 120.0
+
+_sweep_deadline = contextvars.ContextVar("openai_sweep_deadline", default=None)
+
+
+def _parse_timeout(value, default):
+    """"연결,읽기" 또는 단일 값(둘 다 적용) 형식의 타임아웃 환경 변수를 해석합니다."""
+    if not value:
+        return default
+    parts = [float(part) for part in value.split(",")]
+    return (parts[0], parts[-1])
+
+
+@contextlib.contextmanager
+def sweep_deadline(seconds=None):
+    """블록 안의 API 호출 전체에 마감 시각을 적용합니다 (기본값 OPENAI_SWEEP_DEADLINE).
+
+    이미 바깥 sweep의 마감 시각이 있으면 더 이른 쪽을 사용합니다. 마감 후 읽기 타임아웃은
+    남은 시간으로 줄어들고, sweep 함수들은 남은 항목을 건너뛰고 그때까지의 결과를 반환합니다.
+    """
+    seconds = load_config()["sweep_deadline"] if seconds is None else seconds
+    deadline = time.monotonic() + seconds
+    outer = _sweep_deadline.get()
+    token = _sweep_deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _sweep_deadline.reset(token)
+
+
+def _with_sweep_deadline(func):
+    """함수 전체를 하나의 sweep으로 실행하는 데코레이터 (sweep_deadline 참고)"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with sweep_deadline():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _deadline_exceeded():
+    deadline = _sweep_deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
 
-# 환경 변수에서 API 키 정보 가져오기
-openai_org_id = os.environ.get("OPENAI_ORG_KEY")
-openai_api_key = os.environ.get("OPENAI_API_KEY")
-INFO_FILEPATH = os.environ.get("USERINFO_PATH", "userinfo.json")
+def _timeout_for(kind):
+    connect, read = load_config()["timeouts"][kind]
+    deadline = _sweep_deadline.get()
+    if deadline is not None:
+        # 마감이 가까우면 한 요청이 남은 시간 이상 워커를 붙잡지 않도록 함
+        read = max(0.1, min(read, deadline - time.monotonic()))
+    return (connect, read)
 
-# API 키 검증
-if not openai_api_key:
-    raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
-if not openai_org_id:
-    raise ValueError("OPENAI_ORG_KEY 환경 변수가 설정되지 않았습니다.")
 
+_http = threading.local()
 
-def extract_results_from_buckets(data):
-    """2025년 버킷 구조에서 결과 데이터를 추출합니다."""
+
+def _http_session():
+    """스레드별 requests.Session (연결 재사용). 프록시는 HTTPS_PROXY 등 표준 환경 변수를 따릅니다."""
+    session = getattr(_http, "session", None)
+    if session is None:
+        import requests
+
+        session = _http.session = requests.Session()
+    return session
+
+
+def _api_url(path):
+    """조직 API 경로(예: "/organization/projects")에 설정된 base URL을 붙입니다."""
+    return load_config()["base_url"] + path
+
+
+def _credentials(admin_api_key=None, require_org=True):
+    """API 호출에 사용할 (api_key, org_id)를 반환합니다. 관리자 키가 제공되면 우선 사용합니다."""
+    config = load_config()
+    api_key = admin_api_key or config["api_key"]
+
+    # API 키 검증
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+    if require_org and not config["org_id"]:
+        raise ValueError("OPENAI_ORG_KEY 환경 변수가 설정되지 않았습니다.")
+    return api_key, config["org_id"]
+
+
+# 재시도할 응답 상태 코드와 최대 재시도 횟수 (Retry-After 헤더가 있으면 우선 사용)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 2
+# 5xx 뒤에 실제로 처리되었을 수 있는 DELETE/POST는 재시도하지 않음
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+
+
+def _retry_delay(response, attempt):
+    try:
+        delay = min(float(response.headers.get("Retry-After", "")), 10.0)
+    except ValueError:
+        delay = min(0.5 * 2 ** (attempt - 1), 10.0)
+    deadline = _sweep_deadline.get()
+    if deadline is not None:
+        # 마감 시간을 넘겨 대기하지 않음
+        delay = min(delay, max(0.0, deadline - time.monotonic()))
+    return delay
+
+
+def _api_request(method, endpoint, url, headers, kind="list", **kwargs):
+    """OpenAI 조직 API를 호출하고 엔드포인트별 지연 시간/상태 코드/재시도 횟수를 기록합니다.
+
+    endpoint는 지표 레이블로 쓰이는 경로 템플릿입니다 (예: "/organization/projects/{project_id}/api_keys").
+    kind(list/mutate/rate_limit)에 따라 DEFAULT_TIMEOUTS의 연결/읽기 타임아웃을 적용합니다.
+    GET/HEAD 요청의 429/5xx 응답만 MAX_RETRIES회까지(sweep 마감 전까지만) 재시도하며,
+    네트워크 예외는 호출자에게 그대로 전달합니다.
+    """
+    import requests
+
+    session = _http_session()
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            with span(f"http {method} {endpoint}"):
+                response = session.request(method, url, headers=headers, timeout=_timeout_for(kind), **kwargs)
+        except requests.exceptions.RequestException:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, endpoint, method)
+            UPSTREAM_REQUESTS.inc(endpoint, method, "error")
+            raise
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, endpoint, method)
+        status = response.status_code
+        UPSTREAM_REQUESTS.inc(endpoint, method, str(status))
+
+        if (status not in RETRY_STATUSES or method not in RETRY_METHODS
+                or attempt >= MAX_RETRIES or _deadline_exceeded()):
+            return response
+        attempt += 1
+        UPSTREAM_RETRIES.inc(endpoint, str(status))
+        time.sleep(_retry_delay(response, attempt))
+
+
+def _fetch_all_pages(endpoint, url, headers, label):
+    """has_more/last_id pagination을 따라 모든 페이지의 data 항목을 가져옵니다.
+
+    요청이 실패하면 그때까지 가져온 항목만 반환합니다. 페이지 수는 지표로 기록합니다.
+    """
+    items = []
+    after = None
+    pages = 0
+    try:
+        while True:
+            # pagination을 위한 URL 구성
+            page_url = f"{url}?limit=100"
+            if after:
+                page_url += f"&after={after}"
+
+            response = _api_request("GET", endpoint, page_url, headers)
+
+            # HTTP 상태 코드 확인
+            if response.status_code != 200:
+                logger.warning("%s 요청 실패: HTTP %s %s", label, response.status_code, response.text)
+                break
+
+            # JSON 응답 파싱
+            response_data = response.json()
+            pages += 1
+            items.extend(response_data.get("data", []))
+
+            # 더 많은 데이터가 있는지 확인
+            if not response_data.get("has_more", False):
+                break
+
+            # 다음 페이지를 위한 after 값 설정
+            after = response_data.get("last_id")
+            if not after:
+                break
+            if _deadline_exceeded():
+                logger.warning("%s 조회 마감 시간 초과: %d페이지까지만 가져왔습니다.", label, pages)
+                break
+    finally:
+        UPSTREAM_PAGES.observe(pages, endpoint)
+    return items
+
+
+def __getattr__(name):
+    # 기존 모듈 속성(openai_api_key, openai_org_id, INFO_FILEPATH)에 대한 하위 호환
+    if name == "openai_api_key":
+        return load_config()["api_key"]
+    if name == "openai_org_id":
+        return load_config()["org_id"]
+    if name == "INFO_FILEPATH":
+        return load_config()["userinfo_path"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@profiled()
+def extract_results_from_buckets(data, filters=None):
+    """2025년 버킷 구조에서 결과 데이터를 추출합니다.
+
+    원본 결과 dict를 수정하지 않고, 버킷의 시간 정보를 참조하는 UsageRow 뷰를 반환합니다.
+    따라서 같은 데이터로 여러 번 호출해도 결과가 동일하며 원본은 변경되지 않습니다.
+
+    filters(UsageFilter 또는 같은 키의 dict)를 주면 기간 밖 버킷은 통째로 건너뛰고,
+    나머지 버킷에서 조건에 맞는 행만 반환합니다. data가 BucketIndex이면 기간 구간을 이진 탐색으로 찾습니다.
+    """
+    usage_filter = UsageFilter.coerce(filters)
     results = []
+    date_filter = usage_filter
     
+    # 시간 색인이면 기간에 해당하는 버킷 구간을 이진 탐색으로 찾고, 색인에 저장된 날짜를 사용
+    if isinstance(data, BucketIndex):
+        if usage_filter is not None:
+            dated_buckets = data.dated(usage_filter.start_date, usage_filter.end_date)
+        else:
+            dated_buckets = data.dated()
+        date_filter = None
     # data가 딕셔너리이고 "data" 키를 가지고 있는 경우
-    if isinstance(data, dict) and "data" in data:
-        buckets = data["data"]
+    elif isinstance(data, dict) and "data" in data:
+        # 날짜 문자열은 버킷당 한 번만 계산하여 모든 행이 공유
+        dated_buckets = (
+            (bucket, bucket_date(bucket))
+            for bucket in data["data"]
+            if isinstance(bucket, dict) and "results" in bucket
+        )
     # data가 이미 리스트인 경우 (이미 추출된 결과)
     elif isinstance(data, list):
-        return data  # 이미 추출된 결과라면 그대로 반환
+        # 이미 추출된 결과라면 그대로 (조건이 있으면 걸러서) 반환
+        return data if usage_filter is None else [line for line in data if usage_filter(line)]
     else:
         return results  # 예상치 못한 구조인 경우 빈 리스트 반환
     
-    for bucket in buckets:
-        if isinstance(bucket, dict) and "results" in bucket:
+    row_filter = usage_filter.match_row if usage_filter is not None and usage_filter.has_row_conditions() else None
+    for bucket, date in dated_buckets:
+        if "results" not in bucket:
+            continue
+        if date_filter is not None and not date_filter.match_date(date):
+            continue
+        if row_filter is None:
             for result in bucket["results"]:
-                # 날짜 정보 추가 (start_time을 기준으로)
-                result["date"] = datetime.fromtimestamp(bucket["start_time"]).strftime("%Y-%m-%d")
-                result["start_time"] = bucket["start_time"]
-                result["end_time"] = bucket["end_time"]
-                results.append(result)
+                results.append(UsageRow(result, bucket, date))
+        else:
+            for result in bucket["results"]:
+                if row_filter(result):
+                    results.append(UsageRow(result, bucket, date))
     return results
 
 
-def group_by_date(data):
+@profiled()
+def group_by_date(data, filters=None):
     """날짜별로 데이터를 그룹화합니다."""
-    # data가 이미 결과 리스트인 경우 처리
-    if isinstance(data, list):
-        results = data
-    else:
-        # 2025년 구조만 지원
-        results = extract_results_from_buckets(data)
+    # 결과 리스트 또는 2025년 버킷 구조 (filters가 있으면 추출하면서 거름)
+    results = extract_results_from_buckets(data, filters)
     
     group = {}
     for line in results:
@@ -66,10 +322,11 @@ def group_by_date(data):
     return group
 
 
-def group_by_userID(data):
+@profiled()
+def group_by_userID(data, filters=None):
     """사용자 ID별로 데이터를 그룹화합니다."""
     # 2025년 구조만 지원
-    results = extract_results_from_buckets(data)
+    results = extract_results_from_buckets(data, filters)
     
     group = {}
     for line in results:
@@ -85,14 +342,11 @@ def group_by_userID(data):
     return group
 
 
-def group_by_model(data):
+@profiled()
+def group_by_model(data, filters=None):
     """모델별로 데이터를 그룹화합니다."""
-    # data가 이미 결과 리스트인 경우 처리
-    if isinstance(data, list):
-        results = data
-    else:
-        # 2025년 구조만 지원
-        results = extract_results_from_buckets(data)
+    # 결과 리스트 또는 2025년 버킷 구조 (filters가 있으면 추출하면서 거름)
+    results = extract_results_from_buckets(data, filters)
     
     group = {}
     for line in results:
@@ -108,14 +362,11 @@ def group_by_model(data):
     return group
 
 
-def get_total_cost(data):
+@profiled()
+def get_total_cost(data, filters=None):
     """총 비용을 계산합니다."""
-    # data가 이미 결과 리스트인 경우 처리
-    if isinstance(data, list):
-        results = data
-    else:
-        # 2025년 구조만 지원
-        results = extract_results_from_buckets(data)
+    # 결과 리스트 또는 2025년 버킷 구조 (filters가 있으면 추출하면서 거름)
+    results = extract_results_from_buckets(data, filters)
     
     total_cost = 0
     cost_by_date = [0] * 32
@@ -141,11 +392,40 @@ def get_total_cost(data):
     return total_cost, cost_by_date
 
 
+def _merge_userinfo(existing, fetched):
+    """기존 userinfo와 새로 가져온 사용자 목록을 ID 기준으로 병합합니다.
+
+    가져온 사용자는 최신 정보로 갱신하고, 조직을 떠난 사용자는 과거 사용량의 이름 표시를 위해 유지합니다.
+    기존 순서를 유지하고 새 사용자는 뒤에 추가합니다. (병합 결과, 변경 여부)를 반환합니다.
+    """
+    fetched_by_id = {user.get("id"): user for user in fetched}
+    merged = []
+    changed = False
+    for user in existing:
+        latest = fetched_by_id.pop(user.get("id"), None)
+        if latest is not None and latest != user:
+            changed = True
+            user = latest
+        merged.append(user)
+    if fetched_by_id:
+        changed = True
+        merged.extend(fetched_by_id.values())
+    return merged, changed
+
+
+@profiled()
+@_with_sweep_deadline
 def build_userinfo(admin_api_key=None):
-    """OpenAI 조직의 사용자 정보를 가져와 JSON 파일로 저장합니다."""
-    # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id  # Organization ID는 환경변수 사용
+    """OpenAI 조직의 전체 사용자 정보를 페이지 단위로 가져와 userinfo.json과 동기화합니다.
+
+    기존 파일과 ID 기준으로 병합하며, 내용이 바뀐 경우에만 파일을 교체합니다.
+    동시에 여러 요청이 들어와도 동기화는 한 번에 하나씩 실행됩니다.
+    """
+    import requests
+
+    # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용 (Organization ID는 환경변수 사용)
+    api_key, org_id = _credentials(admin_api_key, require_org=False)
+    info_filepath = load_config()["userinfo_path"]
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -156,74 +436,130 @@ def build_userinfo(admin_api_key=None):
     if org_id:
         headers["OpenAI-Organization"] = org_id
 
-    try:
-        # OpenAI API v1 엔드포인트 사용 (더 많은 사용자 가져오기)
-        response = requests.get(
-            f"https://api.openai.com/v1/organization/users?limit=100",
-            headers=headers,
-            timeout=30
-        )
-        
-        # HTTP 상태 코드 확인
-        if response.status_code != 200:
-            print(f"API 요청 실패: HTTP {response.status_code}")
-            print(f"응답 내용: {response.text}")
+    fetched = []
+    after = None
+    pages = 0
+
+    with _userinfo_lock:
+        try:
+            while True:
+                # pagination을 위한 URL 구성
+                url = _api_url("/organization/users?limit=100")
+                if after:
+                    url += f"&after={after}"
+
+                response = _api_request("GET", "/organization/users", url, headers)
+
+                # HTTP 상태 코드 확인 (일부 페이지만으로 파일을 덮어쓰지 않음)
+                if response.status_code != 200:
+                    logger.warning("사용자 목록 요청 실패: HTTP %s %s", response.status_code, response.text)
+                    return False
+
+                # JSON 응답 파싱
+                response_data = response.json()
+                pages += 1
+
+                # 응답 구조 확인 및 데이터 추출
+                if "members" in response_data and "data" in response_data["members"]:
+                    users = response_data["members"]["data"]
+                elif "data" in response_data:
+                    users = response_data["data"]
+                else:
+                    logger.error("예상하지 못한 응답 구조입니다. 응답 키: %s", list(response_data))
+                    return False
+                fetched.extend(users)
+                logger.debug("사용자 정보 %d페이지: %d명", pages, len(users))
+
+                # 더 많은 데이터가 있는지 확인
+                if not response_data.get("has_more", False):
+                    break
+
+                # 다음 페이지를 위한 after 값 설정
+                after = response_data.get("last_id")
+                if not after:
+                    break
+                if _deadline_exceeded():
+                    # 일부 페이지만 받은 경우 파일을 갱신하지 않음 (다음 동기화에서 다시 시도)
+                    logger.warning("사용자 목록 조회 마감 시간 초과 (%d페이지)", pages)
+                    return False
+
+            UPSTREAM_PAGES.observe(pages, "/organization/users")
+            merged, changed = _merge_userinfo(load_userinfo(info_filepath), fetched)
+            if changed:
+                # 사용자 정보를 JSON 파일로 원자적으로 저장 (이전 버전은 스냅샷으로 보관)
+                # 직후 load_userinfo() 호출이 파일을 다시 파싱하지 않도록 캐시에도 반영
+                atomic_write_json(info_filepath, merged, snapshots=USERINFO_SNAPSHOTS, cache=True, indent=2)
+                logger.info("사용자 정보가 %s에 저장되었습니다.", info_filepath)
+            else:
+                logger.info("사용자 정보가 최신 상태입니다: %s", info_filepath)
+            logger.info(
+                "총 %d명의 사용자 정보 (%d페이지, 조직 구성원 %d명)", len(merged), pages, len(fetched),
+                extra={"pages": pages},
+            )
+            return True
+
+        except requests.exceptions.RequestException as e:
+            logger.error("네트워크 오류가 발생했습니다: %s", e)
             return False
-        
-        # JSON 응답 파싱
-        response_data = response.json()
-        print(f"API 응답: {response_data}")
-        
-        # 응답 구조 확인 및 데이터 추출
-        if "members" in response_data and "data" in response_data["members"]:
-            users = response_data["members"]["data"]
-        elif "data" in response_data:
-            users = response_data["data"]
-        else:
-            print("예상하지 못한 응답 구조입니다.")
-            print(f"응답 키: {list(response_data.keys())}")
+        except json.JSONDecodeError as e:
+            logger.error("JSON 파싱 오류가 발생했습니다: %s %s", e, response.text)
             return False
-            
-        logging.debug("사용자 정보 파일 생성 중...")
-        
-        # 사용자 정보를 JSON 파일로 저장
-        with open(INFO_FILEPATH, "w", encoding="utf-8") as fp:
-            json.dump(users, fp, ensure_ascii=False, indent=2)
-        
-        print(f"사용자 정보가 {INFO_FILEPATH}에 성공적으로 저장되었습니다.")
-        print(f"총 {len(users)}명의 사용자 정보를 저장했습니다.")
-        return True
-        
-    except requests.exceptions.RequestException as e:
-        print(f"네트워크 오류가 발생했습니다: {e}")
-        return False
-    except json.JSONDecodeError as e:
-        print(f"JSON 파싱 오류가 발생했습니다: {e}")
-        print(f"응답 내용: {response.text}")
-        return False
-    except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
-        return False
+        except Exception as e:
+            logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
+            return False
+
+
+def load_userinfo(info_filepath=None):
+    """userinfo.json을 ID/이름 색인이 있는 UserDirectory로 읽어옵니다.
+
+    파일이 바뀌지 않았다면 메모리에 캐시된 디렉터리를 그대로 반환하고, 파일이 없으면 빈 디렉터리를 반환합니다.
+    """
+    global _userinfo_directory
+    info_filepath = info_filepath or load_config()["userinfo_path"]
+    try:
+        users = load_json_cached(info_filepath)
+    except FileNotFoundError:
+        return UserDirectory()
+
+    # 파일 캐시가 같은 목록 객체를 반환하는 동안에는 색인을 다시 만들지 않음
+    cached = _userinfo_directory
+    if cached is not None and cached[0] is users:
+        CACHE_LOOKUPS.inc("userinfo_index", "hit")
+        return cached[1]
+    CACHE_LOOKUPS.inc("userinfo_index", "miss")
+    directory = UserDirectory(users)
+    _userinfo_directory = (users, directory)
+    return directory
+
+
+def _as_directory(userinfo):
+    """UserDirectory는 그대로, 목록은 매번 새 UserDirectory로 변환합니다.
+
+    목록은 호출 사이에 제자리에서 수정될 수 있으므로 캐시하지 않습니다.
+    반복 조회에는 load_userinfo()가 반환하는 캐시된 UserDirectory를 넘기세요.
+    """
+    if isinstance(userinfo, UserDirectory):
+        return userinfo
+    return UserDirectory(userinfo or [])
 
 
 def get_name_with_userID(uid, userinfo):
-    for uinfo in userinfo:
-        # 안전하게 딕셔너리에 접근하여 KeyError 방지
-        if uid == uinfo.get("id"):
-            return uinfo.get("name")
-    print(f"User {uid} NOT FOUNDED...")
+    name = _as_directory(userinfo).get_name(uid)
+    if name is not None:
+        return name
+    logger.debug("사용자 %s를 찾을 수 없습니다.", uid)
     return None
 
 
 def get_userID_with_name(uid, userinfo):
-    for uinfo in userinfo:
-        # 안전하게 딕셔너리에 접근하여 KeyError 방지
-        if uid == uinfo.get("name"):
-            return uinfo.get("id")
-    print(f"User {uid} NOT FOUNDED...")
+    user_id = _as_directory(userinfo).get_id(uid)
+    if user_id is not None:
+        return user_id
+    logger.debug("사용자 %s를 찾을 수 없습니다.", uid)
     return None
 
 
+@profiled()
 def rebuild_to_cost(data):
     result = {}
     keys = data.keys()
@@ -234,10 +570,11 @@ def rebuild_to_cost(data):
     return result
 
 
-def group_by_project_id(data):
+@profiled()
+def group_by_project_id(data, filters=None):
     """프로젝트 ID별로 데이터를 그룹화합니다."""
     # 2025년 구조만 지원
-    results = extract_results_from_buckets(data)
+    results = extract_results_from_buckets(data, filters)
     
     group = {}
     for line in results:
@@ -254,9 +591,10 @@ def group_by_project_id(data):
     return group
 
 
-def calculate_project_usage(data):
-    """프로젝트별 사용량을 계산합니다."""
-    project_groups = group_by_project_id(data)
+@profiled()
+def calculate_project_usage(data, filters=None):
+    """프로젝트별 사용량을 계산합니다 (filters: UsageFilter 또는 같은 키의 dict)."""
+    project_groups = group_by_project_id(data, filters)
     project_usage = {}
     
     for project_id, project_data in project_groups.items():
@@ -293,57 +631,140 @@ def calculate_project_usage(data):
     return project_usage
 
 
-def find_budget_overages(project_usage, project_budgets, projects_info=None):
-    """예산 초과 프로젝트를 찾습니다."""
-    overages = []
-    
+# 예산 사용률 상태 기준 (%). 예산을 넘으면 "over", 이상이면 각각 "warning"/"caution", 나머지는 "safe"
+BUDGET_WARNING_RATE = 90
+BUDGET_CAUTION_RATE = 70
+
+
+def build_project_index(projects_info):
+    """프로젝트 목록에서 {project_id: project} 색인을 만듭니다."""
+    return {project.get("id"): project for project in projects_info or ()}
+
+
+def budget_status(usage, budget, usage_rate=None):
+    """사용량과 예산으로 상태(over/warning/caution/safe)를 결정합니다."""
+    if usage > budget:
+        return "over"
+    if usage_rate is None:
+        usage_rate = usage / budget * 100 if budget > 0 else 0
+    if usage_rate >= BUDGET_WARNING_RATE:
+        return "warning"
+    if usage_rate >= BUDGET_CAUTION_RATE:
+        return "caution"
+    return "safe"
+
+
+@profiled()
+def project_budget_forecast(usage, budget, forecast):
+    """사용량에 남은 기간 예상 비용을 더한 (예상 사용량, 예산 소진일)을 반환합니다.
+
+    이미 예산을 넘었는데 예측 결과에 지난 소진일이 없으면 예측 기준일(as_of)을 소진일로 봅니다.
+    """
+    if forecast is None:
+        return usage, None
+    exhaustion_date = forecast["exhaustion_date"]
+    if budget and usage >= budget and (exhaustion_date is None or exhaustion_date > forecast["as_of"]):
+        exhaustion_date = forecast["as_of"]
+    return usage + forecast["remaining"], exhaustion_date
+
+
+def evaluate_budgets(project_usage, project_budgets, projects_info=None, forecasts=None):
+    """예산이 설정된 프로젝트마다 사용량/사용률/상태를 숫자로 한 번에 계산합니다.
+
+    Args:
+        project_usage: calculate_project_usage 결과
+        project_budgets: {project_id: budget}
+        projects_info: 프로젝트 이름 표시용 프로젝트 목록 (선택)
+        forecasts: forecast.forecast_spend 결과의 "forecasts" (선택). 있으면 프로젝트마다
+                   "projected_usage"(사용량 + 남은 기간 예상 비용), "projected_rate", "exhaustion_date"를
+                   추가. 사용량과 같은 기간으로 예측한 결과를 넘기세요 (내보내기 전체면 period_start="all")
+
+    Returns:
+        dict: {
+            "projects": [{"project_id", "project_name", "budget", "usage", "usage_rate", "remaining",
+                          "overage_amount", "overage_percentage", "status"}, ...] (예산 설정 순서),
+            "total_budget", "total_usage", "usage_rate", "over_count", "high_usage_count",
+        }
+        문자열 포맷은 하지 않으므로 화면에 표시할 때 변환하세요.
+    """
+    index = build_project_index(projects_info)
+    projects = []
+    total_budget = 0.0
+    total_usage = 0.0
+    over_count = 0
+    high_usage_count = 0
+
     for project_id, budget in project_budgets.items():
-        # 해당 프로젝트의 실제 사용량 찾기
-        actual_usage = 0
-        usage_details = None
-        
-        # project_id가 정확히 매칭되는 경우
-        if project_id in project_usage:
-            actual_usage = project_usage[project_id]["total_cost"]
-            usage_details = project_usage[project_id]
-        # 프로젝트 정보가 없는 데이터의 경우 (project_id가 null인 경우)
-        elif "no_project" in project_usage and projects_info:
-            # 이 경우는 프로젝트별 분석이 불가능하므로 건너뛰기
-            continue
-        
-        # 예산 초과 확인
-        if actual_usage > budget:
-            overage_amount = actual_usage - budget
-            overage_percentage = ((actual_usage - budget) / budget) * 100 if budget > 0 else 0
-            
-            # 프로젝트 이름 찾기
-            project_name = project_id
-            if projects_info:
-                for project in projects_info:
-                    if project.get("id") == project_id:
-                        project_name = project.get("name", project_id)
-                        break
-            
-            overages.append({
-                "project_id": project_id,
-                "project_name": project_name,
-                "budget": budget,
-                "actual_usage": actual_usage,
-                "overage_amount": overage_amount,
-                "overage_percentage": overage_percentage,
-                "usage_details": usage_details
+        usage_entry = project_usage.get(project_id)
+        usage = usage_entry["total_cost"] if usage_entry is not None else 0
+        usage_rate = usage / budget * 100 if budget > 0 else 0
+        status = budget_status(usage, budget, usage_rate)
+        overage_amount = usage - budget if status == "over" else 0.0
+        project = index.get(project_id)
+
+        projects.append({
+            "project_id": project_id,
+            "project_name": project.get("name", project_id) if project is not None else project_id,
+            "budget": budget,
+            "usage": usage,
+            "usage_rate": usage_rate,
+            "remaining": max(0, budget - usage),
+            "overage_amount": overage_amount,
+            "overage_percentage": overage_amount / budget * 100 if overage_amount and budget > 0 else 0,
+            "status": status,
+        })
+        if forecasts is not None:
+            projected, exhaustion_date = project_budget_forecast(usage, budget, forecasts.get(project_id))
+            projects[-1].update({
+                "projected_usage": projected,
+                "projected_rate": projected / budget * 100 if budget > 0 else 0,
+                "exhaustion_date": exhaustion_date,
             })
-    
+        total_budget += budget
+        total_usage += usage
+        over_count += status == "over"
+        high_usage_count += usage_rate >= BUDGET_WARNING_RATE
+
+    return {
+        "projects": projects,
+        "total_budget": total_budget,
+        "total_usage": total_usage,
+        "usage_rate": total_usage / total_budget * 100 if total_budget > 0 else 0,
+        "over_count": over_count,
+        "high_usage_count": high_usage_count,
+    }
+
+
+@profiled()
+def find_budget_overages(project_usage, project_budgets, projects_info=None):
+    """예산 초과 프로젝트를 찾습니다 (초과 금액 순)."""
+    overages = [
+        {
+            "project_id": entry["project_id"],
+            "project_name": entry["project_name"],
+            "budget": entry["budget"],
+            "actual_usage": entry["usage"],
+            "overage_amount": entry["overage_amount"],
+            "overage_percentage": entry["overage_percentage"],
+            "usage_details": project_usage.get(entry["project_id"]),
+        }
+        for entry in evaluate_budgets(project_usage, project_budgets, projects_info)["projects"]
+        if entry["status"] == "over"
+    ]
+
     # 초과 금액 순으로 정렬
     overages.sort(key=lambda x: x["overage_amount"], reverse=True)
     return overages
 
 
+@profiled()
+@_with_sweep_deadline
 def list_organization_projects(admin_api_key=None):
     """조직의 프로젝트 목록을 가져옵니다 (pagination 지원)."""
+    import requests
+
     # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id
+    api_key, org_id = _credentials(admin_api_key)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -351,53 +772,27 @@ def list_organization_projects(admin_api_key=None):
         "Content-Type": "application/json",
     }
 
-    all_projects = []
-    after = None
-    
     try:
-        while True:
-            # pagination을 위한 URL 구성
-            url = "https://api.openai.com/v1/organization/projects?limit=100"
-            if after:
-                url += f"&after={after}"
-                
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            # HTTP 상태 코드 확인
-            if response.status_code != 200:
-                print(f"Organization Projects 요청 실패: HTTP {response.status_code}")
-                print(f"응답 내용: {response.text}")
-                break
-            
-            # JSON 응답 파싱
-            response_data = response.json()
-            projects_batch = response_data.get("data", [])
-            all_projects.extend(projects_batch)
-            
-            # 더 많은 데이터가 있는지 확인
-            if not response_data.get("has_more", False):
-                break
-                
-            # 다음 페이지를 위한 after 값 설정
-            after = response_data.get("last_id")
-            if not after:
-                break
-                
-        print(f"총 {len(all_projects)}개의 프로젝트를 가져왔습니다.")
+        all_projects = [Project.from_dict(item) for item in _fetch_all_pages(
+            "/organization/projects", _api_url("/organization/projects"), headers, "Organization Projects"
+        )]
+
+        logger.info("총 %d개의 프로젝트를 가져왔습니다.", len(all_projects))
         return all_projects
         
     except requests.exceptions.RequestException as e:
-        print(f"네트워크 오류가 발생했습니다: {e}")
+        logger.error("네트워크 오류가 발생했습니다: %s", e)
         return None
     except json.JSONDecodeError as e:
-        print(f"JSON 파싱 오류가 발생했습니다: {e}")
-        print(f"응답 내용: {response.text}")
+        logger.error("JSON 파싱 오류가 발생했습니다: %s", e)
         return None
     except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
+        logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
         return None
 
 
+@profiled()
+@_with_sweep_deadline
 def list_api_keys(admin_api_key=None):
     """조직의 모든 프로젝트에서 API 키 목록을 가져옵니다."""
     projects = list_organization_projects(admin_api_key)
@@ -405,26 +800,32 @@ def list_api_keys(admin_api_key=None):
         return None
     
     all_api_keys = []
-    for project in projects:
+    for index, project in enumerate(projects):
+        if _deadline_exceeded():
+            logger.warning("API 키 조회 마감 시간 초과: %d/%d 프로젝트만 조회했습니다.", index, len(projects))
+            break
         project_id = project["id"]
         project_name = project["name"]
         
         project_keys = get_project_api_keys(project_id, admin_api_key)
         if project_keys:
             # 각 API 키에 프로젝트 정보 추가
-            for key in project_keys:
-                key["project_id"] = project_id
-                key["project_name"] = project_name
-            all_api_keys.extend(project_keys)
+            all_api_keys.extend(
+                ApiKey.from_dict(key, project_id=project_id, project_name=project_name)
+                for key in project_keys
+            )
     
     return all_api_keys
 
 
+@profiled()
+@_with_sweep_deadline
 def get_organization_users(admin_api_key=None):
     """조직의 사용자 목록을 가져옵니다 (pagination 지원)."""
+    import requests
+
     # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id
+    api_key, org_id = _credentials(admin_api_key)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -432,58 +833,33 @@ def get_organization_users(admin_api_key=None):
         "Content-Type": "application/json",
     }
 
-    all_users = []
-    after = None
-    
     try:
-        while True:
-            # pagination을 위한 URL 구성
-            url = "https://api.openai.com/v1/organization/users?limit=100"
-            if after:
-                url += f"&after={after}"
-                
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            # HTTP 상태 코드 확인
-            if response.status_code != 200:
-                print(f"Organization Users 요청 실패: HTTP {response.status_code}")
-                print(f"응답 내용: {response.text}")
-                break
-            
-            # JSON 응답 파싱
-            response_data = response.json()
-            users_batch = response_data.get("data", [])
-            all_users.extend(users_batch)
-            
-            # 더 많은 데이터가 있는지 확인
-            if not response_data.get("has_more", False):
-                break
-                
-            # 다음 페이지를 위한 after 값 설정
-            after = response_data.get("last_id")
-            if not after:
-                break
-                
-        print(f"총 {len(all_users)}명의 사용자를 가져왔습니다.")
+        all_users = _fetch_all_pages(
+            "/organization/users", _api_url("/organization/users"), headers, "Organization Users"
+        )
+
+        logger.info("총 %d명의 사용자를 가져왔습니다.", len(all_users))
         return all_users
         
     except requests.exceptions.RequestException as e:
-        print(f"네트워크 오류가 발생했습니다: {e}")
+        logger.error("네트워크 오류가 발생했습니다: %s", e)
         return None
     except json.JSONDecodeError as e:
-        print(f"JSON 파싱 오류가 발생했습니다: {e}")
-        print(f"응답 내용: {response.text}")
+        logger.error("JSON 파싱 오류가 발생했습니다: %s", e)
         return None
     except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
+        logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
         return None
 
 
+@profiled()
+@_with_sweep_deadline
 def get_project_api_keys(project_id, admin_api_key=None):
     """특정 프로젝트의 API 키 목록을 가져옵니다 (pagination 지원)."""
+    import requests
+
     # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id
+    api_key, org_id = _credentials(admin_api_key)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -491,49 +867,24 @@ def get_project_api_keys(project_id, admin_api_key=None):
         "Content-Type": "application/json",
     }
 
-    all_keys = []
-    after = None
-    
     try:
-        while True:
-            # pagination을 위한 URL 구성
-            url = f"https://api.openai.com/v1/organization/projects/{project_id}/api_keys?limit=100"
-            if after:
-                url += f"&after={after}"
-                
-            response = requests.get(url, headers=headers, timeout=30)
-            
-            # HTTP 상태 코드 확인
-            if response.status_code != 200:
-                print(f"Project API Keys 요청 실패: HTTP {response.status_code}")
-                print(f"응답 내용: {response.text}")
-                break
-            
-            # JSON 응답 파싱
-            response_data = response.json()
-            keys_batch = response_data.get("data", [])
-            all_keys.extend(keys_batch)
-            
-            # 더 많은 데이터가 있는지 확인
-            if not response_data.get("has_more", False):
-                break
-                
-            # 다음 페이지를 위한 after 값 설정
-            after = response_data.get("last_id")
-            if not after:
-                break
-                
+        all_keys = [ApiKey.from_dict(item) for item in _fetch_all_pages(
+            "/organization/projects/{project_id}/api_keys",
+            _api_url(f"/organization/projects/{project_id}/api_keys"),
+            headers,
+            "Project API Keys",
+        )]
+
         return all_keys
         
     except requests.exceptions.RequestException as e:
-        print(f"네트워크 오류가 발생했습니다: {e}")
+        logger.error("네트워크 오류가 발생했습니다: %s", e)
         return None
     except json.JSONDecodeError as e:
-        print(f"JSON 파싱 오류가 발생했습니다: {e}")
-        print(f"응답 내용: {response.text}")
+        logger.error("JSON 파싱 오류가 발생했습니다: %s", e)
         return None
     except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
+        logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
         return None
 
 
@@ -542,15 +893,17 @@ def get_api_key_details(api_key_id, admin_api_key=None):
     
     주의: 이 기능은 현재 OpenAI 공개 API에서 지원되지 않습니다.
     """
-    print("⚠️ API 키 상세 정보 조회 엔드포인트는 현재 공개적으로 접근할 수 없습니다.")
+    logger.warning("API 키 상세 정보 조회 엔드포인트는 현재 공개적으로 접근할 수 없습니다.")
     return None
 
 
+@profiled()
 def delete_api_key(project_id, api_key_id, admin_api_key=None):
     """특정 프로젝트의 API 키를 삭제합니다."""
+    import requests
+
     # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id
+    api_key, org_id = _credentials(admin_api_key)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -559,26 +912,31 @@ def delete_api_key(project_id, api_key_id, admin_api_key=None):
     }
 
     try:
-        url = f"https://api.openai.com/v1/organization/projects/{project_id}/api_keys/{api_key_id}"
-        response = requests.delete(url, headers=headers, timeout=30)
+        url = _api_url(f"/organization/projects/{project_id}/api_keys/{api_key_id}")
+        response = _api_request(
+            "DELETE", "/organization/projects/{project_id}/api_keys/{key_id}", url, headers, kind="mutate"
+        )
         
         # HTTP 상태 코드 확인
         if response.status_code == 200:
-            print(f"✅ API 키 {api_key_id}가 성공적으로 삭제되었습니다.")
+            logger.info("API 키 %s가 삭제되었습니다.", api_key_id, extra={"project_id": project_id})
             return True
         else:
-            print(f"❌ API 키 삭제 실패: HTTP {response.status_code}")
-            print(f"응답 내용: {response.text}")
+            logger.warning(
+                "API 키 삭제 실패: HTTP %s %s", response.status_code, response.text,
+                extra={"project_id": project_id, "api_key_id": api_key_id},
+            )
             return False
             
     except requests.exceptions.RequestException as e:
-        print(f"네트워크 오류가 발생했습니다: {e}")
+        logger.error("네트워크 오류가 발생했습니다: %s", e)
         return False
     except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
+        logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
         return False
 
 
+@_with_sweep_deadline
 def bulk_delete_api_keys(project_keys_list, admin_api_key=None):
     """여러 프로젝트의 API 키들을 일괄 삭제합니다.
     
@@ -587,77 +945,120 @@ def bulk_delete_api_keys(project_keys_list, admin_api_key=None):
         admin_api_key: 관리자 API 키
     
     Returns:
-        dict: {"success": [], "failed": []} 형태의 결과
+        dict: {"success": [], "failed": [], "skipped": []} 형태의 결과
+              (skipped: sweep 마감 시간이 지나 삭제 요청을 보내지 않은 키)
     """
-    results = {"success": [], "failed": []}
+    results = {"success": [], "failed": [], "skipped": []}
     
     for project_id, api_key_id, key_name in project_keys_list:
-        success = delete_api_key(project_id, api_key_id, admin_api_key)
-        
-        if success:
-            results["success"].append({
-                "project_id": project_id,
-                "api_key_id": api_key_id,
-                "key_name": key_name
-            })
+        item = {
+            "project_id": project_id,
+            "api_key_id": api_key_id,
+            "key_name": key_name
+        }
+        # 마감 시간이 지나면 남은 키는 요청하지 않고 건너뜀 (API 실패와 구분)
+        if _deadline_exceeded():
+            results["skipped"].append(item)
+        elif delete_api_key(project_id, api_key_id, admin_api_key):
+            results["success"].append(item)
         else:
-            results["failed"].append({
-                "project_id": project_id,
-                "api_key_id": api_key_id,
-                "key_name": key_name
-            })
+            results["failed"].append(item)
     
+    if results["skipped"]:
+        logger.warning("마감 시간이 지나 %d개 키의 삭제를 건너뛰었습니다.", len(results["skipped"]))
     return results
 
 
+def _import_legacy_budgets(store, filename):
+    """이전 버전의 JSON 예산 파일이 있으면 최초 1회 SQLite 저장소로 가져옵니다."""
+    marker = f"budgets_imported:{os.path.abspath(filename)}"
+    if store.get_meta(marker) or not os.path.exists(filename):
+        return
+    with open(filename, 'r', encoding='utf-8') as f:
+        budgets = json.load(f)
+    store.set_budgets(budgets)
+    store.set_meta(marker, "1")
+    logger.info("기존 예산 파일 %s을 저장소로 가져왔습니다 (%d개 프로젝트).", filename, len(budgets))
+
+
 def save_project_budgets(budgets, filename="project_budgets.json"):
-    """프로젝트 예산 정보를 JSON 파일로 저장합니다."""
+    """프로젝트 예산 전체를 저장소에 저장합니다 (기존 값은 교체).
+
+    filename은 이전 버전의 JSON 예산 파일 경로로, 최초 로드 시 한 번만 가져옵니다.
+    한 프로젝트만 변경할 때는 set_project_budget을 사용하세요.
+    """
+    try:
+        get_store().replace_budgets(budgets)
+        logger.info("프로젝트 예산 %d개가 저장되었습니다.", len(budgets))
+        return True
+    except Exception as e:
+        logger.error("예산 저장 실패: %s", e)
+        return False
+
+
+def set_project_budget(project_id, budget):
+    """프로젝트 하나의 예산을 저장합니다 (행 단위 upsert)."""
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(budgets, f, ensure_ascii=False, indent=2)
-        print(f"✅ 프로젝트 예산이 {filename}에 저장되었습니다.")
+        get_store().set_budget(project_id, budget)
         return True
     except Exception as e:
-        print(f"❌ 예산 저장 실패: {e}")
+        logger.error("예산 저장 실패: %s", e)
+        return False
+
+
+def update_project_budgets(budgets):
+    """여러 프로젝트의 예산을 한 트랜잭션으로 저장합니다. 나머지 프로젝트의 예산은 유지됩니다."""
+    try:
+        get_store().set_budgets(budgets)
+        return True
+    except Exception as e:
+        logger.error("예산 저장 실패: %s", e)
+        return False
+
+
+def delete_project_budget(project_id):
+    """프로젝트 하나의 예산을 삭제합니다."""
+    try:
+        get_store().delete_budget(project_id)
+        return True
+    except Exception as e:
+        logger.error("예산 삭제 실패: %s", e)
         return False
 
 
 def load_project_budgets(filename="project_budgets.json"):
-    """JSON 파일에서 프로젝트 예산 정보를 로드합니다."""
+    """저장소에서 프로젝트 예산 정보를 로드합니다."""
     try:
-        if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                budgets = json.load(f)
-            print(f"✅ 프로젝트 예산이 {filename}에서 로드되었습니다.")
-            return budgets
-        else:
-            print(f"⚠️ 예산 파일 {filename}이 존재하지 않습니다.")
-            return {}
+        store = get_store()
+        _import_legacy_budgets(store, filename)
+        return store.get_budgets()
     except Exception as e:
-        print(f"❌ 예산 로드 실패: {e}")
+        logger.error("예산 로드 실패: %s", e)
         return {}
 
 
 def reset_project_budgets(filename="project_budgets.json"):
-    """프로젝트 예산 파일을 삭제하여 초기화합니다."""
+    """저장된 프로젝트 예산을 모두 삭제하여 초기화합니다."""
     try:
+        store = get_store()
+        store.clear_budgets()
+        # 이전 버전의 JSON 파일도 삭제하여 다시 가져오지 않도록 함
         if os.path.exists(filename):
             os.remove(filename)
-            print(f"✅ 프로젝트 예산 파일 {filename}이 삭제되었습니다.")
-            return True
-        else:
-            print(f"⚠️ 삭제할 예산 파일 {filename}이 존재하지 않습니다.")
-            return True  # 파일이 없어도 초기화 목적은 달성
+        logger.info("프로젝트 예산이 초기화되었습니다.")
+        return True
     except Exception as e:
-        print(f"❌ 예산 파일 삭제 실패: {e}")
+        logger.error("예산 초기화 실패: %s", e)
         return False
 
 
+@profiled()
 def get_project_rate_limits(project_id, admin_api_key=None):
     """특정 프로젝트의 Rate Limit 정보를 가져옵니다."""
+    import requests
+
     # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id
+    api_key, org_id = _credentials(admin_api_key)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -666,42 +1067,45 @@ def get_project_rate_limits(project_id, admin_api_key=None):
     }
 
     try:
-        url = f"https://api.openai.com/v1/organization/projects/{project_id}/rate_limits"
-        print(f"🔍 Rate Limit API 요청 시도: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
+        url = _api_url(f"/organization/projects/{project_id}/rate_limits")
+        response = _api_request(
+            "GET", "/organization/projects/{project_id}/rate_limits", url, headers, kind="rate_limit"
+        )
         
         # HTTP 상태 코드 확인
-        print(f"📊 Rate Limit API 응답 상태: {response.status_code}")
         if response.status_code != 200:
-            print(f"❌ Project Rate Limits 요청 실패: HTTP {response.status_code}")
-            print(f"응답 헤더: {dict(response.headers)}")
-            print(f"응답 내용: {response.text}")
+            logger.warning(
+                "Project Rate Limits 요청 실패: HTTP %s %s", response.status_code, response.text,
+                extra={"project_id": project_id},
+            )
+            logger.debug("응답 헤더: %s", response.headers)
             return None
         
         # JSON 응답 파싱
         response_data = response.json()
         all_data = response_data.get("data", [])
         
-        print(f"✅ Rate Limit 응답 받음: {len(all_data)}개 항목")
+        logger.debug("프로젝트 %s Rate Limit %d개 항목", project_id, len(all_data))
         return all_data
         
     except requests.exceptions.RequestException as e:
-        print(f"❌ 네트워크 오류가 발생했습니다: {e}")
+        logger.error("네트워크 오류가 발생했습니다: %s", e)
         return None
     except json.JSONDecodeError as e:
-        print(f"❌ JSON 파싱 오류가 발생했습니다: {e}")
-        print(f"응답 내용: {response.text}")
+        logger.error("JSON 파싱 오류가 발생했습니다: %s %s", e, response.text)
         return None
     except Exception as e:
-        print(f"❌ 예상치 못한 오류가 발생했습니다: {e}")
+        logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
         return None
 
 
+@profiled()
 def update_project_rate_limit(project_id, rate_limit_id, max_requests_per_1_minute, admin_api_key=None):
     """특정 프로젝트의 Rate Limit을 업데이트합니다."""
+    import requests
+
     # 관리자 키가 제공되면 사용, 없으면 기본 환경변수 사용
-    api_key = admin_api_key or openai_api_key
-    org_id = openai_org_id
+    api_key, org_id = _credentials(admin_api_key)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -714,16 +1118,21 @@ def update_project_rate_limit(project_id, rate_limit_id, max_requests_per_1_minu
     }
 
     try:
-        url = f"https://api.openai.com/v1/organization/projects/{project_id}/rate_limits/{rate_limit_id}"
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        url = _api_url(f"/organization/projects/{project_id}/rate_limits/{rate_limit_id}")
+        response = _api_request(
+            "POST", "/organization/projects/{project_id}/rate_limits/{rate_limit_id}", url, headers,
+            kind="mutate", json=data,
+        )
         
         # HTTP 상태 코드 확인
         if response.status_code == 200:
-            print(f"✅ 프로젝트 {project_id}의 Rate Limit이 성공적으로 업데이트되었습니다.")
+            logger.info("프로젝트 %s의 Rate Limit이 업데이트되었습니다.", project_id, extra={"rate_limit_id": rate_limit_id})
             return response.json()
         else:
-            print(f"❌ Rate Limit 업데이트 실패: HTTP {response.status_code}")
-            print(f"응답 내용: {response.text}")
+            logger.warning(
+                "Rate Limit 업데이트 실패: HTTP %s %s", response.status_code, response.text,
+                extra={"project_id": project_id, "rate_limit_id": rate_limit_id},
+            )
             
             # 권한 오류인 경우 특별한 예외 발생
             if response.status_code == 401:
@@ -742,88 +1151,116 @@ def update_project_rate_limit(project_id, rate_limit_id, max_requests_per_1_minu
             return None
             
     except requests.exceptions.RequestException as e:
-        print(f"네트워크 오류가 발생했습니다: {e}")
+        logger.error("네트워크 오류가 발생했습니다: %s", e)
         return None
     except json.JSONDecodeError as e:
-        print(f"JSON 파싱 오류가 발생했습니다: {e}")
-        print(f"응답 내용: {response.text}")
+        logger.error("JSON 파싱 오류가 발생했습니다: %s %s", e, response.text)
         return None
     except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
+        logger.exception("예상치 못한 오류가 발생했습니다: %s", e)
         return None
 
 
+@profiled()
+@_with_sweep_deadline
 def get_all_projects_rate_limits(admin_api_key=None):
     """모든 프로젝트의 Rate Limit 정보를 가져옵니다."""
     projects = list_organization_projects(admin_api_key)
     if not projects:
-        print("❌ 프로젝트 목록을 가져올 수 없습니다.")
+        logger.error("프로젝트 목록을 가져올 수 없습니다.")
         return None
     
-    print(f"📋 총 {len(projects)}개의 프로젝트에 대해 Rate Limit을 조회합니다.")
+    logger.info("총 %d개의 프로젝트에 대해 Rate Limit을 조회합니다.", len(projects))
     all_rate_limits = {}
     success_count = 0
     
     for i, project in enumerate(projects):
+        if _deadline_exceeded():
+            logger.warning("Rate Limit 조회 마감 시간 초과: %d/%d 프로젝트만 조회했습니다.", i, len(projects))
+            break
         project_id = project["id"]
         project_name = project["name"]
         
-        print(f"🔄 ({i+1}/{len(projects)}) {project_name} ({project_id}) Rate Limit 조회 중...")
+        logger.debug("(%d/%d) %s (%s) Rate Limit 조회 중", i + 1, len(projects), project_name, project_id)
         
         try:
             rate_limits = get_project_rate_limits(project_id, admin_api_key)
             if rate_limits is not None:
                 # 필요한 필드만 필터링해서 응답 크기 최적화
-                filtered_rate_limits = []
-                for limit in rate_limits:
-                    filtered_limit = {
-                        "id": limit.get("id", ""),
-                        "model": limit.get("model", ""),
-                        "max_requests_per_1_minute": limit.get("max_requests_per_1_minute", 0),
-                        "max_tokens_per_1_minute": limit.get("max_tokens_per_1_minute", 0),
-                    }
-                    filtered_rate_limits.append(filtered_limit)
+                filtered_rate_limits = [RateLimit.from_api(limit) for limit in rate_limits]
                 
                 all_rate_limits[project_id] = {
                     "project_name": project_name,
                     "rate_limits": filtered_rate_limits
                 }
                 success_count += 1
-                print(f"✅ {project_name}: {len(filtered_rate_limits)}개 Rate Limit 조회 성공 (필터링됨)")
+                logger.debug("%s: %d개 Rate Limit 조회 성공", project_name, len(filtered_rate_limits))
             else:
-                print(f"⚠️ {project_name}: Rate Limit 정보 없음")
+                logger.warning("%s: Rate Limit 정보 없음", project_name, extra={"project_id": project_id})
         except Exception as e:
-            print(f"❌ {project_name}: Rate Limit 조회 실패 - {e}")
+            logger.error("%s: Rate Limit 조회 실패 - %s", project_name, e, extra={"project_id": project_id})
     
-    print(f"📊 Rate Limit 조회 완료: {success_count}/{len(projects)} 프로젝트 성공")
+    logger.info("Rate Limit 조회 완료: %d/%d 프로젝트 성공", success_count, len(projects))
     return all_rate_limits
 
 
+def _template_name(filename):
+    """템플릿 파일 경로에서 저장소 키를 만듭니다.
+
+    디렉터리가 다른 같은 이름의 파일이 한 키로 섞이지 않도록 확장자를 뺀 절대 경로를 사용합니다.
+    """
+    return os.path.splitext(os.path.abspath(filename))[0]
+
+
+def _file_signature(filename):
+    """파일 변경 여부를 판단하기 위한 (수정 시각, 크기) 문자열"""
+    stat = os.stat(filename)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
 def save_rate_limit_template(template_data, filename="rate_limit_template.json"):
-    """Rate Limit 템플릿을 JSON 파일로 저장합니다."""
+    """Rate Limit 템플릿을 저장소에 저장합니다."""
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(template_data, f, ensure_ascii=False, indent=2)
-        print(f"✅ Rate Limit 템플릿이 {filename}에 저장되었습니다.")
+        get_store().save_template(_template_name(filename), template_data)
+        logger.info("Rate Limit 템플릿 %s이 저장되었습니다.", filename)
         return True
     except Exception as e:
-        print(f"❌ 템플릿 저장 실패: {e}")
+        logger.error("템플릿 저장 실패: %s", e)
         return False
 
 
 def load_rate_limit_template(filename="rate_limit_template.json"):
-    """JSON 파일에서 Rate Limit 템플릿을 로드합니다."""
+    """저장소에서 Rate Limit 템플릿을 로드합니다.
+
+    같은 경로의 JSON 파일이 있고 마지막으로 가져온 뒤 수정 시각이나 크기가 바뀌었으면 파일 내용을
+    다시 가져옵니다. 즉 파일 수정과 저장소 저장 중 나중에 일어난 쪽이 적용됩니다.
+    """
     try:
+        store = get_store()
+        name = _template_name(filename)
         if os.path.exists(filename):
-            with open(filename, 'r', encoding='utf-8') as f:
-                template = json.load(f)
-            print(f"✅ Rate Limit 템플릿이 {filename}에서 로드되었습니다.")
-            return template
-        else:
-            print(f"⚠️ 템플릿 파일 {filename}이 존재하지 않습니다.")
-            return None
+            marker = f"template_file:{os.path.abspath(filename)}"
+            signature = _file_signature(filename)
+            if store.get_meta(marker) != signature:
+                template = load_json_cached(filename)
+                store.save_template(name, template)
+                store.set_meta(marker, signature)
+                logger.info("Rate Limit 템플릿을 %s에서 가져왔습니다.", filename)
+                return template
+
+        template = store.get_template(name)
+        if template is None:
+            # 파일 이름만 키로 쓰던 이전 버전에서 저장한 템플릿
+            legacy_name = os.path.splitext(os.path.basename(filename))[0]
+            template = store.get_template(legacy_name)
+            if template is not None:
+                store.save_template(name, template)
+
+        if template is None:
+            logger.warning("템플릿 %s이 존재하지 않습니다.", filename)
+        return template
     except Exception as e:
-        print(f"❌ 템플릿 로드 실패: {e}")
+        logger.error("템플릿 로드 실패: %s", e)
         return None
 
 
@@ -874,6 +1311,9 @@ def apply_rate_limit_template_to_project(project_id, template_data, admin_api_ke
 
 # 함수 테스트
 if __name__ == "__main__":
+    from logging_config import configure_logging
+
+    configure_logging()
     success = build_userinfo()
     if success:
         print("사용자 정보 수집 완료!")